@@ -0,0 +1,271 @@
+"""
+Parallel import of many CSV files and shapefiles.
+
+BatchImporter maps each file to a target table and runs the imports on a
+thread pool. Every worker goes through the shared DatabaseManager, whose
+connection pool hands each import its own connection. With resumable=True
+each file is imported as a checkpointed job (see import_jobs), and
+run(resume=True) continues the files an earlier run did not finish.
+Every task records its stage timings in an ImportMetrics (task.metrics).
+"""
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_imports import lazy_import
+import import_jobs
+from import_metrics import ImportMetrics
+
+file_readers = lazy_import('file_readers')
+
+CSV_EXTENSIONS = ('.csv',)
+SPATIAL_EXTENSIONS = ('.shp', '.geojson', '.gpkg')
+
+
+def table_name_for(path):
+    """Derive a table name from a file name the same way the Import tab does"""
+    base_name = os.path.splitext(os.path.basename(path))[0]
+    return base_name.replace(' ', '_').replace('-', '_')
+
+
+def expand_paths(patterns):
+    """Expand files, directories and glob patterns into a sorted list of importable files"""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern) or [pattern]
+        for path in candidates:
+            if path.lower().endswith(CSV_EXTENSIONS + SPATIAL_EXTENSIONS):
+                paths.append(path)
+
+    return sorted(set(paths))
+
+
+class ImportTask:
+    """One file to import and the outcome of importing it"""
+
+    def __init__(self, path, table_name):
+        self.path = path
+        self.table_name = table_name
+        self.file_type = 'shapefile' if path.lower().endswith(SPATIAL_EXTENSIONS) else 'csv'
+        self.status = 'Pending'
+        self.rows = 0
+        self.total_rows = 0
+        self.success = None
+        self.error = None
+        self.elapsed = 0.0
+        self.job_id = None
+        self.metrics = ImportMetrics(table_name)
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'table': self.table_name,
+            'type': self.file_type,
+            'status': self.status,
+            'rows': self.rows,
+            'success': self.success,
+            'error': self.error,
+            'elapsed': round(self.elapsed, 3),
+            'stages': {stage: totals['seconds']
+                       for stage, totals in self.metrics.snapshot()['stages'].items()},
+        }
+
+
+class BatchImporter:
+    """Import a set of files concurrently through a DatabaseManager"""
+
+    def __init__(self, db_manager, max_workers=4, chunk_rows=100000, columns=None,
+                 resumable=False, job_store=None, bbox=None, where=None, simplify_tolerance=None,
+                 grid_size=None, geometry_storage='text'):
+        self.db_manager = db_manager
+        self.max_workers = max_workers
+        self.chunk_rows = chunk_rows
+        self.columns = columns
+        # Filters pushed down into the file readers (see file_readers)
+        self.bbox = bbox
+        self.where = where
+        # Geometry reduction before loading spatial files (see geometry_reduction)
+        self.simplify_tolerance = simplify_tolerance
+        self.grid_size = grid_size
+        self.geometry_storage = geometry_storage
+        self.resumable = resumable
+        self.job_store = job_store or import_jobs.JobStore()
+        self.tasks = []
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def add_files(self, patterns, table_names=None):
+        """Queue files for import.
+
+        Args:
+            patterns: File paths, directories or glob patterns
+            table_names: Optional dict mapping file paths to table names, or a
+                callable taking a path and returning a table name
+
+        Returns:
+            list: The ImportTask objects that were added
+        """
+        added = []
+        for path in expand_paths(patterns):
+            if callable(table_names):
+                table_name = table_names(path)
+            elif table_names and path in table_names:
+                table_name = table_names[path]
+            else:
+                table_name = table_name_for(path)
+            added.append(ImportTask(path, table_name))
+
+        targets = [task.table_name for task in self.tasks + added]
+        duplicates = sorted({name for name in targets if targets.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Several files map to the same table: {', '.join(duplicates)}")
+
+        self.tasks.extend(added)
+        return added
+
+    def _start_job(self, task, resume):
+        """Save the task's job file; return False if resuming and the file was already imported"""
+        job = import_jobs.new_job(self.db_manager.config, task.table_name, task.path, task.file_type,
+                                  columns=self.columns, chunk_rows=self.chunk_rows,
+                                  bbox=self.bbox, where=self.where,
+                                  simplify_tolerance=self.simplify_tolerance, grid_size=self.grid_size,
+                                  geometry_storage=self.geometry_storage)
+        task.job_id = job['job_id']
+        previous = self.job_store.load(task.job_id)
+        if resume and previous and previous.get('status') == 'completed':
+            return False
+        self.job_store.save(job)
+        return True
+
+    def _import_task(self, task, progress_callback=None, resume=False):
+        """Run a single import task in a worker thread"""
+        started = time.perf_counter()
+
+        def task_progress(current, total, status):
+            with self._lock:
+                task.rows = current
+                task.total_rows = total
+                task.status = status
+            if progress_callback:
+                progress_callback(task, current, total, status)
+
+        checkpoint = {}
+        if self.resumable or resume:
+            if not self._start_job(task, resume):
+                task_progress(0, 0, "Already imported")
+                with self._lock:
+                    task.success = True
+                    task.status = "Completed"
+                if progress_callback:
+                    progress_callback(task, task.rows, task.total_rows, task.status)
+                return task
+            checkpoint = {'job_id': task.job_id, 'resume': resume}
+
+        task_progress(0, 0, "Reading file...")
+        task.metrics.start()
+        try:
+            if task.file_type == 'csv':
+                chunks = file_readers.iter_csv(task.path, self.columns, self.where, self.chunk_rows)
+                success = self.db_manager.import_data_chunks(chunks, task.table_name,
+                                                             progress_callback=task_progress,
+                                                             metrics=task.metrics, **checkpoint)
+            else:
+                with task.metrics.span('read'):
+                    data = file_readers.read_spatial(task.path, self.columns, self.bbox, self.where)
+                success = self.db_manager.import_spatial_data(data, task.table_name,
+                                                              progress_callback=task_progress,
+                                                              simplify_tolerance=self.simplify_tolerance,
+                                                              grid_size=self.grid_size,
+                                                              geometry_storage=self.geometry_storage,
+                                                              metrics=task.metrics, **checkpoint)
+        except Exception as e:
+            success = False
+            task_progress(task.rows, task.total_rows, f"Error: {str(e)}")
+
+        if task.job_id:
+            self.job_store.update(task.job_id, status='completed' if success else 'failed')
+
+        with self._lock:
+            task.elapsed = time.perf_counter() - started
+            task.success = bool(success)
+            if task.success:
+                task.status = "Completed"
+                if task.file_type == 'shapefile' and self.db_manager.last_spatial_index_error:
+                    task.error = f"Spatial index not created: {self.db_manager.last_spatial_index_error}"
+            else:
+                task.error = task.status[len("Error: "):] if task.status.startswith("Error: ") else task.status
+                task.status = "Failed"
+
+        if progress_callback:
+            progress_callback(task, task.rows, task.total_rows, task.status)
+        return task
+
+    def run(self, progress_callback=None, resume=False):
+        """Import all queued files and return the summary.
+
+        progress_callback is called as progress_callback(task, current, total, status)
+        from the worker threads. With resume, files completed by an earlier
+        resumable run are skipped and interrupted ones continue from their
+        last checkpoint.
+        """
+        if not self.db_manager.is_connected():
+            raise RuntimeError("Not connected to a database")
+
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='batch-import') as executor:
+            futures = [executor.submit(self._import_task, task, progress_callback, resume)
+                       for task in self.tasks]
+            for future in futures:
+                future.result()
+        self.finished_at = time.perf_counter()
+
+        return self.summary()
+
+    def elapsed(self):
+        """Seconds since the batch started (or its total duration once finished)"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def rows_per_second(self):
+        """Global throughput across all files"""
+        elapsed = self.elapsed()
+        with self._lock:
+            rows = sum(task.rows for task in self.tasks)
+        return rows / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Totals, throughput and the list of failed files"""
+        with self._lock:
+            tasks = [task.to_dict() for task in self.tasks]
+        failures = [task for task in tasks if task['success'] is False]
+        rows = sum(task['rows'] for task in tasks)
+        elapsed = self.elapsed()
+        # Summed over the workers, so the stages can add up to more than elapsed
+        stages = {}
+        for task in tasks:
+            for stage, seconds in task['stages'].items():
+                stages[stage] = round(stages.get(stage, 0.0) + seconds, 4)
+        return {
+            'files': len(tasks),
+            'succeeded': sum(1 for task in tasks if task['success']),
+            'failed': len(failures),
+            'rows': rows,
+            'elapsed': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            'stages': stages,
+            'failures': failures,
+            'tasks': tasks,
+        }
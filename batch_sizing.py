@@ -0,0 +1,125 @@
+"""
+Batch sizes for multi-row INSERT statements and bulk load chunks.
+
+Instead of a fixed number of rows, a batch gets a byte budget: narrow tables
+send many rows per statement, tables with long strings or large geometries
+send few, and no statement exceeds the server's packet size or bind parameter
+limit. Within that cap an AdaptiveBatchSizer tunes the batch size from the
+rows/s and latency measured for the batches already sent.
+"""
+import sqlite3
+
+import numpy as np
+
+# Estimated bytes per INSERT statement (MySQL is further capped by max_allowed_packet)
+STATEMENT_BYTE_BUDGET = 4 * 1024 * 1024
+
+# Estimated bytes per chunk handed to COPY / executemany bulk loads
+BULK_BYTE_BUDGET = 64 * 1024 * 1024
+BULK_MAX_ROWS = 250000
+
+# A statement slower than this halves the batch size
+MAX_LATENCY = 2.0
+
+# Bind parameters allowed in one statement
+MAX_PARAMETERS = {
+    'PostgreSQL': 65535,
+    'MySQL': 65535,
+    'SQL Server': 2099,
+    'SQLite': 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999,
+}
+
+# Size of a value as a bound parameter or SQL literal, by dtype kind
+FIXED_WIDTH_BYTES = 12
+
+# Bytes per coordinate in WKT (the larger of the WKT and WKB encodings)
+COORDINATE_BYTES = 40
+
+
+def _sample(dataframe, sample_rows):
+    if len(dataframe) <= sample_rows:
+        return dataframe
+    positions = np.linspace(0, len(dataframe) - 1, sample_rows).astype('int64')
+    return dataframe.iloc[positions]
+
+
+def _column_bytes(series):
+    """Average encoded size of the values of one sampled column"""
+    if getattr(series.dtype, 'name', None) == 'geometry':
+        import shapely
+        coordinates = shapely.get_num_coordinates(np.asarray(series.values))
+        return float(coordinates.mean()) * COORDINATE_BYTES + 16
+    if series.dtype.kind in 'biufcmM':
+        return FIXED_WIDTH_BYTES
+    values = series.dropna()
+    if len(values) == 0:
+        return 4
+    if isinstance(values.iloc[0], (bytes, bytearray, memoryview)):
+        return float(values.map(len).mean()) + 4
+    return float(values.astype(str).str.len().mean()) + 4
+
+
+def estimate_row_bytes(dataframe, sample_rows=1000):
+    """Average size of a row as sent to the database, estimated from evenly spaced rows"""
+    if len(dataframe) == 0 or len(dataframe.columns) == 0:
+        return 1
+    sample = _sample(dataframe, sample_rows)
+    return max(1, int(sum(_column_bytes(sample[col]) for col in sample.columns)))
+
+
+def rows_for_budget(row_bytes, byte_budget=STATEMENT_BYTE_BUDGET, columns=1, max_parameters=None,
+                    max_rows=1000000):
+    """Rows that fit in byte_budget (and in max_parameters bind parameters), at least 1"""
+    rows = byte_budget // max(int(row_bytes), 1)
+    if max_parameters:
+        rows = min(rows, max_parameters // max(columns, 1))
+    return int(min(max(rows, 1), max_rows))
+
+
+class AdaptiveBatchSizer:
+    """Tune the rows per batch from measured throughput, never above max_rows.
+
+    The size starts at initial_rows and grows by half after every batch whose
+    rows/s is within 10% of the best seen so far. It backs off by a quarter
+    when throughput drops and halves when a batch takes longer than
+    max_latency seconds, so it settles near the fastest size the server and
+    network allow.
+    """
+
+    def __init__(self, max_rows, initial_rows=1000, min_rows=1, max_latency=MAX_LATENCY):
+        self.min_rows = max(1, min_rows)
+        self.max_rows = max(self.min_rows, int(max_rows))
+        self.max_latency = max_latency
+        self.size = min(max(int(initial_rows), self.min_rows), self.max_rows)
+        self.best_rate = 0.0
+        self.batches = 0
+
+    def record(self, rows, seconds):
+        """Adjust the batch size after sending rows in seconds; returns the next size"""
+        if rows <= 0:
+            return self.size
+        self.batches += 1
+        rate = rows / seconds if seconds > 0 else None
+        if seconds > self.max_latency:
+            factor = 0.5
+        elif rate is None or rate >= self.best_rate * 0.9:
+            if rate is not None:
+                self.best_rate = max(self.best_rate, rate)
+            factor = 1.5
+        else:
+            factor = 0.75
+        self.size = int(min(max(self.size * factor, self.min_rows), self.max_rows))
+        return self.size
+
+    def describe(self):
+        """Short status text such as 'batch 4,000 rows'"""
+        return f"batch {self.size:,} rows"
+
+
+def split_adaptive(dataframe, sizer):
+    """Yield consecutive row slices of a DataFrame sized by the sizer's current batch size"""
+    start = 0
+    while start < len(dataframe):
+        batch = dataframe.iloc[start:start + sizer.size]
+        start += len(batch)
+        yield batch
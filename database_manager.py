@@ -1,54 +1,282 @@
-import pandas as pd
-import geopandas as gpd
-import pymysql
-import psycopg2
-import sqlite3
-import pyodbc
-from sqlalchemy import create_engine, inspect, text
-from geoalchemy2 import Geometry, WKTElement
+import threading
+import datetime
+from sqlalchemy import LargeBinary, create_engine, event, inspect, text
+from sqlalchemy import types as sqltypes
+from sqlalchemy.pool import StaticPool
 import urllib.parse
+import itertools
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from lazy_imports import lazy_import
+from query_pager import QueryPager
+import merge_sql
+import import_jobs
+import import_metrics
+from metadata_cache import MetadataCache
+
+# Imported on first use so connecting (and GUI startup) does not pay for them
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+pg_copy = lazy_import('pg_copy')
+geometry_encoding = lazy_import('geometry_encoding')
+geometry_reduction = lazy_import('geometry_reduction')
+batch_sizing = lazy_import('batch_sizing')
+pyodbc = lazy_import('pyodbc')
+
+# Load-time SQLite settings used by the bulk path when sqlite_pragmas is enabled
+SQLITE_LOAD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'cache_size': -262144,
+    'temp_store': 'MEMORY',
+}
+
+# SQL types pandas' to_sql gives object columns by the kind of values they hold
+# (pandas.api.types.infer_dtype); anything else becomes TEXT
+OBJECT_SQL_TYPES = {
+    'boolean': sqltypes.Boolean,
+    'integer': sqltypes.BigInteger,
+    'floating': sqltypes.Float,
+    'datetime': sqltypes.DateTime,
+    'date': sqltypes.Date,
+    'time': sqltypes.Time,
+}
+
+# Incremental imports load into "<table>_staging" and merge it into the target
+STAGING_SUFFIX = '_staging'
+
+# Leading keywords of statements open_query streams; PostgreSQL's named
+# server-side cursors (DECLARE ... CURSOR) only accept row queries
+STREAMED_STATEMENTS = ('SELECT', 'WITH', 'VALUES', 'SHOW', 'TABLE')
+
+# Leading keywords of statements that can change the catalog the metadata cache holds
+DDL_STATEMENTS = ('CREATE', 'ALTER', 'DROP', 'RENAME')
+
+# Rows per committed batch of convert_wkt_to_geometry
+CONVERT_BATCH_ROWS = 50000
+
+# GeoPackage SQL functions the SQLite R*Tree sync triggers call (see
+# _sqlite_rtree), and the position of the value each returns in a bounds tuple;
+# the triggers also call ST_IsEmpty
+SQLITE_BOUNDS_FUNCTIONS = {'ST_MinX': 0, 'ST_MinY': 1, 'ST_MaxX': 2, 'ST_MaxY': 3}
+
+# Column definition of the R*Tree tables _sqlite_rtree creates
+SQLITE_RTREE_COLUMNS = 'rtree(id, minx, maxx, miny, maxy)'
+
+# Connection pool settings; any of these can be overridden through the config dict
+DEFAULT_POOL_OPTIONS = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800,
+    'pool_timeout': 30,
+    'connect_timeout': 10,
+}
+
+def statement_keyword(query):
+    """First keyword of a SQL statement, skipping comments and opening parentheses"""
+    query = query.lstrip()
+    while True:
+        if query.startswith('--'):
+            query = query.partition('\n')[2].lstrip()
+        elif query.startswith('/*'):
+            query = query.partition('*/')[2].lstrip()
+        elif query.startswith('('):
+            query = query[1:].lstrip()
+        else:
+            break
+    words = query.split(None, 1)
+    return words[0].upper() if words else ''
+
+def quote_identifier(name, quote='"'):
+    """Quote a table or column name ('"' for ANSI SQL, '`' for MySQL)"""
+    return quote + str(name).replace(quote, quote * 2) + quote
+
+def _sqlite_bound(position, value):
+    """One coordinate of the bounds of a WKT value or GeoPackage blob (NULL if missing or empty)"""
+    bounds = geometry_encoding.value_bounds(value)
+    return bounds[position] if bounds else None
+
+def _sqlite_is_empty(value):
+    """1 for an empty (or unreadable) geometry, as GeoPackage's ST_IsEmpty; NULL stays NULL"""
+    if value is None:
+        return None
+    return 0 if geometry_encoding.value_bounds(value) else 1
+
+def register_sqlite_functions(connection):
+    """Register the GeoPackage functions the R*Tree sync triggers call on a sqlite3 connection.
+
+    Writing to a table with a spatial index needs them (as for a GeoPackage);
+    call this on connections opened outside DatabaseManager. GDAL/QGIS
+    provide their own versions, which read GeoPackage blobs but not WKT.
+    recursive_triggers makes INSERT OR REPLACE fire the delete trigger for the
+    rows it replaces, so upserts keep the R*Tree in step too.
+    """
+    for name, position in SQLITE_BOUNDS_FUNCTIONS.items():
+        connection.create_function(name, 1, functools.partial(_sqlite_bound, position),
+                                   deterministic=True)
+    connection.create_function('ST_IsEmpty', 1, _sqlite_is_empty, deterministic=True)
+    connection.execute("PRAGMA recursive_triggers = ON")
+
+def _sqlite_connect(dbapi_connection, connection_record):
+    register_sqlite_functions(dbapi_connection)
+
+# ODBC type code of SQL Server CLR user-defined types (geometry, geography, hierarchyid)
+SQL_SS_UDT = -151
+
+def _mssql_udt(value):
+    """Mark UDT values so only geometry columns are decoded (see geometry_encoding.geometry_text)"""
+    return None if value is None else geometry_encoding.SqlServerGeometry(value)
+
+def _mssql_connect(dbapi_connection, connection_record):
+    dbapi_connection.add_output_converter(SQL_SS_UDT, _mssql_udt)
+
+def instrumented(method):
+    """Let an import method take metrics=ImportMetrics(...) and record its stages into it.
+
+    The metrics are kept per thread while the import runs, so the helpers it
+    calls (and nested imports such as a resumable job's chunks) record into
+    the same object without passing it along.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, metrics=None, **kwargs):
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        previous = getattr(self._local, 'metrics', None)
+        self._local.metrics = metrics
+        metrics.start()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.stop()
+            self._local.metrics = previous
+    return wrapper
+
+def changes_table(method):
+    """Drop the cached metadata of the table a method writes (its table_name argument) when it returns"""
+    @functools.wraps(method)
+    def wrapper(self, data, table_name, *args, **kwargs):
+        try:
+            return method(self, data, table_name, *args, **kwargs)
+        finally:
+            self.metadata.invalidate(table_name)
+    return wrapper
 
 class DatabaseManager:
     def __init__(self):
-        self.connection = None
         self.engine = None
         self.db_type = None
         self.config = None
         
+        # Engine created by test_connection, reused by connect for the same config
+        self._warm_engine = None
+        self._warm_key = None
+        self._engine_lock = threading.Lock()
+        
+        # Serializes creating the import checkpoint table between batch workers
+        self._checkpoint_lock = threading.Lock()
+        
+        # Per-thread state, e.g. the ImportMetrics of the import running on the thread
+        self._local = threading.local()
+        
+        # Table names, columns and spatial columns (see get_tables, refresh_metadata)
+        self.metadata = MetadataCache()
+        
+        # Vertex/byte counts of the last import's simplify_tolerance/grid_size stage
+        self.last_geometry_reduction = None
+        
+    @property
+    def last_spatial_index_error(self):
+        """Why the last build_spatial_index on this thread built no index, or None"""
+        return getattr(self._local, 'spatial_index_error', None)
+        
+    def _connection_url(self, config):
+        """Build the SQLAlchemy URL for a connection config"""
+        if config['db_type'] == 'MySQL':
+            password = urllib.parse.quote_plus(config['password'])
+            return f"mysql+pymysql://{config['username']}:{password}@{config['host']}:{config['port']}/{config['database']}"
+            
+        elif config['db_type'] == 'PostgreSQL':
+            password = urllib.parse.quote_plus(config['password'])
+            return f"postgresql+psycopg2://{config['username']}:{password}@{config['host']}:{config['port']}/{config['database']}"
+            
+        elif config['db_type'] == 'SQLite':
+            return f"sqlite:///{config['database']}"
+            
+        elif config['db_type'] == 'SQL Server':
+            params = urllib.parse.quote_plus(
+                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+                f"SERVER={config['host']},{config['port']};"
+                f"DATABASE={config['database']};"
+                f"UID={config['username']};"
+                f"PWD={config['password']}"
+            )
+            return f"mssql+pyodbc:///?odbc_connect={params}"
+            
+        raise ValueError(f"Unsupported database type: {config['db_type']}")
+        
+    def _config_key(self, config):
+        """Identify a config so a warmed-up engine can be matched to it"""
+        return tuple(sorted((key, str(value)) for key, value in config.items()))
+        
+    def _create_engine(self, config):
+        """Create a pooled engine for a connection config"""
+        options = {key: config.get(key, default) for key, default in DEFAULT_POOL_OPTIONS.items()}
+        connect_timeout = int(options.pop('connect_timeout'))
+        
+        if config['db_type'] == 'SQLite':
+            connect_args = {'timeout': connect_timeout, 'check_same_thread': False}
+            if config['database'] in ('', ':memory:'):
+                # An in-memory database only exists on a single shared connection
+                engine = create_engine(self._connection_url(config), connect_args=connect_args,
+                                       poolclass=StaticPool)
+                event.listen(engine, 'connect', _sqlite_connect)
+                return engine
+        elif config['db_type'] == 'SQL Server':
+            connect_args = {'timeout': connect_timeout}
+        else:
+            connect_args = {'connect_timeout': connect_timeout}
+            
+        engine_options = {}
+        if config['db_type'] == 'SQL Server':
+            # Array parameter binding for every executemany issued through the engine
+            engine_options['fast_executemany'] = True
+            
+        engine = create_engine(
+            self._connection_url(config),
+            connect_args=connect_args,
+            pool_size=int(options['pool_size']),
+            max_overflow=int(options['max_overflow']),
+            pool_pre_ping=bool(options['pool_pre_ping']),
+            pool_recycle=int(options['pool_recycle']),
+            pool_timeout=float(options['pool_timeout']),
+            **engine_options
+        )
+        if config['db_type'] == 'SQLite':
+            event.listen(engine, 'connect', _sqlite_connect)
+        elif config['db_type'] == 'SQL Server':
+            event.listen(engine, 'connect', _mssql_connect)
+        return engine
+        
+    def _warm_pool(self, engine):
+        """Check out a connection so the pool holds a validated connection"""
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            
     def test_connection(self, config):
+        """Test a config by warming up a connection pool that connect() can reuse"""
         try:
-            if config['db_type'] == 'MySQL':
-                conn = pymysql.connect(
-                    host=config['host'],
-                    port=int(config['port']),
-                    user=config['username'],
-                    password=config['password'],
-                    database=config['database']
-                )
-                conn.close()
-                return True
-                
-            elif config['db_type'] == 'PostgreSQL':
-                conn = psycopg2.connect(
-                    host=config['host'],
-                    port=int(config['port']),
-                    user=config['username'],
-                    password=config['password'],
-                    database=config['database']
-                )
-                conn.close()
-                return True
-                
-            elif config['db_type'] == 'SQLite':
-                conn = sqlite3.connect(config['database'])
-                conn.close()
-                return True
+            engine = self._create_engine(config)
+            self._warm_pool(engine)
+            
+            with self._engine_lock:
+                if self._warm_engine is not None and self._warm_engine is not self.engine:
+                    self._warm_engine.dispose()
+                self._warm_engine = engine
+                self._warm_key = self._config_key(config)
                 
-            elif config['db_type'] == 'SQL Server':
-                connection_string = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['host']},{config['port']};DATABASE={config['database']};UID={config['username']};PWD={config['password']}"
-                conn = pyodbc.connect(connection_string)
-                conn.close()
-                return True
+            return True
                 
         except Exception as e:
             print(f"Connection test error: {str(e)}")
@@ -56,75 +284,122 @@ class DatabaseManager:
             
     def connect(self, config):
         try:
-            self.config = config
-            self.db_type = config['db_type']
-            
-            if config['db_type'] == 'MySQL':
-                password = urllib.parse.quote_plus(config['password'])
-                connection_string = f"mysql+pymysql://{config['username']}:{password}@{config['host']}:{config['port']}/{config['database']}"
-                
-            elif config['db_type'] == 'PostgreSQL':
-                password = urllib.parse.quote_plus(config['password'])
-                connection_string = f"postgresql+psycopg2://{config['username']}:{password}@{config['host']}:{config['port']}/{config['database']}"
-                
-            elif config['db_type'] == 'SQLite':
-                connection_string = f"sqlite:///{config['database']}"
+            with self._engine_lock:
+                if self._warm_engine is not None and self._warm_key == self._config_key(config):
+                    engine = self._warm_engine
+                else:
+                    engine = self._create_engine(config)
+                self._warm_engine = None
+                self._warm_key = None
                 
-            elif config['db_type'] == 'SQL Server':
-                params = urllib.parse.quote_plus(
-                    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                    f"SERVER={config['host']},{config['port']};"
-                    f"DATABASE={config['database']};"
-                    f"UID={config['username']};"
-                    f"PWD={config['password']}"
-                )
-                connection_string = f"mssql+pyodbc:///?odbc_connect={params}"
+            self._warm_pool(engine)
+            
+            if self.engine is not None and self.engine is not engine:
+                self.engine.dispose()
                 
-            self.engine = create_engine(connection_string)
-            self.connection = self.engine.connect()
+            self.config = config
+            self.db_type = config['db_type']
+            self.engine = engine
+            self.metadata.clear()
             return True
             
         except Exception as e:
             print(f"Connection error: {str(e)}")
-            self.connection = None
-            self.engine = None
+            self.disconnect()
             return False
             
     def is_connected(self):
-        return self.connection is not None
+        return self.engine is not None
         
     def disconnect(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        if self.engine:
+            self.engine.dispose()
             self.engine = None
+        self.metadata.clear()
             
-    def import_data(self, dataframe, table_name, progress_callback=None):
+    @instrumented
+    @changes_table
+    def import_data(self, dataframe, table_name, progress_callback=None, load_method='auto',
+                    copy_format='text', sqlite_pragmas=False, schema=None, mode='replace',
+                    key_columns=None, detect_changes=False, job_id=None, resume=False):
+        """Import a DataFrame into a table.
+
+        load_method is 'auto', 'bulk' ('copy' is accepted as an alias) or 'insert'.
+        'auto' uses the backend's bulk path (COPY on PostgreSQL, a single
+        executemany transaction on SQLite, fast_executemany on SQL Server) and
+        falls back to chunked INSERTs everywhere else or when the bulk load
+        fails. copy_format selects the 'text' or 'binary' COPY format.
+        sqlite_pragmas relaxes SQLite durability settings for the duration of
+        the load (see _sqlite_chunks).
+        schema is an optional schema_inference.TableSchema: the data is cast to
+        its compact dtypes and the table is created with its SQL column types.
+        mode is 'replace' (recreate the table), 'append' or 'upsert' (insert
+        new rows and update existing ones, matched on key_columns). With
+        detect_changes an upsert only sends rows that are new or whose values
+        changed since the last import (see _changed_rows).
+        With a job_id the import is resumable: it is committed in chunks of
+        import_jobs.CHECKPOINT_ROWS rows and resume=True continues an
+        interrupted run of the same job (see _checkpointed_load).
+        """
+        created = False
         try:
             if not self.is_connected():
                 return False
                 
             total_rows = len(dataframe)
+            self._check_mode(mode, key_columns, detect_changes, job_id)
+            
+            if job_id:
+                return self.import_data_chunks(
+                    self._split_frame(dataframe, import_jobs.CHECKPOINT_ROWS), table_name,
+                    total_rows, progress_callback, load_method, copy_format, sqlite_pragmas,
+                    schema, mode, key_columns, job_id=job_id, resume=resume)
+            
+            sql_types = None
+            if schema is not None:
+                dataframe = self._timed('transform', schema.apply, dataframe)
+                sql_types = schema.sql_types(self.db_type)
             
             if progress_callback:
                 progress_callback(0, total_rows, "Creating table structure...")
                 
-            # Import with progress tracking
-            chunk_size = 1000
-            chunks = [dataframe[i:i + chunk_size] for i in range(0, len(dataframe), chunk_size)]
-            
-            for i, chunk in enumerate(chunks):
-                if progress_callback:
-                    rows_processed = min(i * chunk_size, total_rows)
-                    progress_callback(rows_processed, total_rows, f"Importing data... {rows_processed}/{total_rows}")
-                    
-                chunk.to_sql(
-                    name=table_name,
-                    con=self.engine,
-                    if_exists='replace' if i == 0 else 'append',
-                    index=False,
-                    method='multi'
-                )
+            created = self._create_upsert_target(dataframe, table_name, mode, sql_types)
+            load_table, if_exists = self._load_target(table_name, mode)
+            row_filter = self._row_filter(table_name, load_table, key_columns, detect_changes)
+            if row_filter:
+                dataframe = self._timed('transform', row_filter, dataframe)
+                if len(dataframe) == 0:
+                    if progress_callback:
+                        progress_callback(total_rows, total_rows, "No new or changed rows")
+                    return True
+                total_rows = len(dataframe)
+            if load_table != table_name:
+                dataframe = self._numbered(dataframe)
+                
+            bulk_method = self._bulk_method(dataframe, load_method)
+            loaded = False
+            if bulk_method:
+                try:
+                    chunks = self._split_frame(dataframe, self._bulk_rows(dataframe))
+                    self._bulk_load(bulk_method, chunks, load_table,
+                                    total_rows, progress_callback, copy_format=copy_format,
+                                    sqlite_pragmas=sqlite_pragmas, sql_types=sql_types,
+                                    if_exists=if_exists)
+                    loaded = True
+                    
+                except Exception as bulk_error:
+                    if load_method != 'auto':
+                        raise
+                    print(f"Bulk import failed, falling back to INSERT: {str(bulk_error)}")
+                    self._count('retries')
+                    
+            if not loaded:
+                # Import with progress tracking
+                self._insert_chunks([dataframe], load_table, total_rows, progress_callback,
+                                    sql_types, if_exists)
+                
+            self._finish_load(table_name, load_table, mode, key_columns, progress_callback,
+                              total_rows)
                 
             if progress_callback:
                 progress_callback(total_rows, total_rows, "Import completed successfully")
@@ -133,10 +408,976 @@ class DatabaseManager:
             
         except Exception as e:
             print(f"Import error: {str(e)}")
+            if created:
+                self._drop_table(table_name)
             if progress_callback:
                 progress_callback(0, total_rows, f"Error: {str(e)}")
             return False
             
+    @instrumented
+    @changes_table
+    def import_data_chunks(self, chunks, table_name, total_rows=None, progress_callback=None,
+                           load_method='auto', copy_format='text', sqlite_pragmas=False,
+                           schema=None, mode='replace', key_columns=None, detect_changes=False,
+                           job_id=None, resume=False):
+        """Import an iterable of DataFrame chunks (e.g. a read_csv chunksize reader).
+
+        Only one chunk is held in memory at a time, so peak memory depends on the
+        chunk size rather than the size of the source. The first chunk defines the
+        table structure and later chunks are cast to its dtypes. total_rows is
+        only used for progress reporting and may be an estimate or None.
+        Because the source can only be read once there is no INSERT fallback
+        when the bulk load fails. schema, mode, key_columns and detect_changes
+        work as in import_data, except that the schema's integer columns are
+        loaded as int64 (BIGINT) since the table is created from the first chunk.
+        With a job_id every chunk is committed with a checkpoint and
+        resume=True skips the rows an interrupted run of the job already
+        committed (see _checkpointed_load). The source must yield the same
+        rows in the same order on every run.
+        """
+        rows_processed = 0
+        created = False
+        try:
+            if not self.is_connected():
+                return False
+                
+            self._check_mode(mode, key_columns, detect_changes, job_id)
+            
+            if progress_callback:
+                progress_callback(0, total_rows or 0, "Creating table structure...")
+                
+            chunks = self._metered(chunks)
+            sql_types = None
+            if schema is not None:
+                # The table is created before later chunks are seen
+                schema = schema.with_wide_integers()
+                chunks = (self._timed('transform', schema.apply, chunk) for chunk in chunks)
+                sql_types = schema.sql_types(self.db_type)
+                
+            if job_id:
+                rows_processed = self._resumable_chunks(chunks, table_name, job_id, resume, mode,
+                                                        key_columns, total_rows, progress_callback,
+                                                        load_method, copy_format, sqlite_pragmas,
+                                                        sql_types)
+                if progress_callback:
+                    progress_callback(rows_processed, rows_processed, "Import completed successfully")
+                return True
+                
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                print("Import error: no data to import")
+                return False
+            created = self._create_upsert_target(first_chunk, table_name, mode, sql_types)
+            chunks = itertools.chain([first_chunk], chunks)
+            
+            load_table, if_exists = self._load_target(table_name, mode)
+            row_filter = self._row_filter(table_name, load_table, key_columns, detect_changes)
+            if row_filter:
+                chunks = (self._timed('transform', row_filter, chunk) for chunk in chunks)
+            if load_table != table_name:
+                chunks = self._numbered_chunks(chunks)
+            first_chunk = next(chunks)
+                
+            conformed = self._conform_chunks(first_chunk, chunks)
+            
+            bulk_method = self._bulk_method(first_chunk, load_method)
+            if bulk_method:
+                rows_processed = self._bulk_load(bulk_method, conformed, load_table, total_rows,
+                                                 progress_callback, copy_format=copy_format,
+                                                 sqlite_pragmas=sqlite_pragmas, sql_types=sql_types,
+                                                 if_exists=if_exists)
+            else:
+                rows_processed = self._insert_chunks(conformed, load_table, total_rows,
+                                                     progress_callback, sql_types, if_exists)
+                
+            self._finish_load(table_name, load_table, mode, key_columns, progress_callback,
+                              rows_processed)
+                
+            if progress_callback:
+                progress_callback(rows_processed, rows_processed, "Import completed successfully")
+                
+            return True
+            
+        except Exception as e:
+            print(f"Import error: {str(e)}")
+            if created:
+                self._drop_table(table_name)
+            if progress_callback:
+                progress_callback(rows_processed, total_rows or rows_processed, f"Error: {str(e)}")
+            return False
+            
+    def _check_mode(self, mode, key_columns, detect_changes, job_id=None):
+        """Validate the incremental import options"""
+        if mode not in ('replace', 'append', 'upsert'):
+            raise ValueError(f"Unknown import mode: {mode}")
+        if mode == 'upsert' and not key_columns:
+            raise ValueError("Upsert needs at least one key column")
+        if detect_changes and mode != 'upsert':
+            raise ValueError("Change detection is only available in upsert mode")
+        if detect_changes and job_id:
+            raise ValueError("Change detection is not available for resumable imports")
+            
+    def _has_table(self, table_name):
+        return inspect(self.engine).has_table(table_name)
+        
+    def _create_upsert_target(self, dataframe, table_name, mode, sql_types=None):
+        """Create the missing target table of an upsert from a DataFrame's columns.
+
+        Upserts then load a staging table and merge it even into a new table,
+        so keys that repeat within the import resolve as they do for an
+        existing table (the last row wins). Returns True if the table was created.
+        """
+        if mode != 'upsert' or self._has_table(table_name):
+            return False
+        columns = [col for col in dataframe.columns if col != merge_sql.STAGING_ROW_COLUMN]
+        self._create_table(dataframe[columns], table_name, sql_types)
+        return True
+        
+    def _last_per_key(self, dataframe, key_columns):
+        """Keep the last row of each key, as a merge from a staging table does"""
+        return dataframe.drop_duplicates(subset=list(key_columns), keep='last')
+        
+    def _load_target(self, table_name, mode):
+        """Return the table to load into and its if_exists mode.
+
+        Upserts into an existing table (see _create_upsert_target) go through
+        a staging table that _finish_load merges into the target; everything
+        else is written directly.
+        """
+        if mode == 'append':
+            return table_name, 'append'
+        if mode == 'upsert' and self._has_table(table_name):
+            return f"{table_name}{STAGING_SUFFIX}", 'replace'
+        return table_name, 'replace'
+        
+    def _finish_load(self, table_name, load_table, mode, key_columns, progress_callback=None,
+                     rows=0):
+        """Merge a staging table into the target table and drop it"""
+        try:
+            if mode == 'upsert' and self.db_type != 'SQL Server':
+                # ON CONFLICT, ON DUPLICATE KEY and INSERT OR REPLACE match on a unique index
+                self._ensure_unique_key(table_name, key_columns)
+                
+            if load_table == table_name:
+                return
+                
+            if progress_callback:
+                progress_callback(rows, rows, f"Merging into {table_name}...")
+                
+            sql = self._merge_sql(table_name, load_table, mode, key_columns,
+                                  self._column_names(load_table))
+            with self._span('commit'), self.engine.begin() as connection:
+                with self._span('execute'):
+                    connection.execute(text(sql))
+        finally:
+            if load_table != table_name:
+                self._drop_table(load_table)
+                
+    def _merge_sql(self, table_name, staging_table, mode, key_columns, staged_columns):
+        """Append or upsert statement moving the staging rows into the target table"""
+        columns = [col for col in staged_columns if col != merge_sql.STAGING_ROW_COLUMN]
+        if mode == 'upsert':
+            order_column = (merge_sql.STAGING_ROW_COLUMN
+                            if merge_sql.STAGING_ROW_COLUMN in staged_columns else None)
+            return merge_sql.upsert_sql(self.db_type, table_name, staging_table, columns,
+                                        key_columns, order_column)
+        return merge_sql.append_sql(self.db_type, table_name, staging_table, columns)
+        
+    def _numbered(self, dataframe, start=0):
+        """Add the staging row number column (the source order the merge keeps, see merge_sql)"""
+        numbers = np.arange(start, start + len(dataframe), dtype='int64')
+        return dataframe.assign(**{merge_sql.STAGING_ROW_COLUMN: numbers})
+        
+    def _numbered_chunks(self, chunks):
+        start = 0
+        for chunk in chunks:
+            yield self._numbered(chunk, start)
+            start += len(chunk)
+            
+    def _drop_table(self, table_name):
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {merge_sql.quote(table_name, self.db_type)}"))
+        self.metadata.invalidate(table_name)
+            
+    def _ensure_unique_key(self, table_name, key_columns):
+        """Create a unique index on the key columns unless the table already has one.
+
+        On MySQL, TEXT key columns (pandas' type for strings) are changed to
+        VARCHAR first, because MySQL only indexes a prefix of TEXT columns.
+        Fails with a ValueError naming the key when the table already holds
+        duplicate keys.
+        """
+        inspector = inspect(self.engine)
+        wanted = sorted(key_columns)
+        
+        primary_key = inspector.get_pk_constraint(table_name).get('constrained_columns') or []
+        if sorted(primary_key) == wanted:
+            return
+        for index in inspector.get_indexes(table_name):
+            if index.get('unique') and sorted(index['column_names']) == wanted:
+                return
+        try:
+            for constraint in inspector.get_unique_constraints(table_name):
+                if sorted(constraint['column_names']) == wanted:
+                    return
+        except NotImplementedError:
+            pass
+            
+        try:
+            if self.db_type == 'MySQL':
+                self._mysql_varchar_keys(table_name, key_columns, inspector)
+            with self.engine.begin() as connection:
+                connection.execute(text(merge_sql.unique_index_sql(self.db_type, table_name, key_columns)))
+        except Exception as e:
+            raise ValueError(f"Cannot upsert into {table_name}: no unique index could be created "
+                             f"on the key columns {', '.join(map(str, key_columns))}; "
+                             f"check the table for duplicate keys ({str(e)})") from e
+        finally:
+            self.metadata.invalidate(table_name)
+            
+    def _mysql_varchar_keys(self, table_name, key_columns, inspector):
+        """Change TEXT key columns to VARCHAR long enough for the values they hold"""
+        columns = {col['name']: col for col in inspector.get_columns(table_name)}
+        quote = lambda name: merge_sql.quote(name, 'MySQL')
+        for column in key_columns:
+            if 'TEXT' not in str(columns[column]['type']).upper():
+                continue
+            with self.engine.begin() as connection:
+                longest = connection.execute(text(
+                    f"SELECT MAX(CHAR_LENGTH({quote(column)})) FROM {quote(table_name)}")).scalar()
+                length = max(merge_sql.MYSQL_KEY_LENGTH, longest or 0)
+                connection.execute(text(merge_sql.mysql_key_column_sql(table_name, column, length)))
+            
+    def _row_filter(self, table_name, load_table, key_columns, detect_changes):
+        """Return a function applying _changed_rows to each chunk, or None.
+
+        Rows are also hashed (without filtering) when upserting into a table
+        that already has a hash column, so the stored hashes stay in step with
+        the values even when change detection is off for this import.
+        """
+        merging = load_table != table_name
+        if detect_changes:
+            existing = self._existing_hashes(table_name, key_columns) if merging else None
+        elif merging and merge_sql.ROW_HASH_COLUMN in self._column_names(table_name):
+            existing = None
+        else:
+            return None
+        return lambda dataframe: self._changed_rows(dataframe, key_columns, existing)
+        
+    def _column_names(self, table_name):
+        return [col['name'] for col in inspect(self.engine).get_columns(table_name)]
+        
+    def _existing_hashes(self, table_name, key_columns):
+        """Keys and stored row hashes of the target table for change detection"""
+        if merge_sql.ROW_HASH_COLUMN not in self._column_names(table_name):
+            with self.engine.begin() as connection:
+                connection.execute(text(merge_sql.add_hash_column_sql(self.db_type, table_name)))
+            return None
+            
+        quote = lambda name: merge_sql.quote(name, self.db_type)
+        hash_column = quote(merge_sql.ROW_HASH_COLUMN)
+        query = (f"SELECT {', '.join(quote(col) for col in key_columns)}, {hash_column} "
+                 f"FROM {quote(table_name)} WHERE {hash_column} IS NOT NULL")
+        existing = pd.read_sql_query(text(query), self.engine)
+        existing[merge_sql.ROW_HASH_COLUMN] = existing[merge_sql.ROW_HASH_COLUMN].astype('Int64')
+        return existing.drop_duplicates(subset=list(key_columns))
+        
+    def _changed_rows(self, dataframe, key_columns, existing=None):
+        """Add the row hash column and keep only new or changed rows.
+
+        The hash covers every non-key column (pandas' vectorized
+        hash_pandas_object) and is stored with the row, so the next import
+        compares hashes instead of values. Rows whose key is missing from
+        existing, or whose stored hash differs, are kept.
+        """
+        value_columns = [col for col in dataframe.columns
+                         if col not in key_columns and col != merge_sql.ROW_HASH_COLUMN]
+        if value_columns:
+            hashes = pd.util.hash_pandas_object(dataframe[value_columns], index=False)
+            hashes = hashes.to_numpy().view('int64')
+        else:
+            hashes = np.zeros(len(dataframe), dtype='int64')
+        dataframe = dataframe.assign(**{merge_sql.ROW_HASH_COLUMN: hashes})
+        
+        if existing is None or len(existing) == 0 or len(dataframe) == 0:
+            return dataframe
+            
+        stored = dataframe[list(key_columns)].merge(existing, on=list(key_columns), how='left')
+        changed = stored[merge_sql.ROW_HASH_COLUMN].ne(hashes).fillna(True).to_numpy(dtype=bool)
+        return dataframe[changed]
+        
+    def checkpoint_status(self, job_id):
+        """Return the checkpoint of a resumable import job as a dict, or None"""
+        table = import_jobs.checkpoint_table
+        if not self._has_table(table.name):
+            return None
+        with self.engine.connect() as connection:
+            row = connection.execute(table.select().where(table.c.job_id == job_id)).mappings().first()
+        return dict(row) if row else None
+        
+    def _start_checkpoint(self, job_id, table_name, mode, resume):
+        """Return (rows_committed, creates_table) of the job.
+
+        A new checkpoint is started unless resume is set and the job has one.
+        creates_table records whether the job's first chunk (re)creates the
+        target table, which must not change when the job is resumed.
+        """
+        table = import_jobs.checkpoint_table
+        with self._checkpoint_lock:
+            table.create(self.engine, checkfirst=True)
+            
+        if resume:
+            state = self.checkpoint_status(job_id)
+            if state and state['table_name'] == table_name:
+                return state['rows_committed'], state['creates_table']
+                
+        creates_table = mode == 'replace' or not self._has_table(table_name)
+        with self.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.job_id == job_id))
+            connection.execute(table.insert().values(
+                job_id=job_id, table_name=table_name, rows_committed=0,
+                creates_table=creates_table, status='running',
+                updated_at=datetime.datetime.now()))
+        return 0, creates_table
+        
+    def _advance_checkpoint(self, connection, job_id, committed, rows):
+        """Move the job's checkpoint from committed to committed + rows within connection's transaction"""
+        table = import_jobs.checkpoint_table
+        result = connection.execute(
+            table.update()
+            .where(table.c.job_id == job_id)
+            .where(table.c.rows_committed == committed)
+            .values(rows_committed=committed + rows, status='running',
+                    updated_at=datetime.datetime.now()))
+        if result.rowcount != 1:
+            raise RuntimeError(f"The checkpoint of import job {job_id} was changed by another import")
+            
+    def _set_checkpoint_status(self, job_id, status):
+        table = import_jobs.checkpoint_table
+        with self.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.job_id == job_id)
+                               .values(status=status, updated_at=datetime.datetime.now()))
+            
+    def _checkpointed_load(self, chunks, table_name, job_id, resume, mode, key_columns, write_chunk,
+                           total_rows=None, progress_callback=None):
+        """Load chunks with a checkpoint per chunk and return the rows committed.
+
+        write_chunk(chunk, table) loads one chunk into a new table, replacing
+        it. Each chunk is loaded into the staging table and then appended (or
+        upserted) into the target in the same transaction that advances the
+        job's checkpoint, so every row is committed exactly once. Only while
+        nothing is committed yet and the job creates the target table does the
+        first chunk go straight into the target: if the import stops before
+        its checkpoint, the resumed job recreates the table. When resuming,
+        the rows up to the checkpoint are skipped.
+        """
+        committed, creates_table = self._start_checkpoint(job_id, table_name, mode, resume)
+        staging_table = f"{table_name}{STAGING_SUFFIX}"
+        staged_columns = None
+        keyed = mode != 'upsert' or self.db_type == 'SQL Server'
+        rows_seen = 0
+        
+        if committed and progress_callback:
+            progress_callback(committed, self._progress_total(total_rows, committed),
+                              f"Resuming after {committed:,} committed rows...")
+            
+        try:
+            for chunk in chunks:
+                start = rows_seen
+                rows_seen += len(chunk)
+                if rows_seen <= committed:
+                    continue
+                if start < committed:
+                    chunk = chunk.iloc[committed - start:]
+                    
+                if committed == 0 and creates_table:
+                    # Repeated keys in the first chunk must not reach the new table
+                    write_chunk(self._last_per_key(chunk, key_columns) if mode == 'upsert' else chunk,
+                                table_name)
+                    with self._span('commit'), self.engine.begin() as connection:
+                        self._advance_checkpoint(connection, job_id, 0, len(chunk))
+                else:
+                    if not keyed:
+                        self._ensure_unique_key(table_name, key_columns)
+                        keyed = True
+                    write_chunk(self._numbered(chunk), staging_table)
+                    if staged_columns is None:
+                        staged_columns = self._column_names(staging_table)
+                    sql = self._merge_sql(table_name, staging_table, mode, key_columns,
+                                          staged_columns)
+                    with self._span('commit'), self.engine.begin() as connection:
+                        with self._span('execute'):
+                            connection.execute(text(sql))
+                        self._advance_checkpoint(connection, job_id, committed, len(chunk))
+                        
+                committed += len(chunk)
+                if progress_callback:
+                    total = self._progress_total(total_rows, committed)
+                    progress_callback(committed, total, f"Committed {committed:,}/{total:,} rows")
+                    
+            if not keyed and committed:
+                self._ensure_unique_key(table_name, key_columns)
+        except Exception:
+            try:
+                self._set_checkpoint_status(job_id, 'failed')
+            except Exception as status_error:
+                print(f"Could not record the failed import job: {str(status_error)}")
+            raise
+        finally:
+            if staged_columns is not None:
+                self._drop_table(staging_table)
+                
+        self._set_checkpoint_status(job_id, 'completed')
+        return committed
+        
+    def _resumable_chunks(self, chunks, table_name, job_id, resume, mode, key_columns, total_rows,
+                          progress_callback, load_method, copy_format, sqlite_pragmas, sql_types):
+        """Run import_data_chunks' load through _checkpointed_load"""
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            raise ValueError("no data to import")
+        bulk_method = self._bulk_method(first_chunk, load_method)
+        
+        def write_chunk(chunk, target):
+            if bulk_method:
+                try:
+                    self._bulk_load(bulk_method, [chunk], target, copy_format=copy_format,
+                                    sqlite_pragmas=sqlite_pragmas, sql_types=sql_types)
+                    return
+                except Exception as bulk_error:
+                    if load_method != 'auto':
+                        raise
+                    # The chunk is still in memory, so it can be retried with INSERTs
+                    print(f"Bulk import failed, falling back to INSERT: {str(bulk_error)}")
+                    self._count('retries')
+            self._insert_chunks([chunk], target, sql_types=sql_types)
+            
+        return self._checkpointed_load(self._conform_chunks(first_chunk, chunks), table_name,
+                                       job_id, resume, mode, key_columns, write_chunk,
+                                       total_rows, progress_callback)
+        
+    def _split_frame(self, dataframe, chunk_size):
+        """Yield consecutive row slices of a DataFrame"""
+        for start in range(0, len(dataframe), chunk_size):
+            yield dataframe.iloc[start:start + chunk_size]
+            
+    def _conform_chunks(self, first_chunk, chunks):
+        """Yield the first chunk and the remaining chunks cast to its dtypes"""
+        dtypes = first_chunk.dtypes
+        yield first_chunk
+        
+        for chunk in chunks:
+            with self._span('transform'):
+                for col in chunk.columns:
+                    if col not in dtypes.index or chunk[col].dtype == dtypes[col]:
+                        continue
+                    target = dtypes[col]
+                    # Each chunk has its own categories; casting would drop unseen values
+                    if isinstance(target, pd.CategoricalDtype):
+                        continue
+                    # An integer column that gains missing values is read back as float
+                    if pd.api.types.is_integer_dtype(target) and pd.api.types.is_float_dtype(chunk[col]):
+                        target = 'Int64'
+                    try:
+                        chunk[col] = chunk[col].astype(target)
+                    except (TypeError, ValueError):
+                        pass
+            yield chunk
+            
+    def _span(self, stage, rows=0, nbytes=0):
+        """Span of the running import's ImportMetrics, or a no-op span without metrics"""
+        metrics = getattr(self._local, 'metrics', None)
+        return metrics.span(stage, rows, nbytes) if metrics else import_metrics.NULL_SPAN
+        
+    def _timed(self, stage, function, *args, **kwargs):
+        """Call function(*args, **kwargs) inside a span of the given stage"""
+        with self._span(stage):
+            return function(*args, **kwargs)
+            
+    def _count(self, counter, amount=1):
+        metrics = getattr(self._local, 'metrics', None)
+        if metrics:
+            metrics.count(counter, amount)
+            
+    def _written(self, dataframe, nbytes=None):
+        """Record a DataFrame's rows as written; without nbytes their size is estimated"""
+        metrics = getattr(self._local, 'metrics', None)
+        if metrics is None:
+            return
+        if nbytes is None:
+            nbytes = batch_sizing.estimate_row_bytes(dataframe, sample_rows=100) * len(dataframe)
+        metrics.add_rows(len(dataframe), nbytes)
+        
+    def _metered(self, chunks):
+        """Yield the chunks of a source, timing each one as the read stage"""
+        chunks = iter(chunks)
+        while True:
+            with self._span('read') as span:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    span.add(len(chunk))
+            if chunk is None:
+                return
+            yield chunk
+            
+    def _progress_total(self, total_rows, rows_processed):
+        """Progress total that never falls behind the rows already processed"""
+        return max(total_rows or 0, rows_processed)
+        
+    def _insert_chunks(self, chunks, table_name, total_rows=None, progress_callback=None,
+                       sql_types=None, if_exists='replace'):
+        """Write chunks with multi-row INSERTs; the first statement uses if_exists, the rest append.
+
+        Each statement holds one batch whose size is tuned by an
+        AdaptiveBatchSizer within the byte budget estimated from the first chunk.
+        """
+        rows_processed = 0
+        sizer = None
+        created = False
+        
+        for chunk in chunks:
+            if sizer is None:
+                sizer = self._insert_sizer(chunk)
+            batches = batch_sizing.split_adaptive(chunk, sizer)
+            if not created and len(chunk) == 0:
+                # Still create the table for an empty first chunk
+                batches = [chunk]
+                
+            for batch in batches:
+                if progress_callback:
+                    total = self._progress_total(total_rows, rows_processed)
+                    progress_callback(rows_processed, total,
+                                      f"Importing data... {rows_processed}/{total} ({sizer.describe()})")
+                    
+                started = time.perf_counter()
+                with self._span('execute', len(batch)):
+                    batch.to_sql(
+                        name=table_name,
+                        con=self.engine,
+                        if_exists=if_exists if not created else 'append',
+                        index=False,
+                        method='multi',
+                        dtype=self._column_types(batch, sql_types)
+                    )
+                sizer.record(len(batch), time.perf_counter() - started)
+                self._written(batch)
+                created = True
+                rows_processed += len(batch)
+                
+        return rows_processed
+        
+    def _statement_byte_budget(self):
+        """Bytes per INSERT statement, within half of MySQL's max_allowed_packet"""
+        budget = batch_sizing.STATEMENT_BYTE_BUDGET
+        if self.db_type == 'MySQL':
+            try:
+                with self.engine.connect() as connection:
+                    max_packet = connection.execute(text("SELECT @@max_allowed_packet")).scalar()
+                budget = min(budget, int(max_packet) // 2)
+            except Exception as e:
+                print(f"Could not read max_allowed_packet: {str(e)}")
+        return budget
+        
+    def _insert_rows(self, dataframe):
+        """Rows per multi-row INSERT statement that fit the statement byte and parameter limits"""
+        return batch_sizing.rows_for_budget(
+            batch_sizing.estimate_row_bytes(dataframe), self._statement_byte_budget(),
+            len(dataframe.columns), batch_sizing.MAX_PARAMETERS.get(self.db_type))
+        
+    def _insert_sizer(self, dataframe):
+        """AdaptiveBatchSizer for INSERT statements of rows like the DataFrame's"""
+        return batch_sizing.AdaptiveBatchSizer(self._insert_rows(dataframe))
+        
+    def _bulk_rows(self, dataframe):
+        """Rows per chunk for the COPY / executemany bulk paths"""
+        return batch_sizing.rows_for_budget(batch_sizing.estimate_row_bytes(dataframe),
+                                            batch_sizing.BULK_BYTE_BUDGET,
+                                            max_rows=batch_sizing.BULK_MAX_ROWS)
+        
+    def _bulk_method(self, dataframe, load_method):
+        """Return the bulk load path for an import ('copy', 'sqlite', 'mssql') or None for INSERTs"""
+        if load_method == 'insert':
+            return None
+        if self.db_type == 'PostgreSQL':
+            if load_method in ('bulk', 'copy') or pg_copy.copy_supported(dataframe):
+                return 'copy'
+        elif self.db_type == 'SQLite':
+            return 'sqlite'
+        elif self.db_type == 'SQL Server':
+            if load_method in ('bulk', 'copy') or self._mssql_supported(dataframe):
+                return 'mssql'
+        return None
+        
+    def _bulk_load(self, bulk_method, chunks, table_name, total_rows=None, progress_callback=None,
+                   copy_format='text', sqlite_pragmas=False, sql_types=None, if_exists='replace'):
+        """Run a bulk load path chosen by _bulk_method and return the rows written"""
+        if bulk_method == 'copy':
+            return self._copy_chunks(chunks, table_name, total_rows, copy_format, progress_callback,
+                                     sql_types, if_exists)
+        if bulk_method == 'sqlite':
+            return self._sqlite_chunks(chunks, table_name, total_rows, progress_callback,
+                                       sqlite_pragmas, sql_types, if_exists)
+        if bulk_method == 'mssql':
+            return self._mssql_chunks(chunks, table_name, total_rows, progress_callback,
+                                      sql_types=sql_types, if_exists=if_exists)
+        raise ValueError(f"Unknown bulk load method: {bulk_method}")
+        
+    def _column_types(self, dataframe, sql_types):
+        """Explicit SQL types for the DataFrame's columns, or None for pandas' defaults.
+
+        The table is created from an empty frame, in which every object column
+        would be TEXT, so object columns get the type pandas infers from their
+        values on the INSERT path (OBJECT_SQL_TYPES), and columns of bytes a
+        binary type.
+        """
+        types = {col: sql_types[col] for col in dataframe.columns if col in (sql_types or {})}
+        for col in dataframe.columns:
+            series = dataframe[col]
+            if col in types or series.dtype != object:
+                continue
+            first = series.first_valid_index()
+            if first is not None and isinstance(series[first], (bytes, bytearray, memoryview)):
+                types[col] = LargeBinary()
+                continue
+            sql_type = OBJECT_SQL_TYPES.get(pd.api.types.infer_dtype(series, skipna=True))
+            if sql_type is not None:
+                types[col] = sql_type()
+        return types or None
+        
+    def _create_table(self, dataframe, table_name, sql_types=None, if_exists='replace'):
+        """(Re)create a table with the column types the INSERT path would give the DataFrame.
+
+        With if_exists='append' an existing table is kept as it is.
+        """
+        with self._span('execute'):
+            dataframe.head(0).to_sql(
+                name=table_name,
+                con=self.engine,
+                if_exists=if_exists,
+                index=False,
+                dtype=self._column_types(dataframe, sql_types)
+            )
+        
+    def _dbapi_columns(self, dataframe, datetime_format=None):
+        """Convert a DataFrame's columns to lists of plain Python values for DB-API drivers.
+
+        Missing values become None. If datetime_format is given, datetime columns
+        and date/time objects are rendered as strings (SQLite has no native
+        timestamp type), as SQLAlchemy stores them.
+        """
+        columns = []
+        with self._span('encode'):
+            for col in dataframe.columns:
+                series = dataframe[col]
+                mask = series.isna()
+                if datetime_format and pd.api.types.is_datetime64_any_dtype(series):
+                    series = series.dt.strftime(datetime_format)
+                elif datetime_format and series.dtype == object and \
+                        pd.api.types.infer_dtype(series, skipna=True) in ('datetime', 'date', 'time'):
+                    series = series.map(lambda value: self._temporal_text(value, datetime_format),
+                                        na_action='ignore')
+                elif not mask.any() and series.dtype.kind in 'biuf':
+                    # NumPy scalars -> Python int/float/bool in one vectorized call
+                    columns.append(series.tolist())
+                    continue
+                values = series.astype(object).to_numpy(copy=True)
+                values[mask.to_numpy()] = None
+                columns.append(values.tolist())
+        return columns
+        
+    def _temporal_text(self, value, datetime_format):
+        if isinstance(value, datetime.datetime):
+            return value.strftime(datetime_format)
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return value.strftime('%H:%M:%S.%f')
+        
+    def _sqlite_chunks(self, chunks, table_name, total_rows=None, progress_callback=None,
+                       fast_pragmas=False, sql_types=None, if_exists='replace'):
+        """Load chunks into SQLite in one transaction with a prepared-statement executemany.
+
+        With fast_pragmas the connection switches to WAL journaling,
+        synchronous=OFF, a 256 MB page cache and in-memory temp storage for the
+        load; the previous settings are restored afterwards.
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks)
+        columns = list(first_chunk.columns)
+        self._create_table(first_chunk, table_name, sql_types, if_exists)
+        
+        column_list = ', '.join(quote_identifier(col) for col in columns)
+        insert_sql = (f"INSERT INTO {quote_identifier(table_name)} ({column_list}) "
+                      f"VALUES ({', '.join(['?'] * len(columns))})")
+        
+        rows_processed = 0
+        raw_connection = self.engine.raw_connection()
+        cursor = raw_connection.cursor()
+        saved_pragmas = {}
+        try:
+            if fast_pragmas:
+                for pragma, value in SQLITE_LOAD_PRAGMAS.items():
+                    saved_pragmas[pragma] = cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+                    cursor.execute(f"PRAGMA {pragma} = {value}")
+                    
+            for chunk in itertools.chain([first_chunk], chunks):
+                rows = zip(*self._dbapi_columns(chunk, datetime_format='%Y-%m-%d %H:%M:%S.%f'))
+                with self._span('execute', len(chunk)):
+                    cursor.executemany(insert_sql, rows)
+                self._written(chunk)
+                rows_processed += len(chunk)
+                
+                if progress_callback:
+                    total = self._progress_total(total_rows, rows_processed)
+                    progress_callback(rows_processed, total, f"Importing data... {rows_processed}/{total} "
+                                      f"(chunk {len(chunk):,} rows)")
+                    
+            with self._span('commit'):
+                raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            for pragma, value in saved_pragmas.items():
+                try:
+                    cursor.execute(f"PRAGMA {pragma} = {value}")
+                except Exception as e:
+                    print(f"Could not restore PRAGMA {pragma}: {str(e)}")
+            raw_connection.close()
+            
+        return rows_processed
+        
+    def _mssql_supported(self, dataframe):
+        """Return True if every column has a fast_executemany parameter type"""
+        for col in dataframe.columns:
+            series = dataframe[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                # DATETIMEOFFSET values are left to the INSERT path
+                if getattr(series.dt, 'tz', None) is not None:
+                    return False
+            elif series.dtype.kind not in 'biuf' and self._mssql_object_kind(series) is None:
+                return False
+        return True
+        
+    def _mssql_object_kind(self, series):
+        """Return 'string' or 'binary' for an object/string column, or None if mixed"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.cat.categories.to_series()
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        if inferred in ('string', 'empty'):
+            return 'string'
+        if inferred == 'bytes':
+            return 'binary'
+        return None
+        
+    def _mssql_input_sizes(self, dataframe):
+        """Parameter types and sizes for cursor.setinputsizes, one per column.
+
+        Without explicit sizes pyodbc guesses them from the first row, which
+        truncates or re-binds longer strings. Strings are sized to the longest
+        value in the chunk (NVARCHAR(MAX)/VARBINARY(MAX) beyond the inline limits).
+        """
+        sizes = []
+        for col in dataframe.columns:
+            series = dataframe[col]
+            if pd.api.types.is_bool_dtype(series):
+                sizes.append((pyodbc.SQL_BIT, 0, 0))
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                # pandas creates DATETIME columns (millisecond precision)
+                sizes.append((pyodbc.SQL_TYPE_TIMESTAMP, 23, 3))
+            elif series.dtype.kind in 'iu':
+                sizes.append((pyodbc.SQL_BIGINT, 0, 0))
+            elif series.dtype.kind == 'f':
+                sizes.append((pyodbc.SQL_DOUBLE, 0, 0))
+            elif self._mssql_object_kind(series) == 'binary':
+                width = int(series.dropna().map(len).max()) if series.notna().any() else 1
+                sizes.append((pyodbc.SQL_VARBINARY, width if width <= 8000 else 0, 0))
+            else:
+                width = int(series.dropna().str.len().max()) if series.notna().any() else 1
+                sizes.append((pyodbc.SQL_WVARCHAR, max(width, 1) if width <= 4000 else 0, 0))
+        return sizes
+        
+    def _mssql_chunks(self, chunks, table_name, total_rows=None, progress_callback=None,
+                      geometry_column=None, srid=None, sql_types=None, if_exists='replace'):
+        """Load chunks into SQL Server with pyodbc fast_executemany array binding.
+
+        Each chunk is sent as one parameter array with explicit parameter types
+        (see _mssql_input_sizes) instead of one round trip per row. If
+        geometry_column is given it must hold WKB bytes; it is created as a
+        geometry column and filled through geometry::STGeomFromWKB (the table
+        is always recreated in that case).
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks)
+        columns = list(first_chunk.columns)
+        attribute_cols = [col for col in columns if col != geometry_column]
+        table = quote_identifier(table_name)
+        
+        if attribute_cols:
+            self._create_table(first_chunk[attribute_cols], table_name, sql_types,
+                               if_exists if geometry_column is None else 'replace')
+            
+        placeholders = [f"geometry::STGeomFromWKB(?, {int(srid)})" if col == geometry_column else '?'
+                        for col in columns]
+        insert_sql = (f"INSERT INTO {table} ({', '.join(quote_identifier(col) for col in columns)}) "
+                      f"VALUES ({', '.join(placeholders)})")
+        
+        rows_processed = 0
+        raw_connection = self.engine.raw_connection()
+        try:
+            cursor = raw_connection.cursor()
+            if geometry_column is not None:
+                if attribute_cols:
+                    cursor.execute(f"ALTER TABLE {table} ADD {quote_identifier(geometry_column)} geometry")
+                else:
+                    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                    cursor.execute(f"CREATE TABLE {table} ({quote_identifier(geometry_column)} geometry)")
+                    
+            cursor.fast_executemany = True
+            for chunk in itertools.chain([first_chunk], chunks):
+                with self._span('encode'):
+                    cursor.setinputsizes(self._mssql_input_sizes(chunk))
+                    rows = list(zip(*self._dbapi_columns(chunk)))
+                with self._span('execute', len(chunk)):
+                    cursor.executemany(insert_sql, rows)
+                self._written(chunk)
+                rows_processed += len(chunk)
+                
+                if progress_callback:
+                    total = self._progress_total(total_rows, rows_processed)
+                    progress_callback(rows_processed, total, f"Bulk inserting data... {rows_processed}/{total} "
+                                      f"(chunk {len(chunk):,} rows)")
+                    
+            with self._span('commit'):
+                raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
+            
+        return rows_processed
+        
+    def _copy_chunks(self, chunks, table_name, total_rows=None, copy_format='text',
+                     progress_callback=None, sql_types=None, if_exists='replace'):
+        """Stream DataFrame chunks into PostgreSQL with a single COPY ... FROM STDIN"""
+        chunks = iter(chunks)
+        first_chunk = next(chunks)
+        columns = list(first_chunk.columns)
+        
+        # Let pandas create the table so the column types match the INSERT path
+        self._create_table(first_chunk, table_name, sql_types, if_exists)
+        
+        if copy_format == 'binary' and not pg_copy.binary_supported(first_chunk):
+            print("Binary COPY not supported for these column types, using text format")
+            copy_format = 'text'
+            
+        rows_processed = 0
+        
+        def encoded_chunks():
+            nonlocal rows_processed
+            if copy_format == 'binary':
+                yield pg_copy.BINARY_HEADER
+                
+            for chunk in itertools.chain([first_chunk], chunks):
+                with self._span('encode', len(chunk)) as span:
+                    if copy_format == 'binary':
+                        data = pg_copy.encode_binary(chunk)
+                    else:
+                        data = pg_copy.encode_text(chunk)
+                    span.add(nbytes=len(data))
+                self._written(chunk, len(data))
+                yield data
+                
+                rows_processed += len(chunk)
+                if progress_callback:
+                    total = self._progress_total(total_rows, rows_processed)
+                    progress_callback(rows_processed, total, f"Copying data... {rows_processed}/{total} "
+                                      f"(chunk {len(chunk):,} rows)")
+                    
+            if copy_format == 'binary':
+                yield pg_copy.BINARY_TRAILER
+                
+        raw_connection = self.engine.raw_connection()
+        try:
+            cursor = raw_connection.cursor()
+            # The COPY pulls the chunks, so reading and encoding are timed inside it
+            with self._span('execute'):
+                cursor.copy_expert(
+                    pg_copy.copy_sql(table_name, columns, copy_format),
+                    pg_copy.CopyStream(encoded_chunks()),
+                    size=1 << 20
+                )
+            with self._span('commit'):
+                raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
+            
+        return rows_processed
+            
+    def open_query(self, query, page_size=1000, decode_geometry=True):
+        """Execute a query and return a QueryPager that fetches its rows on demand.
+
+        Queries (SELECT/WITH/VALUES/SHOW/TABLE) are streamed with stream_results
+        (a named server-side cursor on PostgreSQL, an unbuffered cursor on
+        MySQL) so nothing is materialized until a page is requested; the pager
+        keeps a pooled connection checked out until it is exhausted or closed.
+        Other statements run on a plain cursor and are committed immediately;
+        rows they return (e.g. INSERT ... RETURNING, PRAGMA) are buffered.
+        With decode_geometry, binary geometry values (see _geometry_text) are
+        returned as WKT.
+        """
+        if not self.is_connected():
+            return None
+            
+        started = time.perf_counter()
+        decode = self._geometry_text if decode_geometry else None
+        connection = self.engine.connect()
+        try:
+            if statement_keyword(query) in STREAMED_STATEMENTS:
+                result = connection.execution_options(stream_results=True).execute(text(query))
+                if result.returns_rows:
+                    return QueryPager(connection, result, page_size, started, decode=decode)
+            else:
+                result = connection.execute(text(query))
+            rowcount = result.rowcount
+            # Buffer any returned rows so the statement can be committed now
+            rows = result.freeze()() if result.returns_rows else None
+            connection.commit()
+            connection.close()
+            if statement_keyword(query) in DDL_STATEMENTS:
+                self.metadata.invalidate()
+            return QueryPager(None, rows, page_size, started, rowcount, decode=decode)
+            
+        except Exception as e:
+            connection.close()
+            print(f"Query error: {str(e)}")
+            raise e
+            
+    def _geometry_text(self, value):
+        """WKT for binary geometry values: GeoPackage blobs (SQLite imports with
+        geometry_storage='binary') and SQL Server geometry/geography columns"""
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return geometry_encoding.geometry_text(value)
+        return value
+        
+    def open_geometry_query(self, table_name, column, column_type='geometry', page_size=10000):
+        """Open a QueryPager over one geometry or WKT column of a table.
+
+        Native geometry columns are fetched as WKB (ST_AsBinary/STAsBinary),
+        which is smaller and faster to parse than WKT. NULLs are skipped.
+        """
+        quote = '`' if self.db_type == 'MySQL' else '"'
+        table = quote_identifier(table_name, quote)
+        geom = quote_identifier(column, quote)
+        value = geom
+        if column_type == 'geometry':
+            value = f"{geom}.STAsBinary()" if self.db_type == 'SQL Server' else f"ST_AsBinary({geom})"
+        return self.open_query(f"SELECT {value} FROM {table} WHERE {geom} IS NOT NULL", page_size,
+                               decode_geometry=False)
+
     def execute_query(self, query):
         try:
             if not self.is_connected():
@@ -144,10 +1385,13 @@ class DatabaseManager:
                 
             if query.strip().upper().startswith('SELECT'):
                 result = pd.read_sql_query(query, self.engine)
-                return result.to_dict('records')
+                return [{key: self._geometry_text(value) for key, value in row.items()}
+                        for row in result.to_dict('records')]
             else:
-                self.connection.execute(query)
-                self.connection.commit()
+                with self.engine.begin() as connection:
+                    connection.execute(text(query))
+                if statement_keyword(query) in DDL_STATEMENTS:
+                    self.metadata.invalidate()
                 return []
                 
         except Exception as e:
@@ -155,29 +1399,64 @@ class DatabaseManager:
             raise e
             
     def get_tables(self):
+        """Table names, served from the metadata cache after the first call"""
         try:
             if not self.is_connected():
                 return []
                 
-            inspector = inspect(self.engine)
-            return inspector.get_table_names()
+            return self.metadata.table_names(lambda: self._user_tables(inspect(self.engine).get_table_names()))
             
         except Exception as e:
             print(f"Error getting tables: {str(e)}")
             return []
             
+    def _user_tables(self, table_names):
+        """Leave out the import checkpoint table and the SQLite R*Tree indexes _sqlite_rtree created"""
+        hidden = {import_jobs.CHECKPOINT_TABLE}
+        if self.db_type == 'SQLite':
+            hidden.update(self._sqlite_rtree_tables(table_names))
+        return [name for name in table_names if name not in hidden]
+        
+    def _sqlite_rtree_tables(self, table_names):
+        """Names of the R*Tree tables rtree_<table>_<column> built on the listed tables,
+        with their shadow tables"""
+        with self.engine.connect() as connection:
+            rtrees = [row[0] for row in connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE :definition"),
+                {'definition': f"CREATE VIRTUAL TABLE % USING {SQLITE_RTREE_COLUMNS}"})]
+        names = []
+        for rtree in rtrees:
+            shadows = [f"{rtree}_{suffix}" for suffix in ('node', 'parent', 'rowid')]
+            owners = set(table_names) - set(rtrees) - set(shadows)
+            if any(rtree.startswith(f"rtree_{table}_") for table in owners):
+                names += [rtree] + shadows
+        return names
+        
     def get_table_info(self, table_name):
+        """Columns of a table as returned by the SQLAlchemy inspector.
+
+        The first call loads the columns of every table in one pass
+        (get_multi_columns), later calls are served from the metadata cache.
+        """
         try:
             if not self.is_connected():
                 return []
                 
-            inspector = inspect(self.engine)
-            columns = inspector.get_columns(table_name)
-            return columns
+            return self.metadata.table_columns(table_name, self._load_all_columns,
+                                               lambda name: inspect(self.engine).get_columns(name))
             
         except Exception as e:
             print(f"Error getting table info: {str(e)}")
             return []
+            
+    def _load_all_columns(self):
+        """Columns of all tables of the default schema, keyed by table name"""
+        columns = inspect(self.engine).get_multi_columns()
+        return {table_name: table_columns for (schema, table_name), table_columns in columns.items()}
+        
+    def refresh_metadata(self):
+        """Forget the cached table names and columns, e.g. after other clients changed the schema"""
+        self.metadata.clear()
     
     def check_postgis_extension(self):
         """Check if PostGIS extension is available for PostgreSQL databases"""
@@ -185,39 +1464,42 @@ class DatabaseManager:
             return True
             
         try:
-            # First check if extension exists
-            result = self.connection.execute(text(
-                "SELECT COUNT(*) FROM pg_extension WHERE extname = 'postgis'"
-            ))
-            count = result.fetchone()[0]
-            
-            if count == 0:
-                # Try to create the extension
-                try:
-                    self.connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
-                    self.connection.commit()
-                except Exception as create_error:
-                    # If creation fails, check if we have superuser privileges
+            with self.engine.connect() as connection:
+                # First check if extension exists
+                result = connection.execute(text(
+                    "SELECT COUNT(*) FROM pg_extension WHERE extname = 'postgis'"
+                ))
+                count = result.fetchone()[0]
+            
+                if count == 0:
+                    # Try to create the extension
                     try:
-                        result = self.connection.execute(text(
-                            "SELECT current_user, usesuper FROM pg_user WHERE usename = current_user"
-                        ))
-                        user_info = result.fetchone()
-                        if not user_info[1]:  # Not a superuser
-                            print("\n" + "="*60)
-                            print("POSTGIS EXTENSION REQUIRED")
-                            print("="*60)
-                            print(f"\nCannot create PostGIS extension. User '{user_info[0]}' is not a superuser.")
-                            print("\nPostGIS is required for importing spatial data (shapefiles, GeoJSON, etc.)")
-                            print("\nTo enable PostGIS, please ask your database administrator to run:")
-                            print("\n   CREATE EXTENSION postgis;")
-                            print("\nAlternatively, connect as a superuser and run the enable_postgis.sql script:")
-                            print("   psql -U postgres -d your_database -f enable_postgis.sql")
-                            print("\n" + "="*60 + "\n")
-                            return False
-                    except:
-                        pass
-                    raise create_error
+                        connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+                        connection.commit()
+                        self.metadata.invalidate()
+                    except Exception as create_error:
+                        # If creation fails, check if we have superuser privileges
+                        connection.rollback()
+                        try:
+                            result = connection.execute(text(
+                                "SELECT current_user, usesuper FROM pg_user WHERE usename = current_user"
+                            ))
+                            user_info = result.fetchone()
+                            if not user_info[1]:  # Not a superuser
+                                print("\n" + "="*60)
+                                print("POSTGIS EXTENSION REQUIRED")
+                                print("="*60)
+                                print(f"\nCannot create PostGIS extension. User '{user_info[0]}' is not a superuser.")
+                                print("\nPostGIS is required for importing spatial data (shapefiles, GeoJSON, etc.)")
+                                print("\nTo enable PostGIS, please ask your database administrator to run:")
+                                print("\n   CREATE EXTENSION postgis;")
+                                print("\nAlternatively, connect as a superuser and run the enable_postgis.sql script:")
+                                print("   psql -U postgres -d your_database -f enable_postgis.sql")
+                                print("\n" + "="*60 + "\n")
+                                return False
+                        except:
+                            pass
+                        raise create_error
                 
             return True
             
@@ -243,8 +1525,10 @@ class DatabaseManager:
             
         try:
             # Try to create the extension
-            self.connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
-            self.connection.commit()
+            with self.engine.begin() as connection:
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+            # PostGIS adds spatial_ref_sys and the geometry type
+            self.metadata.invalidate()
             return True, "PostGIS extension enabled successfully!"
             
         except Exception as e:
@@ -254,61 +1538,187 @@ class DatabaseManager:
             else:
                 return False, f"Failed to enable PostGIS: {error_msg}"
     
-    def convert_wkt_to_geometry(self, table_name, wkt_column='geometry_wkt', geom_column='geometry', srid=4326):
-        """Convert WKT column to proper geometry column (requires PostGIS)"""
+    def convert_wkt_to_geometry(self, table_name, wkt_column='geometry_wkt', geom_column='geometry', srid=4326,
+                                batch_rows=CONVERT_BATCH_ROWS, workers=1, key_column=None,
+                                progress_callback=None, cancel_event=None):
+        """Convert WKT column to proper geometry column (requires PostGIS)
+
+        The rows are converted in batches of about batch_rows, each committed
+        on its own, so no lock is held for the whole table. Batches are key
+        ranges holding batch_rows rows each of a key_column (which should be
+        indexed) or, by default, ranges of the table's pages (ctid, a TID
+        range scan on PostgreSQL 14+; older servers convert in a single
+        batch). With workers > 1 batches run
+        in parallel on separate pooled connections. Only rows whose geometry
+        is still NULL are updated, so running the conversion again after a
+        failure or after cancel_event is set continues where it stopped. The
+        GiST index is built once, after the last batch.
+        progress_callback(current, total, status) reports the converted rows;
+        total is the table's estimated row count.
+        """
         if self.db_type != 'PostgreSQL':
             return False, "Geometry conversion is only available for PostgreSQL databases"
             
+        converted = 0
         try:
             # Check if PostGIS is available
             if not self.check_postgis_extension():
                 return False, "PostGIS extension is required for geometry conversion"
                 
+            table = quote_identifier(table_name)
+            wkt = quote_identifier(wkt_column)
+            geom = quote_identifier(geom_column)
+            
             # Add geometry column if it doesn't exist
-            self.connection.execute(text(
-                f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {geom_column} geometry(Geometry, {srid})"
-            ))
+            with self.engine.begin() as connection:
+                connection.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {geom} geometry(Geometry, {int(srid)})"
+                ))
+            self.metadata.invalidate(table_name)
             
-            # Update geometry column from WKT
-            self.connection.execute(text(
-                f"UPDATE {table_name} SET {geom_column} = ST_GeomFromText({wkt_column}, {srid}) WHERE {wkt_column} IS NOT NULL"
-            ))
+            batches, total_rows = self._conversion_batches(table_name, key_column, batch_rows)
+            update_sql = (f"UPDATE {table} SET {geom} = ST_GeomFromText({wkt}, {int(srid)}) "
+                          f"WHERE {wkt} IS NOT NULL AND {geom} IS NULL")
+            if progress_callback:
+                progress_callback(0, total_rows, f"Converting geometry in {len(batches):,} batches...")
+                
+            lock = threading.Lock()
             
-            # Create spatial index
-            self.connection.execute(text(
-                f"CREATE INDEX IF NOT EXISTS {table_name}_{geom_column}_idx ON {table_name} USING GIST ({geom_column})"
-            ))
+            def convert(batch):
+                nonlocal converted
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                condition, params = batch
+                with self.engine.begin() as connection:
+                    rows = connection.execute(text(update_sql + condition), params).rowcount
+                with lock:
+                    converted += rows
+                    done = converted
+                if progress_callback:
+                    total = self._progress_total(total_rows, done)
+                    progress_callback(done, total, f"Converting geometry... {done:,}/{total:,} rows")
+                    
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, int(workers)),
+                                    thread_name_prefix='wkt-convert') as executor:
+                futures = [executor.submit(convert, batch) for batch in batches]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            convert_seconds = time.perf_counter() - started
             
-            self.connection.commit()
+            if cancel_event is not None and cancel_event.is_set():
+                return False, (f"Conversion cancelled after {converted:,} rows; "
+                               f"run it again to convert the remaining rows")
+                
+            # Create spatial index
+            if progress_callback:
+                progress_callback(converted, self._progress_total(total_rows, converted),
+                                  "Building spatial index...")
+            started = time.perf_counter()
+            index = quote_identifier(f"{table_name}_{geom_column}_idx")
+            with self.engine.begin() as connection:
+                connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING GIST ({geom})"))
+                connection.execute(text(f"ANALYZE {table}"))
+            index_seconds = time.perf_counter() - started
             
             # Optionally drop the WKT column
-            # self.connection.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {wkt_column}"))
+            # connection.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {wkt_column}"))
             
-            return True, f"Successfully converted WKT to geometry column in table '{table_name}'"
+            return True, (f"Successfully converted WKT to geometry column in table '{table_name}' "
+                          f"({converted:,} rows in {convert_seconds:.1f}s, index built in {index_seconds:.1f}s)")
             
         except Exception as e:
-            return False, f"Failed to convert WKT to geometry: {str(e)}"
+            message = f"Failed to convert WKT to geometry: {str(e)}"
+            if converted:
+                message += f"\n\n{converted:,} rows were converted and committed; run it again to continue."
+            return False, message
+        finally:
+            self.metadata.invalidate(table_name)
+            
+    def _conversion_batches(self, table_name, key_column, batch_rows):
+        """Split a table into batches for convert_wkt_to_geometry.
+
+        Returns a list of (SQL condition, parameters) pairs to append to the
+        UPDATE's WHERE clause and the estimated number of rows in the table.
+        """
+        table = quote_identifier(table_name)
+        with self.engine.connect() as connection:
+            pages, estimate = connection.execute(text(
+                "SELECT pg_relation_size(to_regclass(:name)) / current_setting('block_size')::int, reltuples "
+                "FROM pg_class WHERE oid = to_regclass(:name)"
+            ), {'name': table}).one()
+            if estimate is None or estimate < 0:
+                # Never analyzed
+                estimate = connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            estimate = int(estimate)
+            
+            if key_column:
+                # Every batch_rows-th key is a batch boundary, so gaps and skew in
+                # the key values never produce empty or oversized batches
+                key = quote_identifier(key_column)
+                bounds = connection.execute(text(
+                    f"SELECT DISTINCT {key} FROM (SELECT {key}, "
+                    f"ROW_NUMBER() OVER (ORDER BY {key}) - 1 AS position "
+                    f"FROM {table} WHERE {key} IS NOT NULL) AS positions "
+                    f"WHERE position % :batch_rows = 0 ORDER BY {key}"
+                ), {'batch_rows': int(batch_rows)}).scalars().all()
+                if not bounds:
+                    return [], 0
+                batches = [(f" AND {key} >= :low AND {key} < :high", {'low': low, 'high': high})
+                           for low, high in zip(bounds, bounds[1:])]
+                batches.append((f" AND {key} >= :low", {'low': bounds[-1]}))
+                return batches, estimate
+                        
+            version = int(connection.execute(text("SHOW server_version_num")).scalar())
+            
+        if version < 140000 or pages <= 1:
+            return [('', {})], estimate
+            
+        rows_per_page = max(estimate / pages, 1.0)
+        step = max(1, int(batch_rows / rows_per_page))
+        # Updated rows move to pages past the initial end, which need no second pass
+        return [(" AND ctid >= CAST(:low AS tid) AND ctid < CAST(:high AS tid)",
+                 {'low': f"({start},0)", 'high': f"({min(start + step, pages)},0)"})
+                for start in range(0, pages, step)], estimate
     
     def get_spatial_tables(self):
-        """Get list of tables with spatial data (either geometry or WKT columns)"""
+        """Get list of tables with spatial data (either geometry or WKT columns).
+
+        The catalog is queried once; later calls are served from the metadata
+        cache until an import or conversion changes a table.
+        """
         try:
             if not self.is_connected():
                 return []
                 
-            tables_with_spatial = []
+            return self.metadata.spatial_columns(self._load_spatial_tables)
             
-            if self.db_type == 'PostgreSQL':
+        except Exception as e:
+            print(f"Error getting spatial tables: {str(e)}")
+            return []
+            
+    def _load_spatial_tables(self):
+        """Query the geometry and WKT columns of all tables"""
+        tables_with_spatial = []
+        
+        if self.db_type == 'PostgreSQL':
+            with self.engine.connect() as connection:
                 # Check for geometry columns
-                result = self.connection.execute(text(
+                result = connection.execute(text(
                     """
                     SELECT DISTINCT table_name, column_name, 'geometry' as type
                     FROM information_schema.columns 
                     WHERE data_type = 'USER-DEFINED' 
                     AND udt_name = 'geometry'
                     AND table_schema = 'public'
-                    
+                
                     UNION
-                    
+                
                     SELECT DISTINCT table_name, column_name, 'wkt' as type
                     FROM information_schema.columns 
                     WHERE column_name LIKE '%geometry_wkt%' 
@@ -317,7 +1727,7 @@ class DatabaseManager:
                     ORDER BY table_name
                     """
                 ))
-                
+            
                 for row in result:
                     tables_with_spatial.append({
                         'table': row[0],
@@ -325,25 +1735,377 @@ class DatabaseManager:
                         'type': row[2]
                     })
                     
-            return tables_with_spatial
+        return tables_with_spatial
+    
+    def _reduce_geometries(self, geodataframe, tolerance, grid_size, workers, progress_callback=None):
+        """Simplify/snap the geometries of a GeoDataFrame as the import's transform stage"""
+        total_rows = len(geodataframe)
+        if progress_callback:
+            progress_callback(0, total_rows, "Simplifying geometries...")
             
+        with self._span('transform', total_rows):
+            geodataframe, stats = geometry_reduction.reduce_frame(geodataframe, tolerance, grid_size,
+                                                                  workers=workers)
+        self.last_geometry_reduction = stats
+        for key in ('vertices_before', 'vertices_after', 'bytes_before', 'bytes_after'):
+            self._count(key, stats[key])
+            
+        summary = geometry_reduction.reduction_summary(stats)
+        print(f"Geometry reduction: {summary}")
+        if progress_callback:
+            progress_callback(0, total_rows, f"Reduced geometries: {summary}")
+        return geodataframe
+        
+    def _stored_geometry_column(self, geodataframe):
+        """Name of the column import_spatial_data stores a GeoDataFrame's geometry in"""
+        name = geodataframe.geometry.name
+        if self.db_type == 'PostgreSQL':
+            return 'geom' if name == 'geometry' else name
+        if self.db_type == 'MySQL':
+            return 'geometry'
+        return name
+        
+    def build_spatial_index(self, table_name, geom_column, progress_callback=None, total_rows=0,
+                            add_primary_key=False):
+        """Create the backend's spatial index on a geometry column unless it already has one.
+
+        PostGIS gets a GIST index and MySQL a SPATIAL INDEX (the column must be
+        NOT NULL, so tables with rows without geometry get none). SQL Server
+        gets an auto-grid index over the extent of the data; spatial indexes
+        need a clustered primary key, so a table without one gets no index
+        unless add_primary_key adds an identity column _spatial_id as one.
+        SQLite has no geometry type, so the bounding box of every row goes into
+        an R*Tree virtual table rtree_<table>_<column> keyed by rowid, which
+        triggers keep in step with later inserts, updates and deletes.
+        Returns the build time in seconds, or None if no index was built; why
+        the index could not be built is kept in last_spatial_index_error.
+        """
+        started = time.perf_counter()
+        self._local.spatial_index_error = None
+        if progress_callback:
+            progress_callback(total_rows, total_rows, "Building spatial index...")
+            
+        try:
+            with self._span('index'):
+                if self.db_type == 'PostgreSQL':
+                    built = self._postgis_index(table_name, geom_column)
+                elif self.db_type == 'MySQL':
+                    built = self._mysql_spatial_index(table_name, geom_column)
+                elif self.db_type == 'SQL Server':
+                    built = self._mssql_spatial_index(table_name, geom_column, add_primary_key)
+                else:
+                    built = self._sqlite_rtree(table_name, geom_column)
         except Exception as e:
-            print(f"Error getting spatial tables: {str(e)}")
-            return []
+            self._local.spatial_index_error = str(e)
+            print(f"Spatial index not created: {str(e)}")
+            if progress_callback:
+                progress_callback(total_rows, total_rows, f"Spatial index not created: {str(e)}")
+            return None
+            
+        seconds = time.perf_counter() - started
+        if progress_callback:
+            progress_callback(total_rows, total_rows, f"Spatial index built in {seconds:.1f}s" if built
+                              else "No spatial index to build")
+        return seconds if built else None
+        
+    def _postgis_index(self, table_name, geom_column):
+        table = quote_identifier(table_name)
+        geom = quote_identifier(geom_column)
+        with self.engine.begin() as connection:
+            indexed = connection.execute(text(
+                """
+                SELECT udt_name = 'geometry' AS is_geometry,
+                       EXISTS (SELECT 1 FROM pg_index i
+                               JOIN pg_class c ON c.oid = i.indexrelid
+                               JOIN pg_am am ON am.oid = c.relam
+                               JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                               WHERE i.indrelid = to_regclass(:table) AND am.amname = 'gist'
+                               AND a.attname = :column) AS indexed
+                FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = :name AND column_name = :column
+                """
+            ), {'table': table, 'name': table_name, 'column': geom_column}).first()
+            if indexed is None or not indexed.is_geometry or indexed.indexed:
+                # Geometry stored as WKT text (no PostGIS) is indexed by convert_wkt_to_geometry
+                return False
+            index = quote_identifier(f"{table_name}_{geom_column}_idx")
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING GIST ({geom})"))
+            connection.execute(text(f"ANALYZE {table}"))
+        return True
+        
+    def _mysql_spatial_index(self, table_name, geom_column):
+        with self.engine.begin() as connection:
+            exists = connection.execute(text(
+                "SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                "AND table_name = :name AND column_name = :column AND index_type = 'SPATIAL'"
+            ), {'name': table_name, 'column': geom_column}).scalar()
+            if exists:
+                return False
+            nullable = connection.execute(text(
+                "SELECT is_nullable FROM information_schema.columns WHERE table_schema = DATABASE() "
+                "AND table_name = :name AND column_name = :column"
+            ), {'name': table_name, 'column': geom_column}).scalar()
+            if nullable == 'YES':
+                missing = connection.execute(text(
+                    f"SELECT COUNT(*) FROM {quote_identifier(table_name, '`')} "
+                    f"WHERE {quote_identifier(geom_column, '`')} IS NULL")).scalar()
+                raise ValueError(f"MySQL spatial indexes need a NOT NULL geometry column, and "
+                                 f"{missing:,} rows of {table_name} have no geometry")
+            index = quote_identifier(f"{table_name}_{geom_column}_idx", '`')
+            connection.execute(text(f"ALTER TABLE {quote_identifier(table_name, '`')} "
+                                    f"ADD SPATIAL INDEX {index} ({quote_identifier(geom_column, '`')})"))
+        return True
+        
+    def _mssql_spatial_index(self, table_name, geom_column, add_primary_key=False):
+        table = quote_identifier(table_name)
+        geom = quote_identifier(geom_column)
+        with self.engine.begin() as connection:
+            # sys.indexes type: 1 = clustered, 4 = spatial
+            indexes = connection.execute(text(
+                "SELECT type, is_primary_key FROM sys.indexes WHERE object_id = OBJECT_ID(:name)"),
+                {'name': table_name}).all()
+            if any(index.type == 4 for index in indexes):
+                return False
+            if not any(index.type == 1 and index.is_primary_key for index in indexes):
+                if not add_primary_key:
+                    raise ValueError(f"SQL Server spatial indexes need a clustered primary key and "
+                                     f"{table_name} has none; add one and call build_spatial_index "
+                                     f"again, or pass add_primary_key=True to add _spatial_id")
+                connection.execute(text(
+                    f"ALTER TABLE {table} ADD _spatial_id BIGINT IDENTITY(1,1) NOT NULL "
+                    f"CONSTRAINT {quote_identifier(f'pk_{table_name}')} PRIMARY KEY CLUSTERED"))
+                    
+            # The grid covers the extent of the loaded data
+            extent = connection.execute(text(
+                f"SELECT e.g.STPointN(1).STX, e.g.STPointN(1).STY, e.g.STPointN(3).STX, e.g.STPointN(3).STY "
+                f"FROM (SELECT geometry::EnvelopeAggregate({geom}) AS g FROM {table}) AS e")).first()
+            if extent is None or extent[0] is None:
+                return False
+            minx, miny, maxx, maxy = extent
+            pad = max(maxx - minx, maxy - miny, 1.0) * 0.01
+            index = quote_identifier(f"{table_name}_{geom_column}_idx")
+            connection.execute(text(
+                f"CREATE SPATIAL INDEX {index} ON {table} ({geom}) USING GEOMETRY_AUTO_GRID "
+                f"WITH (BOUNDING_BOX = ({minx - pad}, {miny - pad}, {maxx + pad}, {maxy + pad}))"))
+        return True
+        
+    def _sqlite_rtree(self, table_name, geom_column):
+        table = quote_identifier(table_name)
+        geom = quote_identifier(geom_column)
+        name = f"rtree_{table_name}_{geom_column}"
+        rtree = quote_identifier(name)
+        triggers = {f"{name}_{change}" for change in ('insert', 'update', 'delete')}
+        with self.engine.begin() as connection:
+            existing = {row[0] for row in connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"),
+                {'table': table_name})}
+            if triggers <= existing:
+                # Kept in step by its triggers since it was built
+                return False
+                
+            # The table was recreated (dropping the triggers) or never indexed.
+            # Recreating is much faster than deleting the entries of an R*Tree
+            for trigger in triggers:
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {quote_identifier(trigger)}"))
+            connection.execute(text(f"DROP TABLE IF EXISTS {rtree}"))
+            connection.execute(text(f"CREATE VIRTUAL TABLE {rtree} USING {SQLITE_RTREE_COLUMNS}"))
+            result = connection.execute(text(f"SELECT rowid, {geom} FROM {table} WHERE {geom} IS NOT NULL"))
+            while True:
+                rows = result.fetchmany(CONVERT_BATCH_ROWS)
+                if not rows:
+                    break
+                ids, values = zip(*rows)
+                # GeoPackage blobs carry their envelope; WKT is parsed
+                bounds = geometry_encoding.geometry_bounds(values)
+                present = ~np.isnan(bounds[:, 0])
+                minx, miny, maxx, maxy = bounds[present].T.tolist()
+                entries = list(zip(np.asarray(ids)[present].tolist(), minx, maxx, miny, maxy))
+                connection.exec_driver_sql(f"INSERT INTO {rtree} VALUES (?, ?, ?, ?, ?)", entries)
+                
+            # Sync triggers as in the GeoPackage R*Tree extension, calling the standard
+            # GeoPackage functions (see register_sqlite_functions)
+            entry = lambda row: (f"{row}.rowid, ST_MinX({row}.{geom}), ST_MaxX({row}.{geom}), "
+                                 f"ST_MinY({row}.{geom}), ST_MaxY({row}.{geom})")
+            present = f"NEW.{geom} NOT NULL AND NOT ST_IsEmpty(NEW.{geom})"
+            connection.execute(text(
+                f"CREATE TRIGGER {quote_identifier(name + '_insert')} AFTER INSERT ON {table} "
+                f"WHEN ({present}) "
+                f"BEGIN INSERT OR REPLACE INTO {rtree} VALUES ({entry('NEW')}); END"))
+            connection.execute(text(
+                f"CREATE TRIGGER {quote_identifier(name + '_update')} AFTER UPDATE ON {table} "
+                f"WHEN OLD.rowid IS NOT NEW.rowid OR OLD.{geom} IS NOT NEW.{geom} "
+                f"BEGIN DELETE FROM {rtree} WHERE id = OLD.rowid; "
+                f"INSERT OR REPLACE INTO {rtree} SELECT {entry('NEW')} WHERE {present}; END"))
+            connection.execute(text(
+                f"CREATE TRIGGER {quote_identifier(name + '_delete')} AFTER DELETE ON {table} "
+                f"BEGIN DELETE FROM {rtree} WHERE id = OLD.rowid; END"))
+        return True
+        
+    def _insert_mysql_spatial(self, geodataframe, table_name, srid, progress_callback=None):
+        """Load attributes and geometry together with batched multi-row INSERTs (MySQL).
+
+        Batches are sized by an AdaptiveBatchSizer, so large polygons stay
+        within max_allowed_packet while small points are sent in large batches.
+        """
+        total_rows = len(geodataframe)
+        geom_col = geodataframe.geometry.name
+        attribute_cols = [col for col in geodataframe.columns if col != geom_col]
+        
+        if progress_callback:
+            progress_callback(0, total_rows, "Creating table structure...")
+            
+        # Create the attribute columns with pandas, then add the geometry column
+        self._create_table(pd.DataFrame(geodataframe[attribute_cols]), table_name)
+        
+        column_list = ', '.join(f"`{col}`" for col in attribute_cols + ['geometry'])
+        row_placeholder = '(' + ', '.join(['%s'] * len(attribute_cols) + [f"ST_GeomFromWKB(%s, {int(srid)})"]) + ')'
+        
+        # A SPATIAL INDEX needs a NOT NULL column, and an SRID attribute (MySQL 8) to be used
+        column_type = "GEOMETRY"
+        if not (geodataframe.geometry.isna() | geodataframe.geometry.is_empty).any():
+            column_type += f" NOT NULL SRID {int(srid)}"
+            
+        raw_connection = self.engine.raw_connection()
+        try:
+            cursor = raw_connection.cursor()
+            try:
+                cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN geometry {column_type}")
+            except Exception as e:
+                if 'SRID' not in column_type:
+                    raise
+                # Servers without SRID-restricted columns (MySQL 5.7, MariaDB)
+                print(f"SRID column not supported ({str(e)}), adding a NOT NULL GEOMETRY column")
+                cursor.execute(f"ALTER TABLE `{table_name}` ADD COLUMN geometry GEOMETRY NOT NULL")
+            
+            sizer = self._insert_sizer(geodataframe)
+            rows_processed = 0
+            for batch in batch_sizing.split_adaptive(geodataframe, sizer):
+                started = time.perf_counter()
+                
+                with self._span('encode'):
+                    # astype(object) turns NumPy scalars into Python values the driver can bind
+                    attributes = batch[attribute_cols].astype(object)
+                    attributes = attributes.where(attributes.notna(), None)
+                    wkb_values = geometry_encoding.encode_geometries(batch.geometry.values, 'wkb')
+                    
+                    params = []
+                    for values, wkb in zip(attributes.itertuples(index=False, name=None), wkb_values):
+                        params.extend(values)
+                        params.append(wkb)
+                        
+                with self._span('execute', len(batch)):
+                    cursor.execute(
+                        f"INSERT INTO `{table_name}` ({column_list}) VALUES "
+                        + ', '.join([row_placeholder] * len(batch)),
+                        params
+                    )
+                sizer.record(len(batch), time.perf_counter() - started)
+                self._written(batch)
+                rows_processed += len(batch)
+                
+                if progress_callback:
+                    progress_callback(rows_processed, total_rows,
+                                      f"Inserting spatial data... {rows_processed}/{total_rows} "
+                                      f"({sizer.describe()})")
+                    
+            with self._span('commit'):
+                raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            raise
+        finally:
+            raw_connection.close()
     
-    def import_spatial_data(self, geodataframe, table_name, geom_col='geometry', srid=None, progress_callback=None):
-        """Import spatial data from a GeoDataFrame to the database"""
+    @instrumented
+    @changes_table
+    def import_spatial_data(self, geodataframe, table_name, geom_col='geometry', srid=None, progress_callback=None,
+                            rounding_precision=None, sqlite_pragmas=False, mode='replace', key_columns=None,
+                            job_id=None, resume=False, simplify_tolerance=None, grid_size=None,
+                            reduce_workers=1, spatial_index=True, geometry_storage='text'):
+        """Import spatial data from a GeoDataFrame to the database
+
+        rounding_precision limits the decimal places written when geometry is
+        stored as WKT text (default: full precision); SQL Server receives WKB.
+        sqlite_pragmas enables the relaxed load-time settings of the SQLite
+        bulk path. mode and key_columns work as in import_data; appends and
+        upserts into an existing table load a staging table first.
+        job_id and resume make the import resumable as in import_data.
+        simplify_tolerance and grid_size reduce the geometries before loading
+        (topology-preserving simplification, coordinate snapping; in CRS
+        units) on reduce_workers threads; the vertex and byte counts before
+        and after are kept in last_geometry_reduction.
+        spatial_index builds the backend's spatial index after the load (see
+        build_spatial_index), timed as the import's index stage; when it cannot
+        be built the import still succeeds and last_spatial_index_error says why.
+        geometry_storage='binary' stores SQLite geometries as GeoPackage WKB
+        blobs (SRID and envelope header) instead of WKT text ('text'). The
+        other backends always use their native geometry types (PostgreSQL
+        falls back to WKT text without PostGIS).
+        """
+        self._local.spatial_index_error = None
+        total_rows = len(geodataframe)
         try:
             if not self.is_connected():
                 return False
                 
+            if simplify_tolerance or grid_size:
+                geodataframe = self._reduce_geometries(geodataframe, simplify_tolerance, grid_size,
+                                                       reduce_workers, progress_callback)
+                
             # Detect SRID if not provided
             if srid is None and geodataframe.crs:
                 srid = geodataframe.crs.to_epsg() or 4326
             elif srid is None:
                 srid = 4326
                 
-            total_rows = len(geodataframe)
+            if job_id:
+                self._check_mode(mode, key_columns, False)
+                
+                def write_chunk(chunk, target):
+                    if not self.import_spatial_data(chunk, target, geom_col, srid, None,
+                                                    rounding_precision, sqlite_pragmas,
+                                                    spatial_index=False,
+                                                    geometry_storage=geometry_storage):
+                        raise RuntimeError(f"Could not load rows into {target}")
+                        
+                rows = self._checkpointed_load(
+                    self._split_frame(geodataframe, import_jobs.CHECKPOINT_ROWS), table_name,
+                    job_id, resume, mode, key_columns, write_chunk, total_rows, progress_callback)
+                if progress_callback:
+                    progress_callback(rows, rows, "Spatial import completed")
+                if spatial_index:
+                    self.build_spatial_index(table_name, self._stored_geometry_column(geodataframe),
+                                             progress_callback, rows)
+                return True
+                
+            if mode != 'replace':
+                self._check_mode(mode, key_columns, False)
+                exists = self._has_table(table_name)
+                load_table = table_name
+                if exists:
+                    load_table = f"{table_name}{STAGING_SUFFIX}"
+                    geodataframe = self._numbered(geodataframe)
+                elif mode == 'upsert':
+                    # The new table gets the rows a merge would keep
+                    geodataframe = self._last_per_key(geodataframe, key_columns)
+                    total_rows = len(geodataframe)
+                try:
+                    if not self.import_spatial_data(geodataframe, load_table, geom_col, srid,
+                                                    progress_callback, rounding_precision,
+                                                    sqlite_pragmas, spatial_index=False,
+                                                    geometry_storage=geometry_storage):
+                        raise RuntimeError(f"Could not load rows into {load_table}")
+                    self._finish_load(table_name, load_table, mode, key_columns, progress_callback,
+                                      total_rows)
+                except Exception:
+                    self._drop_table(load_table)
+                    raise
+                if progress_callback:
+                    progress_callback(total_rows, total_rows, "Spatial import completed")
+                if spatial_index:
+                    self.build_spatial_index(table_name, self._stored_geometry_column(geodataframe),
+                                             progress_callback, total_rows)
+                return True
             
             if self.db_type == 'PostgreSQL':
                 if progress_callback:
@@ -356,31 +2118,16 @@ class DatabaseManager:
                     if progress_callback:
                         progress_callback(0, total_rows, "PostGIS not available, using alternative method...")
                     
-                    # Convert geometry to WKT and import as text
-                    gdf_copy = geodataframe.copy()
-                    
-                    # Get the geometry column (might be named 'geometry' or might be the active geometry)
-                    geom_col = gdf_copy.geometry.name
-                    
-                    # Create WKT column from geometry
-                    gdf_copy['geometry_wkt'] = gdf_copy[geom_col].apply(
-                        lambda geom: geom.wkt if geom else None
+                    # Replace the active geometry column with a WKT text column
+                    wkt_frame = self._timed(
+                        'encode', geometry_encoding.encoded_frame,
+                        geodataframe, column='geometry_wkt', rounding_precision=rounding_precision
                     )
                     
-                    # Drop the geometry column
-                    gdf_copy = gdf_copy.drop(columns=[geom_col])
-                    
                     if progress_callback:
                         progress_callback(0, total_rows, "Creating table...")
                         
-                    gdf_copy.to_sql(
-                        name=table_name,
-                        con=self.engine,
-                        if_exists='replace',
-                        index=False,
-                        method='multi',
-                        chunksize=1000
-                    )
+                    self._insert_chunks([wkt_frame], table_name, total_rows, progress_callback)
                     
                     if progress_callback:
                         progress_callback(total_rows, total_rows, "Import completed (geometry as text)")
@@ -393,19 +2140,24 @@ class DatabaseManager:
                     
                     # Fix the duplicate geometry column issue
                     # Rename the geometry column if it exists to avoid conflicts
-                    gdf_for_import = geodataframe.copy()
+                    gdf_for_import = geodataframe
                     if 'geometry' in gdf_for_import.columns:
-                        # Ensure geometry column has a proper name
+                        # Ensure geometry column has a proper name (returns a new frame)
                         gdf_for_import = gdf_for_import.rename_geometry('geom')
                         
-                    gdf_for_import.to_postgis(
-                        name=table_name,
-                        con=self.engine,
-                        if_exists='replace',
-                        index=False,
-                        chunksize=1000,
-                        dtype={'geom': Geometry(srid=srid)}  # Explicitly set geometry type
-                    )
+                    from geoalchemy2 import Geometry
+                    
+                    with self._span('execute', total_rows):
+                        gdf_for_import.to_postgis(
+                            name=table_name,
+                            con=self.engine,
+                            if_exists='replace',
+                            index=False,
+                            chunksize=self._insert_rows(gdf_for_import),
+                            # The index is built after the load (build_spatial_index)
+                            dtype={'geom': Geometry(srid=srid, spatial_index=False)}
+                        )
+                    self._written(gdf_for_import)
                     
                     if progress_callback:
                         progress_callback(total_rows, total_rows, "Spatial import completed")
@@ -429,35 +2181,21 @@ class DatabaseManager:
                         print("\n" + "="*60 + "\n")
                     
                     print("Falling back to WKT format...")
+                    self._count('retries')
                     
                     if progress_callback:
                         progress_callback(0, total_rows, "PostGIS failed, using WKT format...")
                     
-                    # Convert geometry to WKT and import as text
-                    gdf_copy = geodataframe.copy()
-                    
-                    # Get the geometry column (might be named 'geometry' or might be the active geometry)
-                    geom_col = gdf_copy.geometry.name
-                    
-                    # Create WKT column from geometry
-                    gdf_copy['geometry_wkt'] = gdf_copy[geom_col].apply(
-                        lambda geom: geom.wkt if geom else None
+                    # Replace the active geometry column with a WKT text column
+                    wkt_frame = self._timed(
+                        'encode', geometry_encoding.encoded_frame,
+                        geodataframe, column='geometry_wkt', rounding_precision=rounding_precision
                     )
                     
-                    # Drop the geometry column
-                    gdf_copy = gdf_copy.drop(columns=[geom_col])
-                    
                     if progress_callback:
                         progress_callback(0, total_rows, "Creating table with WKT...")
                         
-                    gdf_copy.to_sql(
-                        name=table_name,
-                        con=self.engine,
-                        if_exists='replace',
-                        index=False,
-                        method='multi',
-                        chunksize=1000
-                    )
+                    self._insert_chunks([wkt_frame], table_name, total_rows, progress_callback)
                     
                     if progress_callback:
                         progress_callback(total_rows, total_rows, "Import completed (geometry as WKT)")
@@ -466,28 +2204,23 @@ class DatabaseManager:
                 if progress_callback:
                     progress_callback(0, total_rows, "Preparing SQLite spatial data...")
                     
-                # For SQLite with SpatiaLite
-                gdf_copy = geodataframe.copy()
-                
-                # Get the geometry column
-                geom_col = gdf_copy.geometry.name
-                
-                # Convert geometry to WKT
-                gdf_copy[geom_col] = gdf_copy[geom_col].apply(
-                    lambda geom: geom.wkt if geom else None
-                )
+                sql_types = None
+                if geometry_storage == 'binary':
+                    # GeoPackage blobs: SRID and envelope header followed by WKB
+                    encoded = self._timed('encode', geometry_encoding.encoded_frame,
+                                          geodataframe, encoding='gpkg', srid=srid)
+                    sql_types = {geodataframe.geometry.name: LargeBinary()}
+                else:
+                    # Without SpatiaLite, store the geometry column as WKT
+                    encoded = self._timed('encode', geometry_encoding.encoded_frame,
+                                          geodataframe, rounding_precision=rounding_precision)
                 
                 if progress_callback:
                     progress_callback(0, total_rows, "Creating table...")
                     
-                gdf_copy.to_sql(
-                    name=table_name,
-                    con=self.engine,
-                    if_exists='replace',
-                    index=False,
-                    method='multi',
-                    chunksize=1000
-                )
+                chunks = self._split_frame(encoded, self._bulk_rows(encoded))
+                self._sqlite_chunks(chunks, table_name, total_rows, progress_callback, sqlite_pragmas,
+                                    sql_types)
                 
                 if progress_callback:
                     progress_callback(total_rows, total_rows, "Import completed")
@@ -497,45 +2230,8 @@ class DatabaseManager:
                     progress_callback(0, total_rows, "Preparing MySQL spatial data...")
                     
                 # For MySQL with spatial support
-                gdf_copy = geodataframe.copy()
-                
-                # First create the table without geometry
-                non_geom_cols = [col for col in gdf_copy.columns if col != 'geometry']
+                self._insert_mysql_spatial(geodataframe, table_name, srid, progress_callback)
                 
-                if progress_callback:
-                    progress_callback(0, total_rows, "Creating table structure...")
-                    
-                gdf_copy[non_geom_cols].to_sql(
-                    name=table_name,
-                    con=self.engine,
-                    if_exists='replace',
-                    index=False,
-                    method='multi',
-                    chunksize=1000
-                )
-                
-                # Add geometry column
-                if progress_callback:
-                    progress_callback(0, total_rows, "Adding geometry column...")
-                    
-                self.connection.execute(text(
-                    f"ALTER TABLE {table_name} ADD COLUMN geometry GEOMETRY"
-                ))
-                
-                # Insert geometry values in batches
-                batch_size = 100
-                for i in range(0, total_rows, batch_size):
-                    if progress_callback:
-                        progress_callback(i, total_rows, f"Inserting geometry data... {i}/{total_rows}")
-                        
-                    batch = geodataframe.iloc[i:i+batch_size]
-                    for idx, row in batch.iterrows():
-                        if row['geometry']:
-                            self.connection.execute(text(
-                                f"UPDATE {table_name} SET geometry = ST_GeomFromText('{row['geometry'].wkt}', {srid}) "
-                                f"WHERE {non_geom_cols[0]} = :val"
-                            ), {'val': row[non_geom_cols[0]]})
-                            
                 if progress_callback:
                     progress_callback(total_rows, total_rows, "Spatial import completed")
                         
@@ -543,27 +2239,23 @@ class DatabaseManager:
                 if progress_callback:
                     progress_callback(0, total_rows, "Preparing SQL Server spatial data...")
                     
-                # For SQL Server with spatial support
-                gdf_copy = geodataframe.copy()
-                gdf_copy['geometry'] = gdf_copy['geometry'].apply(
-                    lambda geom: geom.wkt if geom else None
-                )
+                # Stream the geometry as WKB into a native geometry column
+                wkb_frame = self._timed('encode', geometry_encoding.encoded_frame,
+                                        geodataframe, encoding='wkb')
                 
                 if progress_callback:
                     progress_callback(0, total_rows, "Creating table...")
                     
-                gdf_copy.to_sql(
-                    name=table_name,
-                    con=self.engine,
-                    if_exists='replace',
-                    index=False,
-                    method='multi',
-                    chunksize=1000
-                )
+                chunks = self._split_frame(wkb_frame, self._bulk_rows(wkb_frame))
+                self._mssql_chunks(chunks, table_name, total_rows, progress_callback,
+                                   geometry_column=geodataframe.geometry.name, srid=srid)
                 
                 if progress_callback:
-                    progress_callback(total_rows, total_rows, "Import completed")
+                    progress_callback(total_rows, total_rows, "Spatial import completed")
                 
+            if spatial_index:
+                self.build_spatial_index(table_name, self._stored_geometry_column(geodataframe),
+                                         progress_callback, total_rows)
             return True
             
         except Exception as e:
@@ -0,0 +1,183 @@
+"""
+Readers for import source files with projection and filter pushdown.
+
+Only the selected columns are decoded: CSV files are parsed with usecols and
+spatial files are read with a column list, so the reader skips the other
+fields instead of the importer dropping them afterwards. Spatial files can
+also be filtered by a bounding box and an attribute WHERE clause (OGR SQL),
+both evaluated by the driver while reading. Where they are installed, the
+vectorized pyogrio engine (with Arrow transfer if pyarrow is available) reads
+spatial files. CSV files are parsed with pandas' C parser everywhere (preview,
+schema sampling, chunks and whole files), so a file gets the same column
+types on every import path; pyarrow's multithreaded parser can be chosen for
+whole-file reads (read_csv engine='pyarrow'), at the cost of its own dtype
+inference for dates and missing values.
+
+CSV files have no SQL driver; their row filter is a pandas query expression
+(e.g. "amount > 100 and region == 'north'") applied to each chunk as it is read.
+
+peek_csv and peek_spatial read only the first rows of a file plus what the
+file's metadata tells without a scan (layer schema, CRS, feature count,
+extent; an estimated row count for CSV), so a preview is shown right away and
+the file is read in full only when it is imported.
+"""
+import importlib.util
+import os
+import re
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+gpd = lazy_import('geopandas')
+
+
+def has_module(name):
+    """Return True if a module can be imported (without importing it)"""
+    return importlib.util.find_spec(name) is not None
+
+
+def spatial_engine_options():
+    """read_file keywords selecting pyogrio (with Arrow if pyarrow is installed), else the default engine"""
+    if has_module('pyogrio'):
+        return {'engine': 'pyogrio', 'use_arrow': has_module('pyarrow')}
+    return {}
+
+
+def parse_bbox(text):
+    """Parse 'minx,miny,maxx,maxy' into a tuple of floats; empty text gives None"""
+    if not text or not text.strip():
+        return None
+    try:
+        bbox = tuple(float(value) for value in text.replace(' ', '').split(','))
+    except ValueError:
+        raise ValueError(f"Invalid bounding box: {text}")
+    if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+        raise ValueError(f"A bounding box needs minx,miny,maxx,maxy: {text}")
+    return bbox
+
+
+def read_spatial(path, columns=None, bbox=None, where=None, rows=None):
+    """Read a shapefile, GeoPackage or GeoJSON file into a GeoDataFrame.
+
+    columns lists the attribute columns to read (the geometry is always
+    read; None reads all, names missing from the file are skipped). Only
+    features intersecting bbox (minx, miny, maxx, maxy in the file's CRS) and
+    matching the OGR SQL where clause are returned, and rows limits the
+    number of features.
+    """
+    if columns is not None:
+        columns = [col for col in columns if col != 'geometry']
+    data = gpd.read_file(path, columns=columns, bbox=tuple(bbox) if bbox else None,
+                         where=where or None, rows=rows, **spatial_engine_options())
+    if columns is None:
+        return data
+    # The driver returns the file's column order
+    return data[[col for col in columns if col in data.columns] + [data.geometry.name]]
+
+
+def filter_rows(dataframe, where):
+    """Apply a pandas query expression to a DataFrame (no-op without one)"""
+    if not where:
+        return dataframe
+    return dataframe.query(where)
+
+
+def _read_columns(path, columns, where):
+    """The columns to parse: the selected ones plus those the row filter refers to"""
+    if columns is None or not where:
+        return columns
+    header = pd.read_csv(path, nrows=0).columns
+    referenced = [col for col in header if col not in columns and (
+        f"`{col}`" in where or re.search(rf"(?<![\w.]){re.escape(str(col))}(?!\w)", where))]
+    return list(columns) + referenced
+
+
+def read_csv(path, columns=None, where=None, nrows=None, engine=None):
+    """Read the selected columns of a CSV file, keeping the rows matching where.
+
+    engine='pyarrow' parses the whole file with pyarrow (not with nrows);
+    the default C parser infers the same dtypes as iter_csv and peek_csv.
+    """
+    options = {'usecols': _read_columns(path, columns, where)}
+    if nrows is not None:
+        options['nrows'] = nrows
+    elif engine:
+        options['engine'] = engine
+    dataframe = filter_rows(pd.read_csv(path, **options), where)
+    # usecols keeps the file's column order
+    return dataframe[list(columns)] if columns is not None else dataframe
+
+
+def iter_csv(path, columns=None, where=None, chunksize=100000):
+    """Yield DataFrame chunks of the selected columns of a CSV file, keeping the rows matching where"""
+    reader = pd.read_csv(path, usecols=_read_columns(path, columns, where), chunksize=chunksize)
+    for chunk in reader:
+        chunk = filter_rows(chunk, where)
+        yield chunk[list(columns)] if columns is not None else chunk
+
+
+def estimate_csv_rows(path, sample_bytes=1 << 20):
+    """Estimate the number of data rows in a CSV file from a leading sample"""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            sample = f.read(sample_bytes)
+        lines = sample.count(b'\n')
+        if lines == 0 or len(sample) >= file_size:
+            return max(lines - 1, 0)
+        return int(file_size / (len(sample) / lines)) - 1
+    except OSError:
+        return None
+
+
+def peek_csv(path, rows=1000):
+    """Read the header and the first rows of a CSV file.
+
+    Returns a dict with the rows read ('data'), whether they are the whole
+    file ('complete') and the (estimated) number of rows ('rows').
+    """
+    data = pd.read_csv(path, nrows=rows + 1)
+    complete = len(data) <= rows
+    return {
+        'data': data.head(rows),
+        'complete': complete,
+        'rows': len(data) if complete else estimate_csv_rows(path),
+    }
+
+
+def spatial_info(path):
+    """Layer metadata of a spatial file: 'fields', 'crs', 'geometry_type', 'features' and
+    'bounds' (None where the driver cannot tell without reading every feature)"""
+    if has_module('pyogrio'):
+        import pyogrio
+        info = pyogrio.read_info(path)
+        features = int(info.get('features', -1))
+        bounds = info.get('total_bounds')
+        return {
+            'fields': list(info['fields']),
+            'crs': info.get('crs'),
+            'geometry_type': info.get('geometry_type'),
+            'features': features if features >= 0 else None,
+            'bounds': tuple(bounds) if bounds is not None else None,
+        }
+    import fiona
+    with fiona.open(path) as source:
+        return {
+            'fields': list(source.schema['properties']),
+            'crs': source.crs.to_string() if source.crs else None,
+            'geometry_type': source.schema.get('geometry'),
+            'features': len(source),
+            'bounds': tuple(source.bounds),
+        }
+
+
+def peek_spatial(path, rows=1000):
+    """Read the first features of a spatial file and its layer metadata.
+
+    Returns spatial_info's dict plus the features read ('data') and whether
+    they are the whole layer ('complete').
+    """
+    info = spatial_info(path)
+    data = read_spatial(path, rows=rows)
+    info.update(data=data, complete=info['features'] is not None and len(data) >= info['features'])
+    return info
@@ -0,0 +1,307 @@
+"""
+Vectorized geometry serialization shared by the spatial import paths.
+
+decode_geometries does the reverse for values read back from a database.
+
+Geometries are converted with shapely's array functions (to_wkt/to_wkb)
+instead of a Python-level loop per feature, and attribute columns are passed
+through without copying the whole GeoDataFrame.
+
+Besides WKT and WKB, geometries can be written as GeoPackage geometry blobs
+(the 'gpkg' encoding): a small header with the SRID and the envelope
+followed by the WKB. SQLite stores these instead of WKT text, and the
+envelope lets the R*Tree index be filled without parsing the geometry.
+SQL Server's own geometry serialization, which drivers return for native
+geometry columns, is decoded by decode_sqlserver_geometry.
+"""
+import functools
+import struct
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+def geometry_values(geometries):
+    """Return geometries as a NumPy object array with empty geometries set to None"""
+    values = np.asarray(geometries, dtype=object)
+    if values.ndim == 0:
+        values = values.reshape(1)
+    # Keep the old `geom.wkt if geom else None` semantics: empty geometries become NULL
+    empty = shapely.is_empty(values)
+    if empty.any():
+        values = values.copy()
+        values[empty] = None
+    return values
+
+
+def encode_geometries(geometries, encoding='wkt', rounding_precision=None, hex=False,
+                      srid=None):
+    """Serialize an array of geometries to WKT or WKB.
+
+    Args:
+        geometries: GeoSeries, GeometryArray or array-like of shapely geometries
+        encoding: 'wkt', 'wkb' or 'gpkg' (GeoPackage geometry blob)
+        rounding_precision: Decimal places for WKT output (default: full precision)
+        hex: Return WKB as hex strings instead of bytes
+        srid: Embed this SRID in the WKB (EWKB), e.g. for PostGIS, or in the
+            GeoPackage header (default 0, undefined)
+
+    Returns:
+        numpy.ndarray: Object array of str/bytes values, None for missing geometries
+    """
+    values = geometry_values(geometries)
+
+    if encoding == 'wkt':
+        precision = -1 if rounding_precision is None else rounding_precision
+        return shapely.to_wkt(values, rounding_precision=precision, trim=True)
+
+    if encoding == 'wkb':
+        if srid is not None:
+            values = shapely.set_srid(values, int(srid))
+        return shapely.to_wkb(values, hex=hex, include_srid=srid is not None)
+
+    if encoding == 'gpkg':
+        return gpkg_blobs(values, srid or 0)
+
+    raise ValueError(f"Unknown geometry encoding: {encoding}")
+
+
+def encoded_frame(geodataframe, column=None, encoding='wkt', **options):
+    """Return a plain DataFrame with the active geometry column serialized.
+
+    The attribute columns are referenced rather than copied. If column is None
+    the geometry column keeps its name and position; otherwise it is dropped and
+    the encoded values are appended under the new column name.
+    """
+    geom_col = geodataframe.geometry.name
+    encoded = pd.Series(encode_geometries(geodataframe.geometry.values, encoding, **options),
+                        index=geodataframe.index, dtype=object)
+
+    data = {}
+    for col in geodataframe.columns:
+        if col == geom_col:
+            if column is None:
+                data[col] = encoded
+        else:
+            data[col] = geodataframe[col]
+    if column is not None:
+        data[column] = encoded
+
+    return pd.DataFrame(data, index=geodataframe.index, copy=False)
+
+
+def decode_geometries(values):
+    """Parse WKT, EWKT, (E)WKB, hex (E)WKB and GeoPackage blob values into a shapely array
+    (invalid/None -> None)"""
+    values = np.asarray([bytes(v) if isinstance(v, memoryview) else v for v in values], dtype=object)
+    geometries = np.full(len(values), None, dtype=object)
+    if not len(values):
+        return geometries
+
+    # GeoPackage blobs carry the WKB after their header
+    values = np.asarray([(gpkg_wkb(v) if is_gpkg_blob(v) else v) for v in values], dtype=object)
+    is_bytes = np.array([isinstance(v, (bytes, bytearray)) for v in values], dtype=bool)
+    is_text = np.array([isinstance(v, str) for v in values], dtype=bool)
+    if is_bytes.any():
+        geometries[is_bytes] = shapely.from_wkb(values[is_bytes], on_invalid='ignore')
+    if is_text.any():
+        text = np.char.strip(values[is_text].astype(str))
+        # Hex WKB starts with the byte order marker 00 or 01; WKT starts with a letter
+        is_hex = np.char.startswith(text, '00') | np.char.startswith(text, '01')
+        parsed = np.full(len(text), None, dtype=object)
+        if is_hex.any():
+            parsed[is_hex] = shapely.from_wkb(text[is_hex], on_invalid='ignore')
+        if (~is_hex).any():
+            # Drop the EWKT "SRID=4326;" prefix
+            wkt = np.array([t.split(';', 1)[1] if t.startswith('SRID=') else t
+                            for t in text[~is_hex]], dtype=object)
+            parsed[~is_hex] = shapely.from_wkt(wkt, on_invalid='ignore')
+        geometries[is_text] = parsed
+    return geometries
+
+
+# GeoPackage blob header: magic, version, flags, srs_id, envelope (minx, maxx, miny, maxy).
+# Flags 0b00000011: envelope contents 1 (XY envelope), little-endian header.
+GPKG_MAGIC = b'GP'
+_GPKG_HEADER = np.dtype([('magic', 'S2'), ('version', 'u1'), ('flags', 'u1'), ('srid', '<i4'),
+                         ('envelope', '<f8', 4)])
+# GeoPackage blobs hold ISO WKB; shapely < 2.1 only writes extended WKB, which is the
+# same for 2D geometries
+_ISO_WKB = {'flavor': 'iso'} if tuple(int(part) for part in shapely.__version__.split('.')[:2]) >= (2, 1) else {}
+# Envelope sizes in bytes by the envelope contents indicator (flags bits 1-3)
+_GPKG_ENVELOPE_BYTES = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+
+
+def gpkg_blobs(geometries, srid=0):
+    """Encode geometries as GeoPackage geometry blobs (None for missing geometries)"""
+    values = geometry_values(geometries)
+    blobs = np.full(len(values), None, dtype=object)
+    present = np.flatnonzero(~shapely.is_missing(values))
+    if not len(present):
+        return blobs
+
+    geometries = values[present]
+    bounds = shapely.bounds(geometries)
+    headers = np.zeros(len(geometries), dtype=_GPKG_HEADER)
+    headers['magic'] = GPKG_MAGIC
+    headers['flags'] = 0b00000011
+    headers['srid'] = int(srid)
+    headers['envelope'] = bounds[:, [0, 2, 1, 3]]
+    raw = headers.tobytes()
+    size = _GPKG_HEADER.itemsize
+    wkb = shapely.to_wkb(geometries, **_ISO_WKB)
+    blobs[present] = [raw[i * size:(i + 1) * size] + body for i, body in enumerate(wkb)]
+    return blobs
+
+
+def is_gpkg_blob(value):
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:2]) == GPKG_MAGIC
+
+
+def gpkg_wkb(blob):
+    """The WKB part of a GeoPackage blob (None for the empty geometry flag or a bad header)"""
+    blob = bytes(blob)
+    if len(blob) < 8 or blob[3] & 0b00010000:
+        return None
+    envelope = _GPKG_ENVELOPE_BYTES.get((blob[3] >> 1) & 0b111)
+    return blob[8 + envelope:] if envelope is not None else None
+
+
+def geometry_bounds(values):
+    """(minx, miny, maxx, maxy) per value (NaN where missing), read from the GeoPackage
+    envelope where there is one, otherwise from the decoded geometry"""
+    bounds = np.full((len(values), 4), np.nan)
+    parse = []
+    for i, value in enumerate(values):
+        if is_gpkg_blob(value) and len(value) >= 40 and (value[3] >> 1) & 0b111:
+            order = '<' if value[3] & 1 else '>'
+            minx, maxx, miny, maxy = struct.unpack_from(f'{order}4d', value, 8)
+            bounds[i] = (minx, miny, maxx, maxy)
+        elif value is not None:
+            parse.append(i)
+    if parse:
+        bounds[parse] = shapely.bounds(decode_geometries([values[i] for i in parse]))
+    return bounds
+
+
+@functools.lru_cache(maxsize=64)
+def value_bounds(value):
+    """(minx, miny, maxx, maxy) of a single WKT value or GeoPackage blob, or None.
+
+    Used row by row by SQLite's R*Tree triggers, which ask for each of the
+    four coordinates of the same value in turn; hence the cache.
+    """
+    if value is None:
+        return None
+    bounds = geometry_bounds([value])[0]
+    return None if np.isnan(bounds).any() else tuple(bounds.tolist())
+
+
+# OpenGIS types of SQL Server shapes (1-7; 8-11 are curves and FullGlobe)
+_SQLSERVER_TYPES = {1: 'Point', 2: 'LineString', 3: 'Polygon', 4: 'MultiPoint', 5: 'MultiLineString',
+                    6: 'MultiPolygon', 7: 'GeometryCollection'}
+
+
+def decode_sqlserver_geometry(blob):
+    """Decode SQL Server's native geometry serialization (versions 1 and 2) to a shapely geometry.
+
+    Returns None for values that are not in this format and for curved
+    geometries, which have no WKB equivalent.
+    """
+    try:
+        blob = bytes(blob)
+        srid, version, props = struct.unpack_from('<iBB', blob, 0)
+        if version not in (1, 2):
+            return None
+        has_z, has_m = props & 0x01, props & 0x02
+        offset = 6
+        if props & 0x08 or props & 0x10:
+            # Single point or single line segment
+            count = 1 if props & 0x08 else 2
+            points = np.frombuffer(blob, '<f8', count * 2, offset).reshape(count, 2)
+            offset += count * 16 + (count * 8 if has_z else 0) + (count * 8 if has_m else 0)
+            if offset != len(blob):
+                return None
+            return shapely.Point(points[0]) if count == 1 else shapely.LineString(points)
+
+        (num_points,) = struct.unpack_from('<i', blob, offset)
+        offset += 4
+        points = np.frombuffer(blob, '<f8', num_points * 2, offset).reshape(num_points, 2)
+        offset += num_points * 16 + (num_points * 8 if has_z else 0) + (num_points * 8 if has_m else 0)
+        (num_figures,) = struct.unpack_from('<i', blob, offset)
+        offset += 4
+        figures = [struct.unpack_from('<Bi', blob, offset + i * 5) for i in range(num_figures)]
+        offset += num_figures * 5
+        (num_shapes,) = struct.unpack_from('<i', blob, offset)
+        offset += 4
+        shapes = [struct.unpack_from('<iiB', blob, offset + i * 9) for i in range(num_shapes)]
+        offset += num_shapes * 9
+        if offset != len(blob) or (version == 2 and any(figure[0] >= 2 for figure in figures)):
+            # Arcs and composite curves (version 2) have no WKB equivalent
+            return None
+    except (struct.error, ValueError, IndexError):
+        return None
+
+    def figure_points(index):
+        end = figures[index + 1][1] if index + 1 < num_figures else num_points
+        return points[figures[index][1]:end]
+
+    def shape_figures(index):
+        start = shapes[index][1]
+        if start < 0:
+            return range(0)
+        later = [shape[1] for shape in shapes[index + 1:] if shape[1] >= 0]
+        return range(start, later[0] if later else num_figures)
+
+    def build(index):
+        kind = _SQLSERVER_TYPES.get(shapes[index][2])
+        if kind is None:
+            raise ValueError("Curved geometries are not supported")
+        figure_range = shape_figures(index)
+        if kind == 'Point':
+            return shapely.Point(figure_points(figure_range[0])[0]) if figure_range else shapely.Point()
+        if kind == 'LineString':
+            return shapely.LineString(figure_points(figure_range[0])) if figure_range else shapely.LineString()
+        if kind == 'Polygon':
+            rings = [figure_points(i) for i in figure_range]
+            return shapely.Polygon(rings[0], rings[1:]) if rings else shapely.Polygon()
+        children = [build(i) for i, shape in enumerate(shapes) if shape[0] == index]
+        if kind == 'MultiPoint':
+            return shapely.MultiPoint(children)
+        if kind == 'MultiLineString':
+            return shapely.MultiLineString(children)
+        if kind == 'MultiPolygon':
+            return shapely.MultiPolygon(children)
+        return shapely.GeometryCollection(children)
+
+    try:
+        return build(0) if shapes else None
+    except (ValueError, IndexError):
+        return None
+
+
+class SqlServerGeometry(bytes):
+    """Value of a SQL Server geometry/geography column.
+
+    The driver returns these UDT values as plain bytes; DatabaseManager marks
+    them with this type (a pyodbc output converter for SQL_SS_UDT) so that
+    geometry_text decodes them but leaves other varbinary values alone.
+    """
+
+
+def geometry_text(value):
+    """WKT for a GeoPackage blob or a SqlServerGeometry; other values are returned unchanged"""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return value
+    try:
+        if is_gpkg_blob(value):
+            wkb = gpkg_wkb(value)
+            return shapely.to_wkt(shapely.from_wkb(wkb), rounding_precision=-1) if wkb is not None else None
+    except (shapely.errors.GEOSException, ValueError, IndexError):
+        return value
+    if isinstance(value, SqlServerGeometry):
+        geometry = decode_sqlserver_geometry(value)
+        if geometry is not None:
+            return shapely.to_wkt(geometry, rounding_precision=-1)
+    return value
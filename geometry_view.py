@@ -0,0 +1,205 @@
+"""
+Rendering of many geometries at once for the visualization window.
+
+GeometryLayer collects geometries page by page (WKT, WKB, hex EWKB) and draws
+them onto a matplotlib Axes with a handful of artists instead of one patch
+per feature: all polygons go into one compound path (interior rings become
+holes), all lines into another and all points into a single scatter. Each
+redraw is fitted to the current view:
+
+- only geometries intersecting the view are drawn (STRtree query);
+- features smaller than a pixel are drawn as a point;
+- the rest are simplified with a tolerance of about one pixel, so the vertex
+  count follows the zoom level rather than the data;
+- above raster_points points in view, the points are binned into a NumPy
+  histogram at screen resolution and shown as an image.
+"""
+import numpy as np
+import shapely
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path
+
+from geometry_encoding import decode_geometries
+
+# Points in view above which they are rasterized instead of drawn as markers
+RASTER_POINTS = 200000
+
+# shapely.orient_polygons is new in shapely 2.1; normalize also gives exteriors
+# and holes opposite orientations, which is all the nonzero fill rule needs
+_orient_polygons = getattr(shapely, 'orient_polygons', shapely.normalize)
+
+_POINT_TYPES = (shapely.GeometryType.POINT,)
+_LINE_TYPES = (shapely.GeometryType.LINESTRING, shapely.GeometryType.LINEARRING)
+_POLYGON_TYPES = (shapely.GeometryType.POLYGON,)
+_COLLECTION_TYPES = (shapely.GeometryType.MULTIPOINT, shapely.GeometryType.MULTILINESTRING,
+                     shapely.GeometryType.MULTIPOLYGON, shapely.GeometryType.GEOMETRYCOLLECTION)
+
+
+def explode(geometries):
+    """Split multi-part geometries and collections into single parts"""
+    parts = np.asarray(geometries, dtype=object)
+    parts = parts[~(shapely.is_missing(parts) | shapely.is_empty(parts))]
+    while len(parts):
+        nested = np.isin(shapely.get_type_id(parts), _COLLECTION_TYPES)
+        if not nested.any():
+            break
+        parts = np.concatenate([parts[~nested], shapely.get_parts(parts[nested])])
+        parts = parts[~shapely.is_empty(parts)]
+    return parts
+
+
+def _compound_path(coords, starts, close=False):
+    """One Path holding many rings/lines: MOVETO at each start (and CLOSEPOLY at each ring end)"""
+    codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+    codes[starts] = Path.MOVETO
+    if close:
+        ends = np.append(starts[1:], len(coords)) - 1
+        codes[ends] = Path.CLOSEPOLY
+    return Path(coords, codes)
+
+
+def _part_starts(index):
+    """Positions where the part index of get_coordinates(return_index=True) changes"""
+    if not len(index):
+        return np.array([], dtype=np.intp)
+    return np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+
+
+class GeometryLayer:
+    """Geometries accumulated page by page and drawn with level-of-detail per view"""
+
+    def __init__(self, raster_points=RASTER_POINTS, color='tab:blue'):
+        self.raster_points = raster_points
+        self.color = color
+        self.features = 0
+        self.invalid = 0
+        self._pages = []
+        self._geometries = None
+        self._tree = None
+        self._bounds = None
+        self._artists = []
+
+    def add(self, values):
+        """Parse and append a page of geometry values; returns the number of geometries added"""
+        geometries = decode_geometries(values)
+        valid = ~shapely.is_missing(geometries)
+        self.invalid += int(len(values) - valid.sum())
+        parts = explode(geometries[valid])
+        if len(parts):
+            self._pages.append(parts)
+            self._geometries = None
+        self.features += int(valid.sum())
+        return int(valid.sum())
+
+    @property
+    def geometries(self):
+        """All single-part geometries loaded so far"""
+        if self._geometries is None:
+            self._geometries = (np.concatenate(self._pages) if self._pages
+                                else np.array([], dtype=object))
+            self._pages = [self._geometries] if len(self._geometries) else []
+            self._tree = None
+            self._bounds = shapely.bounds(self._geometries)
+        return self._geometries
+
+    @property
+    def total_bounds(self):
+        """(minx, miny, maxx, maxy) of the loaded geometries, or None"""
+        geometries = self.geometries
+        if not len(geometries):
+            return None
+        bounds = self._bounds
+        return (np.nanmin(bounds[:, 0]), np.nanmin(bounds[:, 1]),
+                np.nanmax(bounds[:, 2]), np.nanmax(bounds[:, 3]))
+
+    def clear_artists(self):
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+
+    def render(self, ax, view=None, pixel_size=None):
+        """Draw the geometries intersecting view (minx, miny, maxx, maxy) onto ax.
+
+        pixel_size is the width of a screen pixel in data units; it sets the
+        simplification tolerance and the raster resolution. Returns a dict
+        with the number of features, vertices and points drawn.
+        """
+        self.clear_artists()
+        geometries = self.geometries
+        stats = {'features': 0, 'vertices': 0, 'points': 0, 'raster': False}
+        if not len(geometries):
+            return stats
+
+        if view is not None:
+            if self._tree is None:
+                self._tree = shapely.STRtree(geometries)
+            visible = np.sort(self._tree.query(shapely.box(*view)))
+            geometries = geometries[visible]
+            bounds = self._bounds[visible]
+        else:
+            bounds = self._bounds
+        stats['features'] = len(geometries)
+        if not len(geometries):
+            return stats
+
+        type_ids = shapely.get_type_id(geometries)
+        is_point = np.isin(type_ids, _POINT_TYPES)
+        if pixel_size:
+            # Lines and polygons that fit in a pixel are drawn as a point at their center
+            tiny = ~is_point & (np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1]) < pixel_size)
+        else:
+            tiny = np.zeros(len(geometries), dtype=bool)
+
+        point_xy = np.concatenate([
+            shapely.get_coordinates(geometries[is_point]),
+            np.column_stack([(bounds[tiny, 0] + bounds[tiny, 2]) / 2,
+                             (bounds[tiny, 1] + bounds[tiny, 3]) / 2]),
+        ])
+
+        shapes = geometries[~is_point & ~tiny]
+        if pixel_size and len(shapes):
+            shapes = shapely.simplify(shapes, pixel_size, preserve_topology=False)
+            shapes = shapes[~shapely.is_empty(shapes)]
+        shape_types = shapely.get_type_id(shapes)
+
+        polygons = shapes[np.isin(shape_types, _POLYGON_TYPES)]
+        if len(polygons):
+            rings = shapely.get_rings(_orient_polygons(polygons))
+            coords, index = shapely.get_coordinates(rings, return_index=True)
+            path = _compound_path(coords, _part_starts(index), close=True)
+            self._add(ax, PathCollection([path], facecolors=self.color, edgecolors='black',
+                                         linewidths=0.3, alpha=0.5))
+            stats['vertices'] += len(coords)
+
+        lines = shapes[np.isin(shape_types, _LINE_TYPES)]
+        if len(lines):
+            coords, index = shapely.get_coordinates(lines, return_index=True)
+            path = _compound_path(coords, _part_starts(index))
+            self._add(ax, PathCollection([path], facecolors='none', edgecolors=self.color,
+                                         linewidths=0.8))
+            stats['vertices'] += len(coords)
+
+        stats['points'] = len(point_xy)
+        if len(point_xy) > self.raster_points and view is not None and pixel_size:
+            self._raster(ax, point_xy, view, pixel_size)
+            stats['raster'] = True
+        elif len(point_xy):
+            self._add(ax, ax.scatter(point_xy[:, 0], point_xy[:, 1], s=4, c=self.color,
+                                     linewidths=0))
+        return stats
+
+    def _raster(self, ax, xy, view, pixel_size):
+        """Bin points into a screen-resolution density image"""
+        minx, miny, maxx, maxy = view
+        nx = max(1, min(4096, int(np.ceil((maxx - minx) / pixel_size))))
+        ny = max(1, min(4096, int(np.ceil((maxy - miny) / pixel_size))))
+        counts, _, _ = np.histogram2d(xy[:, 1], xy[:, 0], bins=(ny, nx),
+                                      range=((miny, maxy), (minx, maxx)))
+        image = np.ma.masked_equal(np.log1p(counts), 0)
+        self._add(ax, ax.imshow(image, extent=(minx, maxx, miny, maxy), origin='lower',
+                                cmap='viridis', interpolation='nearest'))
+
+    def _add(self, ax, artist):
+        if artist.axes is None:
+            ax.add_collection(artist, autolim=False)
+        self._artists.append(artist)
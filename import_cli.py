@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Headless command-line import runner.
+
+Runs the same DatabaseManager import paths as the GUI without Tk, e.g. on
+servers or from cron. Progress and the final timing stats are written to
+stdout as JSON lines; diagnostics go to stderr. The summary includes the
+time spent per import stage; --metrics also writes the stage totals and a
+trace of every timed span to a JSON file.
+
+Example:
+    python import_cli.py --db-type PostgreSQL --host db01 --username etl \\
+        --database warehouse --table sales --columns id,amount,ts sales.csv
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+from database_manager import DatabaseManager
+from batch_importer import SPATIAL_EXTENSIONS, table_name_for
+import import_jobs
+from import_metrics import ImportMetrics
+import file_readers
+
+DEFAULT_PORTS = {
+    'MySQL': '3306',
+    'PostgreSQL': '5432',
+    'SQLite': '',
+    'SQL Server': '1433'
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Import a CSV file or shapefile into a database without the GUI."
+    )
+    parser.add_argument('input', help="CSV file or shapefile to import")
+
+    connection = parser.add_argument_group('connection')
+    connection.add_argument('--db-type', required=True, choices=list(DEFAULT_PORTS))
+    connection.add_argument('--host', default='localhost')
+    connection.add_argument('--port', help="Default: the standard port for --db-type")
+    connection.add_argument('--username', default='')
+    connection.add_argument('--password', default=None,
+                            help="Default: the DB_PASSWORD environment variable")
+    connection.add_argument('--database', required=True,
+                            help="Database name, or the database file for SQLite")
+    connection.add_argument('--pool-size', type=int, default=None)
+
+    load = parser.add_argument_group('load options')
+    load.add_argument('--table', help="Target table (default: derived from the file name)")
+    load.add_argument('--columns', help="Comma-separated list of columns to import (default: all)")
+    load.add_argument('--bbox', help="Only import features inside minx,miny,maxx,maxy (spatial files)")
+    load.add_argument('--where', help="Row filter: an SQL WHERE clause for spatial files, "
+                                      "a pandas query expression for CSV files")
+    load.add_argument('--simplify', type=float, metavar='TOLERANCE',
+                      help="Simplify geometries with this tolerance (CRS units) before loading")
+    load.add_argument('--grid-size', type=float,
+                      help="Snap coordinates to a grid of this size (CRS units), e.g. 0.00001")
+    load.add_argument('--reduce-workers', type=int, default=1,
+                      help="Threads used by --simplify/--grid-size")
+    load.add_argument('--geometry-storage', choices=['text', 'binary'], default='text',
+                      help="SQLite: store geometry as WKT text or as GeoPackage WKB blobs")
+    load.add_argument('--no-spatial-index', action='store_true',
+                      help="Do not build a spatial index after a spatial import")
+    load.add_argument('--load-method', choices=['auto', 'bulk', 'copy', 'insert'], default='auto')
+    load.add_argument('--copy-format', choices=['text', 'binary'], default='text')
+    load.add_argument('--chunk-rows', type=int, default=100000,
+                      help="Rows read per chunk when streaming a CSV file")
+    load.add_argument('--csv-engine', choices=['c', 'pyarrow'], default='c',
+                      help="CSV parser for --no-stream (pyarrow infers dates and missing values "
+                           "differently from the streaming path)")
+    load.add_argument('--no-stream', action='store_true',
+                      help="Load the whole CSV file into memory before importing")
+    load.add_argument('--sqlite-pragmas', action='store_true',
+                      help="Use WAL, synchronous=OFF and a large cache while loading into SQLite")
+    load.add_argument('--mode', choices=['replace', 'append', 'upsert'], default='replace')
+    load.add_argument('--key-columns', help="Comma-separated key columns for --mode upsert")
+    load.add_argument('--detect-changes', action='store_true',
+                      help="Upsert only rows that are new or changed since the last import (CSV files)")
+    load.add_argument('--srid', type=int, default=None,
+                      help="SRID for spatial data (default: detected from the file)")
+    load.add_argument('--resumable', action='store_true',
+                      help="Commit chunk by chunk with checkpoints so an interrupted import can be resumed")
+    load.add_argument('--resume', action='store_true',
+                      help="Continue an interrupted --resumable import of the same file and table")
+
+    output = parser.add_argument_group('output')
+    output.add_argument('--metrics', metavar='FILE',
+                        help="Write per-stage timings and a trace of the import to a JSON file")
+    return parser
+
+
+class JsonReporter:
+    """Write progress events and the final summary as JSON lines"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.metrics = ImportMetrics()
+
+    def emit(self, event, **fields):
+        record = {'event': event, 'elapsed': round(time.perf_counter() - self.started, 3)}
+        record.update(fields)
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def progress(self, current, total, status):
+        self.rows = max(self.rows, current)
+        self.emit('progress', current=current, total=total, status=status)
+
+
+def run_import(args, reporter):
+    """Connect and run the import described by the parsed arguments"""
+    config = {
+        'db_type': args.db_type,
+        'host': args.host,
+        'port': args.port or DEFAULT_PORTS[args.db_type],
+        'username': args.username,
+        'password': args.password if args.password is not None else os.environ.get('DB_PASSWORD', ''),
+        'database': args.database
+    }
+    if args.pool_size:
+        config['pool_size'] = args.pool_size
+
+    table_name = args.table or table_name_for(args.input)
+    metrics = reporter.metrics
+    metrics.name = table_name
+    metrics.start()
+    columns = [col.strip() for col in args.columns.split(',')] if args.columns else None
+    bbox = file_readers.parse_bbox(args.bbox)
+    key_columns = [col.strip() for col in args.key_columns.split(',')] if args.key_columns else None
+    incremental = {'mode': args.mode, 'key_columns': key_columns}
+    spatial_options = {'simplify_tolerance': args.simplify, 'grid_size': args.grid_size,
+                       'geometry_storage': args.geometry_storage,
+                       'spatial_index': not args.no_spatial_index}
+
+    job_store = None
+    if args.resumable or args.resume:
+        file_type = 'shapefile' if args.input.lower().endswith(SPATIAL_EXTENSIONS) else 'csv'
+        job = import_jobs.new_job(config, table_name, args.input, file_type, columns=columns,
+                                  chunk_rows=args.chunk_rows, bbox=bbox, where=args.where,
+                                  stream=not args.no_stream, **incremental, **spatial_options)
+        job_store = import_jobs.JobStore()
+        job_store.save(job)
+        incremental.update(job_id=job['job_id'], resume=args.resume)
+
+    db_manager = DatabaseManager()
+    reporter.emit('connect', db_type=args.db_type, database=args.database)
+    if not db_manager.connect(config):
+        reporter.emit('error', message="Failed to connect to database")
+        if job_store:
+            job_store.update(incremental['job_id'], status='failed')
+        return False
+
+    success = False
+    try:
+        reporter.emit('start', input=args.input, table=table_name)
+
+        if args.input.lower().endswith(SPATIAL_EXTENSIONS):
+            if args.detect_changes:
+                raise ValueError("--detect-changes applies to CSV files only")
+            with metrics.span('read'):
+                data = file_readers.read_spatial(args.input, columns, bbox, args.where)
+            success = db_manager.import_spatial_data(data, table_name, srid=args.srid,
+                                                     progress_callback=reporter.progress,
+                                                     sqlite_pragmas=args.sqlite_pragmas,
+                                                     reduce_workers=args.reduce_workers,
+                                                     metrics=metrics, **incremental, **spatial_options)
+            if success and db_manager.last_spatial_index_error:
+                reporter.emit('warning', message="Spatial index not created: "
+                              f"{db_manager.last_spatial_index_error}")
+            return success
+
+        if bbox:
+            raise ValueError("--bbox applies to spatial files only")
+        if args.simplify or args.grid_size:
+            raise ValueError("--simplify and --grid-size apply to spatial files only")
+        if args.no_stream:
+            with metrics.span('read'):
+                data = file_readers.read_csv(args.input, columns, args.where,
+                                             engine=args.csv_engine)
+            success = db_manager.import_data(data, table_name, progress_callback=reporter.progress,
+                                             load_method=args.load_method, copy_format=args.copy_format,
+                                             sqlite_pragmas=args.sqlite_pragmas,
+                                             detect_changes=args.detect_changes, metrics=metrics,
+                                             **incremental)
+            return success
+
+        chunks = file_readers.iter_csv(args.input, columns, args.where, args.chunk_rows)
+        success = db_manager.import_data_chunks(chunks, table_name, progress_callback=reporter.progress,
+                                                load_method=args.load_method,
+                                                copy_format=args.copy_format,
+                                                sqlite_pragmas=args.sqlite_pragmas,
+                                                detect_changes=args.detect_changes, metrics=metrics,
+                                                **incremental)
+        return success
+    finally:
+        db_manager.disconnect()
+        if job_store:
+            job_store.update(incremental['job_id'], status='completed' if success else 'failed')
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    reporter = JsonReporter(sys.stdout)
+
+    # DatabaseManager reports errors with print(); keep stdout machine-readable
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            success = run_import(args, reporter)
+        except Exception as e:
+            reporter.emit('error', message=str(e))
+            success = False
+
+    elapsed = time.perf_counter() - reporter.started
+    try:
+        input_bytes = os.path.getsize(args.input)
+    except OSError:
+        input_bytes = 0
+    metrics = reporter.metrics.snapshot()
+    if args.metrics:
+        try:
+            reporter.metrics.export(args.metrics)
+        except OSError as e:
+            print(f"Could not write metrics file: {str(e)}", file=sys.stderr)
+    reporter.emit(
+        'summary',
+        success=bool(success),
+        rows=reporter.rows,
+        input_bytes=input_bytes,
+        rows_per_sec=round(reporter.rows / elapsed, 1) if elapsed > 0 else 0.0,
+        mb_per_sec=round(input_bytes / elapsed / 1e6, 3) if elapsed > 0 else 0.0,
+        stages={stage: totals['seconds'] for stage, totals in metrics['stages'].items()},
+        retries=metrics['counters'].get('retries', 0),
+        geometry_reduction={key: metrics['counters'][key] for key in
+                            ('vertices_before', 'vertices_after', 'bytes_before', 'bytes_after')
+                            if key in metrics['counters']} or None
+    )
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Bookkeeping for resumable imports.
+
+A resumable import commits its data chunk by chunk. Each chunk is first
+loaded into a staging table and then moved into the target table in the same
+transaction that advances the job's row in the _import_checkpoints control
+table, so a chunk is either fully imported and counted or not at all. After
+a crash the import skips the committed rows and continues with the next
+chunk (exactly-once).
+
+The control table only records progress. What is needed to start the import
+again (source file, table, columns, options) is kept in a small JSON file per
+job under ~/.universal_db_importer/jobs, which the GUI, the command-line
+runner and the batch importer use to offer "resume" for interrupted jobs.
+"""
+import hashlib
+import json
+import os
+import time
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, MetaData, String, Table
+
+CHECKPOINT_TABLE = '_import_checkpoints'
+
+JOBS_DIRECTORY = os.path.join(os.path.expanduser('~'), '.universal_db_importer', 'jobs')
+
+# Rows per committed chunk when a resumable import is given a whole DataFrame
+CHECKPOINT_ROWS = 50000
+
+checkpoint_table = Table(
+    CHECKPOINT_TABLE, MetaData(),
+    Column('job_id', String(64), primary_key=True),
+    Column('table_name', String(255), nullable=False),
+    Column('rows_committed', BigInteger, nullable=False),
+    # True when the job (re)creates the target table with its first chunk
+    Column('creates_table', Boolean, nullable=False),
+    Column('status', String(16), nullable=False),
+    Column('updated_at', DateTime),
+)
+
+
+def database_key(config):
+    """Identify the database of a connection config (without credentials)"""
+    return f"{config['db_type']}://{config.get('host', '')}:{config.get('port', '')}/{config['database']}"
+
+
+def job_id_for(config, table_name, source):
+    """Stable job id for importing one source file into one table of one database,
+    so re-running the same import finds the checkpoint of the interrupted run"""
+    key = '|'.join([database_key(config), table_name, os.path.abspath(source)])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def new_job(config, table_name, source, file_type, **options):
+    """Describe a resumable import; options are the import settings to reuse on resume"""
+    return {
+        'job_id': job_id_for(config, table_name, source),
+        'database': database_key(config),
+        'table': table_name,
+        'source': os.path.abspath(source),
+        'file_type': file_type,
+        'options': options,
+        'status': 'running',
+        'created': time.time(),
+    }
+
+
+class JobStore:
+    """One JSON file per resumable import job"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or JOBS_DIRECTORY
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def save(self, job):
+        """Write the job file (atomically, so a crash never leaves half a file)"""
+        os.makedirs(self.directory, exist_ok=True)
+        job['updated'] = time.time()
+        path = self._path(job['job_id'])
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2)
+        os.replace(temp_path, path)
+        return job
+
+    def load(self, job_id):
+        """Return the job dict, or None if there is no (readable) job file"""
+        try:
+            with open(self._path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def update(self, job_id, **fields):
+        """Change fields of a saved job, e.g. update(job_id, status='completed')"""
+        job = self.load(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        return self.save(job)
+
+    def remove(self, job_id):
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def interrupted(self, config=None):
+        """Jobs that did not complete, newest first, optionally only those of one database.
+
+        A job killed with its process is still marked 'running'.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        database = database_key(config) if config else None
+        jobs = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            job = self.load(name[:-len('.json')])
+            if job is None or job.get('status') == 'completed':
+                continue
+            if database and job.get('database') != database:
+                continue
+            jobs.append(job)
+        return sorted(jobs, key=lambda job: job.get('updated', 0), reverse=True)
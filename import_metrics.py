@@ -0,0 +1,195 @@
+"""
+Per-stage timing and throughput metrics for imports.
+
+An ImportMetrics object collects timed spans for the stages of the import
+pipeline, the rows and bytes written, and counters such as retries:
+
+    read       parsing the source file (CSV chunks)
+    transform  casting to the schema, change detection hashes, dtype fixes
+    encode     serializing rows for the driver (COPY buffers, parameter
+               arrays, WKT/WKB geometry)
+    execute    statements and COPY/executemany calls on the database
+    commit     committing the load transaction
+    index      building spatial indexes after the load
+
+Spans nest: a span's time excludes the spans opened inside it (e.g. the
+encoding that a COPY pulls while it streams), so the stage totals add up to
+the time the import spent. DatabaseManager's import methods record into the
+object passed as metrics=...; snapshot() gives the running totals shown in
+the progress window and export() writes them together with every span in the
+Chrome trace event format (open the file in chrome://tracing or Perfetto).
+"""
+import json
+import threading
+import time
+
+STAGES = ('read', 'transform', 'encode', 'execute', 'commit', 'index')
+
+
+class Span:
+    """One timed stage; use as a context manager and call add() for its rows/bytes"""
+
+    def __init__(self, metrics, stage, rows=0, nbytes=0):
+        self.metrics = metrics
+        self.stage = stage
+        self.rows = rows
+        self.bytes = nbytes
+        self.started = None
+        self.children = 0.0
+
+    def add(self, rows=0, nbytes=0):
+        self.rows += rows
+        self.bytes += nbytes
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.metrics._stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.started
+        stack = self.metrics._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += duration
+        self.metrics._record(self, max(duration - self.children, 0.0), duration)
+        return False
+
+
+class _NullSpan:
+    """Stands in for a Span when no metrics are being collected"""
+
+    def add(self, rows=0, nbytes=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class ImportMetrics:
+    """Stage timings, counters and throughput of one import job (thread-safe)"""
+
+    def __init__(self, name=None, max_events=100000):
+        self.name = name
+        self.max_events = max_events
+        self.stages = {stage: {'seconds': 0.0, 'calls': 0, 'rows': 0, 'bytes': 0} for stage in STAGES}
+        self.counters = {}
+        self.rows = 0
+        self.bytes = 0
+        self.events = []
+        self.dropped_events = 0
+        self.started = None
+        self.finished = None
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, 'spans'):
+            self._local.spans = []
+        return self._local.spans
+
+    def start(self):
+        """Mark the start of the job (the first call wins) and clear a previous finish"""
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+            self.finished = None
+
+    def stop(self):
+        with self._lock:
+            self.finished = time.perf_counter()
+
+    def span(self, stage, rows=0, nbytes=0):
+        """Context manager timing one stage, e.g. with metrics.span('encode') as span: ..."""
+        return Span(self, stage, rows, nbytes)
+
+    def count(self, name, amount=1):
+        """Increment a counter such as 'retries'"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_rows(self, rows, nbytes=0):
+        """Record rows (and their approximate bytes) written to the database"""
+        with self._lock:
+            self.rows += rows
+            self.bytes += nbytes
+
+    def _record(self, span, self_seconds, duration):
+        with self._lock:
+            totals = self.stages.setdefault(span.stage, {'seconds': 0.0, 'calls': 0, 'rows': 0, 'bytes': 0})
+            totals['seconds'] += self_seconds
+            totals['calls'] += 1
+            totals['rows'] += span.rows
+            totals['bytes'] += span.bytes
+            if len(self.events) < self.max_events:
+                self.events.append((span.stage, span.started - self._origin, duration,
+                                    threading.get_ident(), span.rows, span.bytes))
+            else:
+                self.dropped_events += 1
+
+    def elapsed(self):
+        """Seconds since start() (the job's duration once stopped)"""
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def snapshot(self):
+        """Running totals as a JSON-serializable dict"""
+        elapsed = self.elapsed()
+        with self._lock:
+            stages = {stage: dict(totals, seconds=round(totals['seconds'], 4))
+                      for stage, totals in self.stages.items()}
+            return {
+                'name': self.name,
+                'elapsed': round(elapsed, 4),
+                'rows': self.rows,
+                'bytes': self.bytes,
+                'rows_per_sec': round(self.rows / elapsed, 1) if elapsed > 0 else 0.0,
+                'bytes_per_sec': round(self.bytes / elapsed, 1) if elapsed > 0 else 0.0,
+                'stages': stages,
+                'counters': dict(self.counters),
+            }
+
+    def summary(self):
+        """One-line text such as 'read 1.2s | encode 0.4s | execute 3.1s | 52,000 rows/s, 4.1 MB/s'"""
+        snapshot = self.snapshot()
+        parts = [f"{stage} {totals['seconds']:.1f}s" for stage, totals in snapshot['stages'].items()
+                 if totals['calls']]
+        line = ' | '.join(parts + [f"{snapshot['rows_per_sec']:,.0f} rows/s, "
+                                   f"{snapshot['bytes_per_sec'] / 1e6:.1f} MB/s"])
+        counters = snapshot['counters']
+        if counters.get('retries'):
+            line += f", {counters['retries']} retries"
+        if counters.get('vertices_before'):
+            line += f", vertices {counters['vertices_before']:,} -> {counters.get('vertices_after', 0):,}"
+        return line
+
+    def trace_events(self):
+        """Spans in the Chrome trace event format (microseconds)"""
+        with self._lock:
+            events = list(self.events)
+        return [{
+            'name': stage, 'cat': 'import', 'ph': 'X', 'pid': 1, 'tid': thread,
+            'ts': round(start * 1e6, 1), 'dur': round(duration * 1e6, 1),
+            'args': {'rows': rows, 'bytes': nbytes},
+        } for stage, start, duration, thread, rows, nbytes in events]
+
+    def export(self, path):
+        """Write the totals and the trace of every span to a JSON file"""
+        data = {
+            'metrics': self.snapshot(),
+            'dropped_events': self.dropped_events,
+            'displayTimeUnit': 'ms',
+            'traceEvents': self.trace_events(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        return path
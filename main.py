@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
+import time
+STARTUP_STARTED = time.perf_counter()
+
+import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
-import geopandas as gpd
 from database_manager import DatabaseManager
+from batch_importer import BatchImporter
+import import_jobs
+from import_metrics import ImportMetrics
+from lazy_imports import lazy_import
 import os
 import threading
-from PIL import Image, ImageTk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-matplotlib.use('TkAgg')
+
+# pandas and geopandas load when a file is opened (file_readers), matplotlib on visualize_geometry
+schema_inference = lazy_import('schema_inference')
+file_readers = lazy_import('file_readers')
 
 class DatabaseImporterApp:
     def __init__(self, root):
@@ -23,10 +28,38 @@ class DatabaseImporterApp:
         
         self.db_manager = DatabaseManager()
         self.csv_data = None
+        self.csv_path = None
+        self.csv_is_preview = False
         self.shapefile_data = None
+        self.shapefile_path = None
+        self.shapefile_is_preview = False
         self.selected_columns = []
         self.file_type = None
         
+        # Rows read for the preview when a file is opened; the import reads the whole file
+        self.preview_rows = 1000
+        self.stream_chunk_rows = 100000
+        
+        # Column types inferred from a sample of the CSV file (None = pandas defaults)
+        self.table_schema = None
+        self.schema_sample_rows = 10000
+        
+        # Resumable import jobs that can be continued after an interruption
+        self.job_store = import_jobs.JobStore()
+        
+        # Stage timings of the last import, for Export Metrics...
+        self.last_import_metrics = None
+        
+        # Query results are fetched page by page while scrolling
+        self.query_page_size = 500
+        self.query_pager = None
+        self.last_query = None
+        
+        # Geometry visualization: rows fetched per page and the most features plotted
+        self.geometry_page_rows = 10000
+        self.geometry_max_features = 1000000
+        self.query_page_loading = False
+        
         # Database default ports
         self.default_ports = {
             'MySQL': '3306',
@@ -169,6 +202,12 @@ class DatabaseImporterApp:
         
         ttk.Button(file_frame, text="Browse CSV", command=self.browse_csv).pack(side='right', padx=10)
         ttk.Button(file_frame, text="Browse Shapefile", command=self.browse_shapefile).pack(side='right', padx=10)
+        ttk.Button(file_frame, text="Batch Import...", command=self.batch_import).pack(side='right', padx=10)
+        ttk.Button(file_frame, text="Resume Import...", command=self.resume_import).pack(side='right', padx=10)
+        
+        self.stream_import_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(file_frame, text="Stream CSV (low memory)",
+                        variable=self.stream_import_var).pack(side='right', padx=10)
         
         preview_frame = ttk.LabelFrame(main_frame, text="Data Preview & Column Selection", padding=10)
         preview_frame.pack(fill='both', expand=True)
@@ -178,6 +217,10 @@ class DatabaseImporterApp:
         
         ttk.Button(columns_frame, text="Select All", command=self.select_all_columns).pack(side='left', padx=5)
         ttk.Button(columns_frame, text="Deselect All", command=self.deselect_all_columns).pack(side='left', padx=5)
+        ttk.Button(columns_frame, text="Column Types...", command=self.edit_column_types).pack(side='left', padx=5)
+        
+        self.schema_label = ttk.Label(columns_frame, text="Column types: default")
+        self.schema_label.pack(side='left', padx=10)
         
         self.columns_listbox = tk.Listbox(preview_frame, selectmode='multiple', height=6)
         self.columns_listbox.pack(fill='x', pady=(0, 10))
@@ -191,6 +234,38 @@ class DatabaseImporterApp:
         preview_scroll.pack(side='right', fill='y')
         self.preview_tree.configure(yscrollcommand=preview_scroll.set)
         
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill='x', pady=(10, 0))
+        
+        ttk.Label(filter_frame, text="Bounding box (minx,miny,maxx,maxy):").pack(side='left', padx=5)
+        self.bbox_entry = ttk.Entry(filter_frame, width=30)
+        self.bbox_entry.pack(side='left', padx=5)
+        
+        ttk.Label(filter_frame, text="Row filter:").pack(side='left', padx=5)
+        self.where_entry = ttk.Entry(filter_frame, width=40)
+        self.where_entry.pack(side='left', padx=5)
+        
+        ttk.Label(filter_frame, text="(SQL WHERE for spatial files, pandas query for CSV)",
+                  foreground="gray").pack(side='left', padx=5)
+        
+        reduce_frame = ttk.Frame(main_frame)
+        reduce_frame.pack(fill='x', pady=(5, 0))
+        
+        ttk.Label(reduce_frame, text="Simplify tolerance:").pack(side='left', padx=5)
+        self.simplify_entry = ttk.Entry(reduce_frame, width=12)
+        self.simplify_entry.pack(side='left', padx=5)
+        
+        ttk.Label(reduce_frame, text="Precision grid:").pack(side='left', padx=5)
+        self.grid_size_entry = ttk.Entry(reduce_frame, width=12)
+        self.grid_size_entry.pack(side='left', padx=5)
+        
+        ttk.Label(reduce_frame, text="(spatial files, in CRS units; empty keeps full detail)",
+                  foreground="gray").pack(side='left', padx=5)
+        
+        self.binary_geometry_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(reduce_frame, text="Binary geometry (SQLite)",
+                        variable=self.binary_geometry_var).pack(side='left', padx=5)
+        
         import_frame = ttk.Frame(main_frame)
         import_frame.pack(fill='x', pady=10)
         
@@ -198,9 +273,30 @@ class DatabaseImporterApp:
         self.table_name_entry = ttk.Entry(import_frame, width=30)
         self.table_name_entry.pack(side='left', padx=5)
         
+        ttk.Label(import_frame, text="Mode:").pack(side='left', padx=5)
+        self.import_mode = ttk.Combobox(import_frame, values=['replace', 'append', 'upsert'],
+                                        state='readonly', width=8)
+        self.import_mode.set('replace')
+        self.import_mode.pack(side='left', padx=5)
+        
+        ttk.Label(import_frame, text="Key columns:").pack(side='left', padx=5)
+        self.key_columns_entry = ttk.Entry(import_frame, width=15)
+        self.key_columns_entry.pack(side='left', padx=5)
+        
+        self.detect_changes_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(import_frame, text="Only changed rows",
+                        variable=self.detect_changes_var).pack(side='left', padx=5)
+        
+        self.resumable_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(import_frame, text="Resumable",
+                        variable=self.resumable_var).pack(side='left', padx=5)
+        
         self.import_btn = ttk.Button(import_frame, text="Import to Database", command=self.import_to_database)
         self.import_btn.pack(side='right', padx=10)
         
+        ttk.Button(import_frame, text="Export Metrics...",
+                   command=self.export_import_metrics).pack(side='right', padx=5)
+        
     def setup_query_tab(self):
         # Main paned window for resizable sections
         paned = ttk.PanedWindow(self.query_tab, orient='vertical')
@@ -222,7 +318,8 @@ class DatabaseImporterApp:
         results_frame = ttk.Frame(paned)
         paned.add(results_frame, weight=2)
         
-        ttk.Label(results_frame, text="Results:").pack(anchor='w', pady=(10, 5))
+        self.results_label = ttk.Label(results_frame, text="Results:")
+        self.results_label.pack(anchor='w', pady=(10, 5))
         
         # Results tree with horizontal scrollbar
         tree_frame = ttk.Frame(results_frame)
@@ -238,7 +335,13 @@ class DatabaseImporterApp:
         h_scroll = ttk.Scrollbar(tree_frame, orient='horizontal', command=self.results_tree.xview)
         h_scroll.grid(row=1, column=0, sticky='ew')
         
-        self.results_tree.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        def on_results_scroll(first, last):
+            v_scroll.set(first, last)
+            # Fetch the next page when the view gets close to the last loaded row
+            if float(last) > 0.9:
+                self.load_next_query_page()
+                
+        self.results_tree.configure(yscrollcommand=on_results_scroll, xscrollcommand=h_scroll.set)
         
         tree_frame.grid_rowconfigure(0, weight=1)
         tree_frame.grid_columnconfigure(0, weight=1)
@@ -270,8 +373,13 @@ class DatabaseImporterApp:
         tables_frame = ttk.LabelFrame(main_frame, text="Spatial Tables", padding=10)
         tables_frame.pack(fill='both', expand=True, pady=(0, 10))
         
-        ttk.Button(tables_frame, text="Refresh Tables", 
-                  command=self.refresh_spatial_tables).pack(anchor='w', pady=5)
+        tables_buttons = ttk.Frame(tables_frame)
+        tables_buttons.pack(fill='x', pady=5)
+        
+        ttk.Button(tables_buttons, text="Refresh Tables", 
+                  command=lambda: self.refresh_spatial_tables(reload=True)).pack(side='left')
+        ttk.Button(tables_buttons, text="Visualize Table", 
+                  command=self.visualize_selected_table).pack(side='left', padx=5)
         
         # Create treeview for spatial tables
         columns = ('Table', 'Column', 'Type', 'Action')
@@ -293,12 +401,32 @@ class DatabaseImporterApp:
         convert_frame.pack(fill='x')
         
         ttk.Label(convert_frame, text="Select a table with WKT data above and click:").pack(anchor='w', pady=5)
-        ttk.Button(convert_frame, text="Convert Selected Table", 
-                  command=self.convert_selected_table).pack(anchor='w', pady=5)
+        
+        convert_buttons = ttk.Frame(convert_frame)
+        convert_buttons.pack(fill='x', pady=5)
+        
+        self.convert_btn = ttk.Button(convert_buttons, text="Convert Selected Table", 
+                                      command=self.convert_selected_table)
+        self.convert_btn.pack(side='left')
+        
+        self.cancel_convert_btn = ttk.Button(convert_buttons, text="Cancel", state='disabled',
+                                             command=self.cancel_conversion)
+        self.cancel_convert_btn.pack(side='left', padx=5)
+        
+        ttk.Label(convert_buttons, text="Parallel workers:").pack(side='left', padx=(15, 5))
+        self.convert_workers = ttk.Spinbox(convert_buttons, from_=1, to=16, width=5)
+        self.convert_workers.set(2)
+        self.convert_workers.pack(side='left')
+        
+        self.conversion_progress = ttk.Progressbar(convert_frame, length=400, mode='determinate')
+        self.conversion_progress.pack(anchor='w', pady=5)
         
         self.conversion_status = ttk.Label(convert_frame, text="", foreground="blue")
         self.conversion_status.pack(anchor='w', pady=5)
         
+        # Set to stop a running conversion after its current batches
+        self.conversion_cancel = None
+        
     def on_right_click(self, event):
         """Handle right-click on results tree"""
         item = self.results_tree.identify('item', event.x, event.y)
@@ -311,63 +439,183 @@ class DatabaseImporterApp:
                 value = self.results_tree.item(item)['values'][col_index]
                 
                 # Check if it's a geometry column (including geometry_wkt columns)
-                if isinstance(value, str) and (value.startswith('POINT') or value.startswith('LINESTRING') or 
-                                             value.startswith('POLYGON') or value.startswith('MULTIPOINT') or
-                                             value.startswith('MULTILINESTRING') or value.startswith('MULTIPOLYGON') or
-                                             value.startswith('GEOMETRYCOLLECTION')):
-                    menu = tk.Menu(self.root, tearoff=0)
-                    menu.add_command(label="Visualize Geometry", 
-                                   command=lambda: self.visualize_geometry(value))
-                    menu.post(event.x_root, event.y_root)
-                elif col_name.lower() in ['geometry', 'geom', 'geometry_wkt', 'geom_wkt', 'wkt']:
+                if (isinstance(value, str) and value.startswith(('POINT', 'LINESTRING', 'POLYGON', 'MULTIPOINT',
+                                                                  'MULTILINESTRING', 'MULTIPOLYGON',
+                                                                  'GEOMETRYCOLLECTION'))) or \
+                        col_name.lower() in ['geometry', 'geom', 'geometry_wkt', 'geom_wkt', 'wkt']:
                     # Also check column name for geometry columns
                     menu = tk.Menu(self.root, tearoff=0)
                     menu.add_command(label="Visualize Geometry", 
                                    command=lambda: self.visualize_geometry(value))
+                    menu.add_command(label=f"Visualize All Rows of {col_name}",
+                                   command=lambda: self.visualize_query_column(col_index, col_name))
                     menu.post(event.x_root, event.y_root)
                     
     def visualize_geometry(self, wkt_string):
         """Visualize spatial geometry data"""
+        self.open_geometry_viewer("Geometry Visualization", values=[wkt_string])
+        
+    def visualize_query_column(self, col_index, col_name):
+        """Plot a geometry column of every row of the current query, re-running it with a fresh cursor"""
+        query = self.last_query
+        if not query or not self.db_manager.is_connected():
+            return
+        self.open_geometry_viewer(f"Query Results - {col_name}",
+                                  lambda: self.db_manager.open_query(query, page_size=self.geometry_page_rows),
+                                  column=col_index)
+        
+    def visualize_selected_table(self):
+        """Plot every geometry of the table selected in the Spatial tab"""
+        selection = self.spatial_tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a table to visualize")
+            return
+            
+        table_name, column, column_type = self.spatial_tree.item(selection[0])['values'][:3]
+        self.open_geometry_viewer(f"{table_name}.{column}",
+                                  lambda: self.db_manager.open_geometry_query(
+                                      table_name, column, column_type.lower(),
+                                      page_size=self.geometry_page_rows))
+        
+    def open_geometry_viewer(self, title, open_pager=None, column=0, values=None):
+        """Window plotting many geometries, fetched page by page (or given as values).
+        
+        open_pager is called in a background thread and returns a QueryPager;
+        its pages are added to the plot as they arrive, up to
+        geometry_max_features. Every zoom or pan redraws the features in view,
+        simplified to the screen resolution.
+        """
         try:
-            from shapely import wkt
-            geom = wkt.loads(wkt_string)
+            import matplotlib
+            matplotlib.use('TkAgg')
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+            import geometry_view
             
+            layer = geometry_view.GeometryLayer()
+            if values is not None:
+                layer.add(values)
+                
             # Create a new window for visualization
             viz_window = tk.Toplevel(self.root)
-            viz_window.title("Geometry Visualization")
-            viz_window.geometry("600x600")
-            
-            # Create matplotlib figure
-            fig, ax = plt.subplots(figsize=(8, 8))
-            
-            # Plot the geometry
-            if geom.geom_type == 'Point':
-                ax.scatter(geom.x, geom.y, s=100, c='red', marker='o')
-            elif geom.geom_type in ['LineString', 'MultiLineString']:
-                x, y = geom.xy if hasattr(geom, 'xy') else ([], [])
-                ax.plot(x, y, 'b-', linewidth=2)
-            elif geom.geom_type in ['Polygon', 'MultiPolygon']:
-                from matplotlib.patches import Polygon as MplPolygon
-                if geom.geom_type == 'Polygon':
-                    patch = MplPolygon(list(geom.exterior.coords), alpha=0.5, fc='blue', ec='black')
-                    ax.add_patch(patch)
-                else:
-                    for poly in geom.geoms:
-                        patch = MplPolygon(list(poly.exterior.coords), alpha=0.5, fc='blue', ec='black')
-                        ax.add_patch(patch)
+            viz_window.title(title)
+            viz_window.geometry("800x800")
             
+            status = ttk.Label(viz_window, text="")
+            status.pack(side='bottom', anchor='w', padx=5)
+            
+            fig = Figure(figsize=(8, 8))
+            ax = fig.add_subplot()
             ax.set_aspect('equal')
-            ax.autoscale_view()
+            ax.set_autoscale_on(False)
             ax.grid(True)
-            ax.set_title(f"{geom.geom_type} Visualization")
             
             # Embed in tkinter
             canvas = FigureCanvasTkAgg(fig, master=viz_window)
-            canvas.draw()
+            NavigationToolbar2Tk(canvas, viz_window).update()
             canvas.get_tk_widget().pack(fill='both', expand=True)
-            
         except Exception as e:
             messagebox.showerror("Visualization Error", f"Failed to visualize geometry: {str(e)}")
+            return
+            
+        state = {'follow_data': True, 'drawing': False, 'pending': None, 'pager': None,
+                 'loading': open_pager is not None, 'limited': False, 'closed': False, 'error': None}
+        
+        def fit_to_data():
+            bounds = layer.total_bounds
+            if bounds is None:
+                return
+            minx, miny, maxx, maxy = bounds
+            pad = max(maxx - minx, maxy - miny, 1e-9) * 0.05
+            state['drawing'] = True
+            ax.set_xlim(minx - pad, maxx + pad)
+            ax.set_ylim(miny - pad, maxy + pad)
+            ax.apply_aspect()
+            state['drawing'] = False
+            
+        def redraw():
+            state['pending'] = None
+            if state['closed']:
+                return
+            if state['follow_data']:
+                fit_to_data()
+            (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+            width = max(ax.get_window_extent().width, 1)
+            started = time.perf_counter()
+            stats = layer.render(ax, (x0, y0, x1, y1), (x1 - x0) / width)
+            canvas.draw_idle()
+            
+            text = f"{layer.features:,} features loaded"
+            if state['loading']:
+                text += " (loading...)"
+            elif state['limited']:
+                text += f" (limited to {self.geometry_max_features:,})"
+            if layer.invalid:
+                text += f", {layer.invalid:,} empty or unreadable"
+            text += f" - {stats['features']:,} parts in view, {stats['vertices']:,} vertices"
+            text += f", {stats['points']:,} points{' (density raster)' if stats['raster'] else ''}"
+            text += f" - drawn in {(time.perf_counter() - started) * 1000:.0f} ms"
+            if state['error']:
+                text += f" - error: {state['error']}"
+            status.config(text=text)
+            
+        def schedule_redraw(delay=150):
+            if state['pending'] is None and not state['closed']:
+                state['pending'] = viz_window.after(delay, redraw)
+                
+        def on_view_changed(axes):
+            if not state['drawing']:
+                # The user zoomed or panned: stop following the data as it loads
+                state['follow_data'] = False
+                schedule_redraw()
+                
+        ax.callbacks.connect('xlim_changed', on_view_changed)
+        ax.callbacks.connect('ylim_changed', on_view_changed)
+        
+        def close_pager():
+            pager = state['pager']
+            if pager:
+                threading.Thread(target=pager.close, daemon=True).start()
+                
+        def on_close():
+            state['closed'] = True
+            close_pager()
+            viz_window.destroy()
+            
+        viz_window.protocol("WM_DELETE_WINDOW", on_close)
+        
+        def add_page(page):
+            if not state['closed']:
+                layer.add(page)
+                schedule_redraw(500)
+                
+        def finish(error_msg=None):
+            state['loading'] = False
+            state['error'] = error_msg
+            schedule_redraw(0)
+            
+        def fetch_thread():
+            error_msg = None
+            try:
+                pager = state['pager'] = open_pager()
+                fetched = 0
+                while not state['closed'] and fetched < self.geometry_max_features:
+                    rows = pager.fetch_page(min(self.geometry_page_rows, self.geometry_max_features - fetched))
+                    if not rows:
+                        break
+                    fetched += len(rows)
+                    viz_window.after(0, add_page, [row[column] for row in rows])
+                state['limited'] = not pager.exhausted
+            except Exception as e:
+                error_msg = str(e)
+            # Release the connection; also covers a window closed while the query was opening
+            close_pager()
+            if not state['closed']:
+                viz_window.after(0, finish, error_msg)
+                
+        viz_window.after(50, redraw)
+        if open_pager is not None:
+            threading.Thread(target=fetch_thread, daemon=True).start()
             
     def test_connection(self):
         """Test database connection with threading to prevent freezing"""
@@ -460,20 +708,31 @@ class DatabaseImporterApp:
             
             def load_thread():
                 try:
-                    data = pd.read_csv(filename)
-                    self.root.after(0, self.update_csv_data, data, filename)
+                    # Only the first rows are read; the import reads the whole file
+                    preview = file_readers.peek_csv(filename, self.preview_rows)
+                    self.root.after(0, self.update_csv_data, preview['data'], filename,
+                                    not preview['complete'], preview['rows'])
                 except Exception as e:
                     self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to read CSV: {str(e)}"))
                     
             thread = threading.Thread(target=load_thread, daemon=True)
             thread.start()
             
-    def update_csv_data(self, data, filename):
-        """Update UI with loaded CSV data"""
+    def update_csv_data(self, data, filename, is_preview=False, total_rows=None):
+        """Update UI with loaded CSV data (is_preview: data holds only the first rows)"""
         self.csv_data = data
+        self.csv_path = filename
+        self.csv_is_preview = is_preview
         self.shapefile_data = None
+        self.shapefile_path = None
+        self.shapefile_is_preview = False
         self.file_type = 'csv'
-        self.file_label.config(text=os.path.basename(filename))
+        self.set_table_schema(None)
+        
+        details = f"{len(data.columns)} columns"
+        if total_rows is not None:
+            details += f", {'~' if is_preview else ''}{total_rows:,} rows"
+        self.file_label.config(text=f"{os.path.basename(filename)} ({details})")
         
         self.columns_listbox.delete(0, tk.END)
         for col in self.csv_data.columns:
@@ -496,20 +755,33 @@ class DatabaseImporterApp:
             
             def load_thread():
                 try:
-                    data = gpd.read_file(filename)
-                    self.root.after(0, self.update_shapefile_data, data, filename)
+                    # First features and layer metadata only; the import reads the whole layer
+                    preview = file_readers.peek_spatial(filename, self.preview_rows)
+                    self.root.after(0, self.update_shapefile_data, preview.pop('data'), filename, preview)
                 except Exception as e:
                     self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to read Shapefile: {str(e)}"))
                     
             thread = threading.Thread(target=load_thread, daemon=True)
             thread.start()
             
-    def update_shapefile_data(self, data, filename):
-        """Update UI with loaded shapefile data"""
+    def update_shapefile_data(self, data, filename, info=None):
+        """Update UI with loaded shapefile data (info: peek_spatial's layer metadata for a preview)"""
         self.shapefile_data = data
+        self.shapefile_path = filename
+        self.shapefile_is_preview = info is not None and not info['complete']
         self.csv_data = None
+        self.csv_path = None
+        self.csv_is_preview = False
         self.file_type = 'shapefile'
-        self.file_label.config(text=os.path.basename(filename))
+        self.set_table_schema(None)
+        
+        details = []
+        if info is not None:
+            if info['features'] is not None:
+                details.append(f"{info['features']:,} features")
+            details += [value for value in (info['geometry_type'], info['crs']) if value]
+        label = os.path.basename(filename)
+        self.file_label.config(text=f"{label} ({', '.join(details)})" if details else label)
         
         self.columns_listbox.delete(0, tk.END)
         for col in self.shapefile_data.columns:
@@ -548,6 +820,133 @@ class DatabaseImporterApp:
                     row_values.append(val)
                 self.preview_tree.insert('', 'end', values=row_values)
                 
+    def set_table_schema(self, schema):
+        """Use the given TableSchema for CSV imports (None for pandas' default types)"""
+        self.table_schema = schema
+        self.schema_label.config(text="Column types: inferred" if schema else "Column types: default")
+        
+    def edit_column_types(self):
+        """Infer compact column types from a sample of the CSV file and let the user edit them"""
+        if self.file_type != 'csv' or not self.csv_path:
+            messagebox.showerror("Error", "Please select a CSV file first!")
+            return
+            
+        schema_window = tk.Toplevel(self.root)
+        schema_window.title("Column Types")
+        schema_window.geometry("600x450")
+        schema_window.transient(self.root)
+        
+        options_frame = ttk.Frame(schema_window)
+        options_frame.pack(fill='x', padx=10, pady=10)
+        
+        ttk.Label(options_frame, text="Sample rows:").pack(side='left', padx=5)
+        sample_spinbox = ttk.Spinbox(options_frame, from_=100, to=1000000, increment=1000, width=10)
+        sample_spinbox.set(self.schema_sample_rows)
+        sample_spinbox.pack(side='left', padx=5)
+        
+        infer_btn = ttk.Button(options_frame, text="Infer")
+        infer_btn.pack(side='left', padx=10)
+        
+        status_label = ttk.Label(options_frame, text="Double-click a type to change it")
+        status_label.pack(side='left', padx=5)
+        
+        columns = ('Column', 'Type', 'SQL Type')
+        types_tree = ttk.Treeview(schema_window, columns=columns, show='headings')
+        for col in columns:
+            types_tree.heading(col, text=col)
+            types_tree.column(col, width=180)
+        types_tree.pack(fill='both', expand=True, padx=10)
+        
+        buttons_frame = ttk.Frame(schema_window)
+        buttons_frame.pack(fill='x', padx=10, pady=10)
+        
+        # Edit a copy so closing the window without "Use" discards the changes
+        state = {'schema': schema_inference.TableSchema(self.table_schema.types) if self.table_schema else None}
+        db_type = self.db_manager.db_type if self.db_manager.is_connected() else self.db_type.get()
+        
+        def show_schema():
+            for item in types_tree.get_children():
+                types_tree.delete(item)
+            schema = state['schema']
+            if schema is None:
+                return
+            sql_names = schema.sql_type_names(db_type, self.db_manager.engine)
+            for column, type_string in schema.types.items():
+                types_tree.insert('', 'end', iid=column, values=(column, type_string, sql_names[column]))
+                
+        def infer_thread(sample_rows):
+            try:
+                schema = schema_inference.TableSchema.from_csv(self.csv_path, sample_rows=sample_rows)
+                self.root.after(0, inferred, schema, None)
+            except Exception as e:
+                self.root.after(0, inferred, None, str(e))
+                
+        def inferred(schema, error_msg):
+            infer_btn.config(state='normal')
+            if error_msg:
+                status_label.config(text="")
+                messagebox.showerror("Error", f"Schema inference failed: {error_msg}", parent=schema_window)
+                return
+            state['schema'] = schema
+            status_label.config(text="Double-click a type to change it")
+            show_schema()
+            
+        def infer():
+            try:
+                self.schema_sample_rows = max(1, int(sample_spinbox.get()))
+            except ValueError:
+                pass
+            infer_btn.config(state='disabled')
+            status_label.config(text="Sampling file...")
+            threading.Thread(target=infer_thread, args=(self.schema_sample_rows,), daemon=True).start()
+            
+        def edit_type(event):
+            column = types_tree.identify_row(event.y)
+            if not column or state['schema'] is None:
+                return
+            bbox = types_tree.bbox(column, 'Type')
+            if not bbox:
+                return
+            x, y, width, height = bbox
+            editor = ttk.Combobox(types_tree, values=schema_inference.TYPE_NAMES)
+            editor.set(state['schema'].types[column])
+            editor.place(x=x, y=y, width=width, height=height)
+            editor.focus_set()
+            
+            def commit(event=None):
+                if not editor.winfo_exists():
+                    return
+                value = editor.get()
+                editor.destroy()
+                try:
+                    state['schema'].set_type(column, value)
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e), parent=schema_window)
+                show_schema()
+                
+            editor.bind('<Return>', commit)
+            editor.bind('<<ComboboxSelected>>', commit)
+            editor.bind('<Escape>', lambda e: editor.destroy())
+            editor.bind('<FocusOut>', commit)
+            
+        def use_schema():
+            self.set_table_schema(state['schema'])
+            schema_window.destroy()
+            
+        def use_defaults():
+            self.set_table_schema(None)
+            schema_window.destroy()
+            
+        infer_btn.config(command=infer)
+        types_tree.bind('<Double-1>', edit_type)
+        ttk.Button(buttons_frame, text="Use for Import", command=use_schema).pack(side='right', padx=5)
+        ttk.Button(buttons_frame, text="Use Default Types", command=use_defaults).pack(side='right', padx=5)
+        
+        if state['schema'] is None:
+            infer()
+        else:
+            show_schema()
+            
     def select_all_columns(self):
         self.columns_listbox.selection_set(0, tk.END)
         
@@ -574,10 +973,134 @@ class DatabaseImporterApp:
             messagebox.showerror("Error", "Please enter a table name!")
             return
             
-        # Create progress window
+        mode = self.import_mode.get()
+        key_columns = [col.strip() for col in self.key_columns_entry.get().split(',') if col.strip()]
+        detect_changes = self.detect_changes_var.get()
+        if mode == 'upsert' and not key_columns:
+            messagebox.showerror("Error", "Please enter the key columns for upsert!")
+            return
+        if detect_changes and mode != 'upsert':
+            messagebox.showerror("Error", "Only changed rows requires upsert mode!")
+            return
+        if detect_changes and self.resumable_var.get():
+            messagebox.showerror("Error", "Only changed rows cannot be combined with a resumable import!")
+            return
+            
+        selected_columns = [self.columns_listbox.get(i) for i in selected_indices]
+        if self.file_type == 'shapefile' and 'geometry' not in selected_columns \
+                and 'geometry' in self.shapefile_data.columns:
+            selected_columns.append('geometry')
+        schema = self.table_schema.subset(selected_columns) if self.table_schema else None
+        
+        where = self.where_entry.get().strip() or None
+        try:
+            bbox = file_readers.parse_bbox(self.bbox_entry.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if bbox and self.file_type == 'csv':
+            messagebox.showerror("Error", "The bounding box filter applies to spatial files only!")
+            return
+            
+        spatial_options = {}
+        try:
+            for key, entry in (('simplify_tolerance', self.simplify_entry),
+                               ('grid_size', self.grid_size_entry)):
+                if entry.get().strip():
+                    spatial_options[key] = float(entry.get())
+                    if spatial_options[key] <= 0:
+                        raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "The simplify tolerance and precision grid must be positive numbers!")
+            return
+        if spatial_options and self.file_type == 'csv':
+            messagebox.showerror("Error", "Simplification applies to spatial files only!")
+            return
+        if self.binary_geometry_var.get():
+            spatial_options['geometry_storage'] = 'binary'
+            
+        # A resumable import is described by a job file so it can be continued later
+        checkpoint = {}
+        if self.resumable_var.get():
+            source = self.csv_path if self.file_type == 'csv' else self.shapefile_path
+            job = import_jobs.new_job(self.db_manager.config, table_name, source, self.file_type,
+                                      columns=selected_columns, chunk_rows=self.stream_chunk_rows,
+                                      column_types=schema.types if schema else None,
+                                      mode=mode, key_columns=key_columns, bbox=bbox, where=where,
+                                      stream=self.stream_import_var.get(), **spatial_options)
+            self.job_store.save(job)
+            checkpoint = {'job_id': job['job_id']}
+            
+        metrics = ImportMetrics(table_name)
+        self.last_import_metrics = metrics
+        progress_window, update_progress = self.create_progress_window(metrics)
+        self.import_btn.config(state='disabled', text="Importing...")
+        
+        def import_thread():
+            error_msg = None
+            try:
+                if self.file_type == 'csv' and self.stream_import_var.get():
+                    # Only the selected (and filtered-on) columns are parsed
+                    chunks = file_readers.iter_csv(self.csv_path, selected_columns, where,
+                                                   self.stream_chunk_rows)
+                    success = self.db_manager.import_data_chunks(
+                        chunks, table_name,
+                        total_rows=file_readers.estimate_csv_rows(self.csv_path),
+                        progress_callback=update_progress, schema=schema,
+                        mode=mode, key_columns=key_columns, detect_changes=detect_changes,
+                        metrics=metrics, **checkpoint)
+                elif self.file_type == 'csv':
+                    if self.csv_is_preview:
+                        with metrics.span('read'):
+                            data_to_import = file_readers.read_csv(self.csv_path, selected_columns, where)
+                    else:
+                        data_to_import = file_readers.filter_rows(self.csv_data, where)[selected_columns]
+                    success = self.db_manager.import_data(data_to_import, table_name, 
+                                                         progress_callback=update_progress,
+                                                         schema=schema, mode=mode,
+                                                         key_columns=key_columns,
+                                                         detect_changes=detect_changes,
+                                                         metrics=metrics, **checkpoint)
+                else:
+                    if bbox or where or self.shapefile_is_preview:
+                        # Let the driver skip unselected columns and filtered-out features
+                        with metrics.span('read'):
+                            data_to_import = file_readers.read_spatial(self.shapefile_path, selected_columns,
+                                                                       bbox, where)
+                    else:
+                        data_to_import = self.shapefile_data[selected_columns]
+                    success = self.db_manager.import_spatial_data(data_to_import, table_name,
+                                                                progress_callback=update_progress,
+                                                                mode=mode, key_columns=key_columns,
+                                                                reduce_workers=os.cpu_count() or 1,
+                                                                metrics=metrics, **spatial_options,
+                                                                **checkpoint)
+                    if success:
+                        error_msg = self.db_manager.last_spatial_index_error
+                    
+            except Exception as e:
+                success = False
+                error_msg = str(e)
+                
+            if checkpoint:
+                self.job_store.update(checkpoint['job_id'], status='completed' if success else 'failed')
+                if not success:
+                    error_msg = (error_msg or "Failed to import data!") + \
+                        "\n\nThe committed chunks were kept; use Resume Import... to continue."
+            self.root.after(0, self.close_progress_and_update, progress_window, success,
+                            table_name, error_msg)
+                
+        thread = threading.Thread(target=import_thread, daemon=True)
+        thread.start()
+        
+    def create_progress_window(self, metrics=None):
+        """Open the import progress window; returns it and a thread-safe update_progress callback.
+
+        With an ImportMetrics the window also shows the time per stage and the throughput.
+        """
         progress_window = tk.Toplevel(self.root)
         progress_window.title("Import Progress")
-        progress_window.geometry("400x150")
+        progress_window.geometry("520x180")
         progress_window.transient(self.root)
         progress_window.grab_set()
         
@@ -591,11 +1114,12 @@ class DatabaseImporterApp:
         details_label = ttk.Label(progress_window, text="")
         details_label.pack(pady=5)
         
+        metrics_label = ttk.Label(progress_window, text="")
+        metrics_label.pack(pady=5)
+        
         cancel_btn = ttk.Button(progress_window, text="Cancel", state='disabled')
         cancel_btn.pack(pady=10)
         
-        self.import_btn.config(state='disabled', text="Importing...")
-        
         def update_progress(current, total, status):
             """Update progress bar from any thread"""
             def update():
@@ -604,33 +1128,151 @@ class DatabaseImporterApp:
                     progress_bar['value'] = progress
                 status_label.config(text=status)
                 details_label.config(text=f"{current:,} / {total:,} rows")
+                if metrics is not None:
+                    metrics_label.config(text=metrics.summary())
                 progress_window.update()
             self.root.after(0, update)
+            
+        return progress_window, update_progress
         
-        def import_thread():
+    def resume_import(self):
+        """List the interrupted resumable imports of this database and continue one"""
+        if not self.db_manager.is_connected():
+            messagebox.showerror("Error", "Please connect to a database first!")
+            return
+            
+        jobs = self.job_store.interrupted(self.db_manager.config)
+        if not jobs:
+            messagebox.showinfo("Resume Import", "There are no interrupted imports for this database.")
+            return
+            
+        jobs_window = tk.Toplevel(self.root)
+        jobs_window.title("Resume Import")
+        jobs_window.geometry("700x300")
+        jobs_window.transient(self.root)
+        
+        columns = ('Table', 'File', 'Committed Rows', 'Status', 'Updated')
+        jobs_tree = ttk.Treeview(jobs_window, columns=columns, show='headings', selectmode='browse')
+        for col in columns:
+            jobs_tree.heading(col, text=col)
+            jobs_tree.column(col, width=200 if col == 'File' else 110)
+        jobs_tree.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        for job in jobs:
             try:
-                selected_columns = [self.columns_listbox.get(i) for i in selected_indices]
-                
-                if self.file_type == 'csv':
-                    data_to_import = self.csv_data[selected_columns]
-                    success = self.db_manager.import_data(data_to_import, table_name, 
-                                                         progress_callback=update_progress)
+                checkpoint = self.db_manager.checkpoint_status(job['job_id']) or {}
+            except Exception:
+                checkpoint = {}
+            jobs_tree.insert('', 'end', iid=job['job_id'], values=(
+                job['table'], os.path.basename(job['source']),
+                f"{checkpoint.get('rows_committed', 0):,}", job['status'],
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(job.get('updated', 0)))
+            ))
+            
+        def selected_job():
+            selection = jobs_tree.selection()
+            return self.job_store.load(selection[0]) if selection else None
+            
+        def resume():
+            job = selected_job()
+            if job is None:
+                return
+            if not os.path.exists(job['source']):
+                messagebox.showerror("Error", f"Source file not found: {job['source']}", parent=jobs_window)
+                return
+            jobs_window.destroy()
+            self.run_resumed_job(job)
+            
+        def discard():
+            job = selected_job()
+            if job is None:
+                return
+            self.job_store.remove(job['job_id'])
+            jobs_tree.delete(job['job_id'])
+            
+        buttons_frame = ttk.Frame(jobs_window)
+        buttons_frame.pack(fill='x', padx=10, pady=(0, 10))
+        ttk.Button(buttons_frame, text="Resume", command=resume).pack(side='right', padx=5)
+        ttk.Button(buttons_frame, text="Discard", command=discard).pack(side='right', padx=5)
+        
+    def run_resumed_job(self, job):
+        """Continue a resumable import from its last committed chunk"""
+        options = job.get('options', {})
+        columns = options.get('columns')
+        checkpoint = {'job_id': job['job_id'], 'resume': True,
+                      'mode': options.get('mode', 'replace'), 'key_columns': options.get('key_columns')}
+        self.job_store.update(job['job_id'], status='running')
+        
+        metrics = ImportMetrics(job['table'])
+        self.last_import_metrics = metrics
+        progress_window, update_progress = self.create_progress_window(metrics)
+        self.import_btn.config(state='disabled', text="Importing...")
+        
+        def resume_thread():
+            error_msg = None
+            try:
+                if job['file_type'] == 'csv':
+                    column_types = options.get('column_types')
+                    schema = schema_inference.TableSchema(column_types) if column_types else None
+                    if options.get('stream', True):
+                        chunks = file_readers.iter_csv(job['source'], columns, options.get('where'),
+                                                       options.get('chunk_rows') or self.stream_chunk_rows)
+                        success = self.db_manager.import_data_chunks(
+                            chunks, job['table'],
+                            total_rows=file_readers.estimate_csv_rows(job['source']),
+                            progress_callback=update_progress, schema=schema, metrics=metrics,
+                            **checkpoint)
+                    else:
+                        # Re-read the file the way the original import did so the dtypes match
+                        with metrics.span('read'):
+                            data = file_readers.read_csv(job['source'], columns, options.get('where'))
+                        success = self.db_manager.import_data(
+                            data, job['table'], progress_callback=update_progress, schema=schema,
+                            metrics=metrics, **checkpoint)
                 else:
-                    if 'geometry' not in selected_columns and 'geometry' in self.shapefile_data.columns:
-                        selected_columns.append('geometry')
-                    
-                    data_to_import = self.shapefile_data[selected_columns]
-                    success = self.db_manager.import_spatial_data(data_to_import, table_name,
-                                                                progress_callback=update_progress)
-                    
-                self.root.after(0, self.close_progress_and_update, progress_window, success, table_name)
-                    
+                    with metrics.span('read'):
+                        data = file_readers.read_spatial(job['source'], columns, options.get('bbox'),
+                                                         options.get('where'))
+                    success = self.db_manager.import_spatial_data(
+                        data, job['table'], progress_callback=update_progress, metrics=metrics,
+                        simplify_tolerance=options.get('simplify_tolerance'),
+                        grid_size=options.get('grid_size'), reduce_workers=os.cpu_count() or 1,
+                        geometry_storage=options.get('geometry_storage') or 'text',
+                        spatial_index=options.get('spatial_index', True), **checkpoint)
+                    if success:
+                        error_msg = self.db_manager.last_spatial_index_error
             except Exception as e:
-                self.root.after(0, self.close_progress_and_update, progress_window, False, None, str(e))
+                success = False
+                error_msg = str(e)
                 
-        thread = threading.Thread(target=import_thread, daemon=True)
-        thread.start()
+            self.job_store.update(job['job_id'], status='completed' if success else 'failed')
+            self.root.after(0, self.close_progress_and_update, progress_window, success,
+                            job['table'], error_msg)
+            
+        threading.Thread(target=resume_thread, daemon=True).start()
         
+    def export_import_metrics(self):
+        """Save the stage timings and trace of the last import to a JSON file"""
+        if self.last_import_metrics is None:
+            messagebox.showinfo("Export Metrics", "Run an import first.")
+            return
+            
+        filename = filedialog.asksaveasfilename(
+            title="Export Import Metrics",
+            defaultextension=".json",
+            initialfile=f"{self.last_import_metrics.name}_metrics.json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+            
+        try:
+            self.last_import_metrics.export(filename)
+            messagebox.showinfo("Export Metrics", f"{self.last_import_metrics.summary()}\n\n"
+                                f"Saved to {filename} (open the trace in chrome://tracing or Perfetto).")
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export metrics: {str(e)}")
+            
     def close_progress_and_update(self, progress_window, success, table_name, error_msg=None):
         """Close progress window and update import status"""
         progress_window.destroy()
@@ -658,11 +1300,129 @@ class DatabaseImporterApp:
                             msg += "\nCREATE EXTENSION postgis;"
                     except:
                         pass
+            if error_msg:
+                # Set on success only when the spatial index could not be built
+                msg += f"\n\nNote: no spatial index was created: {error_msg}"
+            if self.last_import_metrics is not None:
+                msg += f"\n\n{self.last_import_metrics.summary()}"
             messagebox.showinfo("Success", msg)
         else:
             error_text = error_msg if error_msg else "Failed to import data!"
             messagebox.showerror("Error", error_text)
             
+    def batch_import(self):
+        """Import several CSV files and shapefiles in parallel, one table per file"""
+        if not self.db_manager.is_connected():
+            messagebox.showerror("Error", "Please connect to a database first!")
+            return
+            
+        filenames = filedialog.askopenfilenames(
+            title="Select files to import",
+            filetypes=[("CSV and Shapefiles", "*.csv *.shp"), ("CSV files", "*.csv"),
+                       ("Shapefiles", "*.shp"), ("All files", "*.*")]
+        )
+        if not filenames:
+            return
+            
+        importer = BatchImporter(self.db_manager, chunk_rows=self.stream_chunk_rows)
+        try:
+            tasks = importer.add_files(list(filenames))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+            
+        if not tasks:
+            messagebox.showerror("Error", "No CSV files or shapefiles selected!")
+            return
+            
+        batch_window = tk.Toplevel(self.root)
+        batch_window.title("Batch Import")
+        batch_window.geometry("700x400")
+        batch_window.transient(self.root)
+        
+        options_frame = ttk.Frame(batch_window)
+        options_frame.pack(fill='x', padx=10, pady=10)
+        
+        ttk.Label(options_frame, text="Parallel workers:").pack(side='left', padx=5)
+        workers_spinbox = ttk.Spinbox(options_frame, from_=1, to=16, width=5)
+        workers_spinbox.set(importer.max_workers)
+        workers_spinbox.pack(side='left', padx=5)
+        
+        resumable_var = tk.BooleanVar(value=self.resumable_var.get())
+        resumable_check = ttk.Checkbutton(options_frame, text="Resumable", variable=resumable_var)
+        resumable_check.pack(side='left', padx=5)
+        
+        resume_var = tk.BooleanVar(value=False)
+        resume_check = ttk.Checkbutton(options_frame, text="Resume interrupted run", variable=resume_var)
+        resume_check.pack(side='left', padx=5)
+        
+        start_btn = ttk.Button(options_frame, text="Start")
+        start_btn.pack(side='left', padx=10)
+        
+        throughput_label = ttk.Label(options_frame, text="")
+        throughput_label.pack(side='right', padx=5)
+        
+        columns = ('File', 'Table', 'Status', 'Rows')
+        tasks_tree = ttk.Treeview(batch_window, columns=columns, show='headings')
+        for col in columns:
+            tasks_tree.heading(col, text=col)
+            tasks_tree.column(col, width=300 if col == 'Status' else 120)
+        tasks_tree.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        items = {}
+        for task in tasks:
+            items[id(task)] = tasks_tree.insert('', 'end', values=(
+                os.path.basename(task.path), task.table_name, task.status, 0
+            ))
+            
+        def update_task(task, current, total, status):
+            """Update a task row and the global throughput from any thread"""
+            def update():
+                tasks_tree.item(items[id(task)], values=(
+                    os.path.basename(task.path), task.table_name, status, f"{current:,}"
+                ))
+                throughput_label.config(text=f"{importer.rows_per_second():,.0f} rows/s")
+            self.root.after(0, update)
+            
+        def show_summary(summary):
+            start_btn.config(text="Done")
+            throughput_label.config(text=f"{summary['rows_per_sec']:,.0f} rows/s")
+            msg = (f"Imported {summary['succeeded']} of {summary['files']} files, "
+                   f"{summary['rows']:,} rows in {summary['elapsed']:.1f}s "
+                   f"({summary['rows_per_sec']:,.0f} rows/s).")
+            stages = ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in summary['stages'].items()
+                               if seconds)
+            if stages:
+                msg += f"\nTime per stage (all workers): {stages}"
+            if summary['failures']:
+                msg += "\n\nFailed files:"
+                for failure in summary['failures']:
+                    msg += f"\n{os.path.basename(failure['path'])}: {failure['error']}"
+                messagebox.showwarning("Batch Import", msg, parent=batch_window)
+            else:
+                messagebox.showinfo("Batch Import", msg, parent=batch_window)
+                
+        def batch_thread():
+            try:
+                summary = importer.run(progress_callback=update_task, resume=resume_var.get())
+                self.root.after(0, show_summary, summary)
+            except Exception as e:
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Batch import failed: {str(e)}"))
+                
+        def start():
+            try:
+                importer.max_workers = max(1, int(workers_spinbox.get()))
+            except ValueError:
+                pass
+            start_btn.config(state='disabled', text="Importing...")
+            importer.resumable = resumable_var.get()
+            workers_spinbox.config(state='disabled')
+            resumable_check.config(state='disabled')
+            resume_check.config(state='disabled')
+            threading.Thread(target=batch_thread, daemon=True).start()
+            
+        start_btn.config(command=start)
+        
     def execute_query(self):
         """Execute query with threading"""
         if not self.db_manager.is_connected():
@@ -675,30 +1435,46 @@ class DatabaseImporterApp:
             return
             
         self.execute_btn.config(state='disabled', text="Executing...")
+        self.close_query_pager()
+        self.last_query = query
         
         def query_thread():
+            pager = None
             try:
-                results = self.db_manager.execute_query(query)
-                self.root.after(0, self.update_query_results, results)
+                pager = self.db_manager.open_query(query, page_size=self.query_page_size)
+                rows = pager.fetch_page() if pager.returns_rows else []
+                self.root.after(0, self.update_query_results, pager, rows)
             except Exception as e:
-                self.root.after(0, self.update_query_results, None, str(e))
+                if pager:
+                    pager.close()
+                self.root.after(0, self.update_query_results, None, None, str(e))
                 
         thread = threading.Thread(target=query_thread, daemon=True)
         thread.start()
         
-    def update_query_results(self, results, error_msg=None):
-        """Update UI with query results"""
+    def close_query_pager(self):
+        """Release the cursor of the previous query"""
+        if self.query_pager:
+            pager = self.query_pager
+            self.query_pager = None
+            threading.Thread(target=pager.close, daemon=True).start()
+        self.query_page_loading = False
+        
+    def update_query_results(self, pager, rows, error_msg=None):
+        """Show the first page of a query result"""
         self.execute_btn.config(state='normal', text="Execute Query")
         
         if error_msg:
+            self.results_label.config(text="Results:")
             messagebox.showerror("Error", f"Query error: {error_msg}")
             return
             
         for item in self.results_tree.get_children():
             self.results_tree.delete(item)
             
-        if results:
-            columns = list(results[0].keys()) if results else []
+        if pager.returns_rows:
+            self.query_pager = pager
+            columns = pager.columns
             self.results_tree['columns'] = columns
             self.results_tree['show'] = 'headings'
             
@@ -706,12 +1482,50 @@ class DatabaseImporterApp:
                 self.results_tree.heading(col, text=col)
                 self.results_tree.column(col, width=100)
                 
-            for row in results:
-                self.results_tree.insert('', 'end', values=list(row.values()))
-                
-            messagebox.showinfo("Success", f"Query executed successfully! {len(results)} rows returned.")
+            self.append_query_rows(pager, rows)
         else:
-            messagebox.showinfo("Success", "Query executed successfully!")
+            self.results_tree['columns'] = []
+            self.results_label.config(text="Results:")
+            rowcount = f" {pager.rowcount} rows affected." if pager.rowcount >= 0 else ""
+            messagebox.showinfo("Success", f"Query executed successfully!{rowcount}")
+            
+    def append_query_rows(self, pager, rows):
+        """Add a fetched page to the results grid"""
+        self.query_page_loading = False
+        if pager is not self.query_pager:
+            return
+            
+        for row in rows:
+            self.results_tree.insert('', 'end', values=list(row))
+            
+        more = "" if pager.exhausted else " (scroll for more)"
+        first_ms = (pager.first_page_seconds or 0) * 1000
+        self.results_label.config(
+            text=f"Results: {pager.rows_fetched} rows loaded{more} - first rows in {first_ms:.0f} ms"
+        )
+        
+    def load_next_query_page(self):
+        """Fetch the next page of the current query in the background"""
+        pager = self.query_pager
+        if pager is None or pager.exhausted or self.query_page_loading:
+            return
+        self.query_page_loading = True
+        
+        def page_thread():
+            try:
+                rows = pager.fetch_page()
+                self.root.after(0, self.append_query_rows, pager, rows)
+            except Exception as e:
+                self.root.after(0, self.query_page_failed, pager, str(e))
+                
+        threading.Thread(target=page_thread, daemon=True).start()
+        
+    def query_page_failed(self, pager, error_msg):
+        """Report a failed page fetch and allow the next scroll to retry it"""
+        self.query_page_loading = False
+        if pager is not self.query_pager:
+            return
+        messagebox.showerror("Error", f"Query error: {error_msg}")
     
     def check_postgis_status(self):
         """Check if PostGIS is enabled"""
@@ -753,11 +1567,14 @@ class DatabaseImporterApp:
         else:
             messagebox.showerror("Error", message)
     
-    def refresh_spatial_tables(self):
-        """Refresh the list of spatial tables"""
+    def refresh_spatial_tables(self, reload=False):
+        """Refresh the list of spatial tables; reload also re-reads the cached database metadata"""
         if not self.db_manager.is_connected():
             return
             
+        if reload:
+            self.db_manager.refresh_metadata()
+            
         # Clear existing items
         for item in self.spatial_tree.get_children():
             self.spatial_tree.delete(item)
@@ -791,13 +1608,48 @@ class DatabaseImporterApp:
         table_name = values[0]
         wkt_column = values[1]
         
-        # Show progress
-        self.conversion_status.config(text="Converting... Please wait.")
-        self.spatial_tab.update()
+        try:
+            workers = max(1, int(self.convert_workers.get()))
+        except ValueError:
+            workers = 1
+            
+        # The conversion commits batch by batch in a background thread
+        self.conversion_cancel = threading.Event()
+        self.convert_btn.config(state='disabled')
+        self.cancel_convert_btn.config(state='normal')
+        self.conversion_progress['value'] = 0
+        self.conversion_status.config(text="Converting...", foreground="blue")
         
-        success, message = self.db_manager.convert_wkt_to_geometry(table_name, wkt_column)
+        def update_progress(current, total, status):
+            def update():
+                if total > 0:
+                    self.conversion_progress['value'] = (current / total) * 100
+                self.conversion_status.config(text=status, foreground="blue")
+            self.root.after(0, update)
+            
+        def convert_thread():
+            success, message = self.db_manager.convert_wkt_to_geometry(
+                table_name, wkt_column, workers=workers, progress_callback=update_progress,
+                cancel_event=self.conversion_cancel)
+            self.root.after(0, self.finish_conversion, success, message)
+            
+        threading.Thread(target=convert_thread, daemon=True).start()
+        
+    def cancel_conversion(self):
+        """Stop the running conversion after the batches in progress (they stay committed)"""
+        if self.conversion_cancel is not None:
+            self.conversion_cancel.set()
+            self.cancel_convert_btn.config(state='disabled')
+            self.conversion_status.config(text="Cancelling after the current batches...", foreground="blue")
+            
+    def finish_conversion(self, success, message):
+        """Update the Spatial tab after a conversion finished, failed or was cancelled"""
+        self.conversion_cancel = None
+        self.convert_btn.config(state='normal')
+        self.cancel_convert_btn.config(state='disabled')
         
         if success:
+            self.conversion_progress['value'] = 100
             self.conversion_status.config(text="Conversion successful!", foreground="green")
             messagebox.showinfo("Success", message)
             self.refresh_spatial_tables()
@@ -805,7 +1657,16 @@ class DatabaseImporterApp:
             self.conversion_status.config(text="Conversion failed", foreground="red")
             messagebox.showerror("Error", message)
 
+    def report_startup_time(self):
+        """Print the time from launch until the main window is ready, then close it"""
+        elapsed = time.perf_counter() - STARTUP_STARTED
+        print(f"Startup time: {elapsed:.3f}s")
+        self.root.destroy()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = DatabaseImporterApp(root)
+    # `python main.py --startup-time` prints the startup time and exits
+    if '--startup-time' in sys.argv:
+        root.after_idle(app.report_startup_time)
     root.mainloop()
\ No newline at end of file
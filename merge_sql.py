@@ -0,0 +1,124 @@
+"""
+SQL for appending and upserting rows from a staging table.
+
+Incremental imports load the new rows into a staging table with the normal
+(bulk) load path and then move them into the target table with a single
+set-based statement, using each backend's upsert syntax:
+
+    PostgreSQL  INSERT ... ON CONFLICT (keys) DO UPDATE
+    MySQL       INSERT ... ON DUPLICATE KEY UPDATE
+    SQL Server  MERGE
+    SQLite      INSERT OR REPLACE
+
+Staging rows carry their position in the source (STAGING_ROW_COLUMN), so
+when a key occurs more than once in one load the last row wins on every
+backend: PostgreSQL and SQL Server, which reject a key twice in one
+statement, merge only the last row of each key; MySQL and SQLite apply the
+rows in source order.
+"""
+
+# Column used by change detection to store a hash of each row's non-key values
+ROW_HASH_COLUMN = '_row_hash'
+
+# Column holding each staging row's position in the source; it is not copied
+STAGING_ROW_COLUMN = '_staging_row'
+
+# MySQL cannot index TEXT without a prefix length, so text key columns become
+# VARCHAR of at least this length (InnoDB keys hold up to 768 utf8mb4 characters)
+MYSQL_KEY_LENGTH = 255
+
+
+def quote(name, db_type):
+    """Quote an identifier for the given backend"""
+    if db_type == 'MySQL':
+        return '`' + str(name).replace('`', '``') + '`'
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _column_list(columns, db_type, prefix=''):
+    return ', '.join(prefix + quote(col, db_type) for col in columns)
+
+
+def append_sql(db_type, table_name, staging_table, columns):
+    """Copy every staging row into the target table"""
+    column_list = _column_list(columns, db_type)
+    return (f"INSERT INTO {quote(table_name, db_type)} ({column_list}) "
+            f"SELECT {column_list} FROM {quote(staging_table, db_type)}")
+
+
+def upsert_sql(db_type, table_name, staging_table, columns, key_columns, order_column=None):
+    """Insert new staging rows and update the rows whose key already exists.
+
+    order_column gives the source order of the staging rows; of several rows
+    with the same key the last one is kept.
+    """
+    table = quote(table_name, db_type)
+    staging = quote(staging_table, db_type)
+    column_list = _column_list(columns, db_type)
+    value_columns = [col for col in columns if col not in key_columns]
+    key_list = _column_list(key_columns, db_type)
+    order = f" ORDER BY {quote(order_column, db_type)}" if order_column else ''
+
+    if db_type == 'PostgreSQL':
+        if value_columns:
+            updates = ', '.join(f"{quote(col, db_type)} = EXCLUDED.{quote(col, db_type)}"
+                                for col in value_columns)
+            action = f"DO UPDATE SET {updates}"
+        else:
+            action = "DO NOTHING"
+        last = f", {quote(order_column, db_type)} DESC" if order_column else ''
+        return (f"INSERT INTO {table} ({column_list}) "
+                f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging} "
+                f"ORDER BY {key_list}{last} "
+                f"ON CONFLICT ({key_list}) {action}")
+
+    if db_type == 'MySQL':
+        if not value_columns:
+            return (f"INSERT IGNORE INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {staging}{order}")
+        updates = ', '.join(f"{quote(col, db_type)} = s.{quote(col, db_type)}"
+                            for col in value_columns)
+        order = f" ORDER BY s.{quote(order_column, db_type)}" if order_column else ''
+        return (f"INSERT INTO {table} ({column_list}) "
+                f"SELECT {_column_list(columns, db_type, 's.')} FROM {staging} AS s{order} "
+                f"ON DUPLICATE KEY UPDATE {updates}")
+
+    if db_type == 'SQL Server':
+        match = ' AND '.join(f"target.{quote(col, db_type)} = source.{quote(col, db_type)}"
+                             for col in key_columns)
+        last = f"{quote(order_column, db_type)} DESC" if order_column else "(SELECT NULL)"
+        source = (f"(SELECT {column_list} FROM (SELECT {column_list}, ROW_NUMBER() OVER "
+                  f"(PARTITION BY {key_list} ORDER BY {last}) AS _rank FROM {staging}) AS ranked "
+                  f"WHERE _rank = 1)")
+        sql = f"MERGE INTO {table} AS target USING {source} AS source ON ({match}) "
+        if value_columns:
+            updates = ', '.join(f"target.{quote(col, db_type)} = source.{quote(col, db_type)}"
+                                for col in value_columns)
+            sql += f"WHEN MATCHED THEN UPDATE SET {updates} "
+        return (sql + f"WHEN NOT MATCHED BY TARGET THEN INSERT ({column_list}) "
+                f"VALUES ({_column_list(columns, db_type, 'source.')});")
+
+    if db_type == 'SQLite':
+        return (f"INSERT OR REPLACE INTO {table} ({column_list}) "
+                f"SELECT {column_list} FROM {staging}{order}")
+
+    raise ValueError(f"Upsert is not supported for {db_type}")
+
+
+def unique_index_sql(db_type, table_name, key_columns):
+    """CREATE UNIQUE INDEX on the key columns (needed by ON CONFLICT / ON DUPLICATE KEY / OR REPLACE)"""
+    name = f"ux_{table_name}_{'_'.join(str(col) for col in key_columns)}"[:60]
+    return (f"CREATE UNIQUE INDEX {quote(name, db_type)} ON {quote(table_name, db_type)} "
+            f"({_column_list(key_columns, db_type)})")
+
+
+def mysql_key_column_sql(table_name, column, length):
+    """Turn a MySQL TEXT key column into VARCHAR(length) so it can be indexed as a whole"""
+    return (f"ALTER TABLE {quote(table_name, 'MySQL')} "
+            f"MODIFY {quote(column, 'MySQL')} VARCHAR({length})")
+
+
+def add_hash_column_sql(db_type, table_name):
+    """Add the change detection hash column to an existing table"""
+    keyword = 'ADD' if db_type == 'SQL Server' else 'ADD COLUMN'
+    return f"ALTER TABLE {quote(table_name, db_type)} {keyword} {quote(ROW_HASH_COLUMN, db_type)} BIGINT"
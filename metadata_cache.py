@@ -0,0 +1,86 @@
+"""
+In-memory cache of database catalog information.
+
+DatabaseManager keeps the table names, the columns of every table (loaded for
+all tables at once with the inspector's bulk get_multi_columns) and the list
+of spatial columns, so the GUI can look them up repeatedly without querying
+the catalog. Entries are dropped when this application changes them (imports,
+CREATE/ALTER/DROP/RENAME statements, geometry conversions), on an explicit
+refresh, and once they are older than max_age seconds, so changes made by
+other clients show up after a refresh or at the latest after max_age.
+"""
+import threading
+import time
+
+
+class MetadataCache:
+    """Thread-safe store of table names, columns and spatial columns.
+
+    Each getter takes a load function that is called on a miss. Loads run
+    under the cache lock, so concurrent callers wait for one load instead of
+    running the same catalog query several times. Everything is reloaded once
+    the first entry is older than max_age seconds (None keeps entries until
+    they are invalidated).
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """Forget everything (e.g. on connect, disconnect or refresh)"""
+        with self._lock:
+            self.tables = None
+            self.columns = {}
+            self.columns_loaded = False
+            self.spatial = None
+            self.loaded_at = None
+
+    def invalidate(self, table_name=None):
+        """Drop what a change to table_name (or, without a name, to any table) may have made stale"""
+        with self._lock:
+            if table_name is None:
+                self.clear()
+                return
+            self.tables = None
+            self.spatial = None
+            self.columns.pop(table_name, None)
+
+    def _loaded(self):
+        if self.loaded_at is None:
+            self.loaded_at = time.time()
+
+    def _expire(self):
+        if (self.max_age is not None and self.loaded_at is not None
+                and time.time() - self.loaded_at >= self.max_age):
+            self.clear()
+
+    def table_names(self, load):
+        with self._lock:
+            self._expire()
+            if self.tables is None:
+                self.tables = list(load())
+                self._loaded()
+            return list(self.tables)
+
+    def table_columns(self, table_name, load_all, load_one):
+        """Columns of one table; the first lookup loads the columns of all tables with load_all()"""
+        with self._lock:
+            self._expire()
+            if not self.columns_loaded:
+                self.columns.update(load_all())
+                self.columns_loaded = True
+                self._loaded()
+            if table_name not in self.columns:
+                # Created after the bulk load or invalidated since
+                self.columns[table_name] = list(load_one(table_name))
+            return list(self.columns[table_name])
+
+    def spatial_columns(self, load):
+        with self._lock:
+            self._expire()
+            if self.spatial is None:
+                self.spatial = list(load())
+                self._loaded()
+            return list(self.spatial)
@@ -0,0 +1,236 @@
+"""
+Encoders for PostgreSQL's COPY ... FROM STDIN protocol.
+
+DatabaseManager uses these to bulk load DataFrames over psycopg2 instead of
+building multi-row INSERT statements. Both the text and the binary COPY
+formats are supported; values are encoded per column so the work stays in
+pandas/NumPy rather than in a Python loop over rows.
+"""
+import struct
+
+import numpy as np
+import pandas as pd
+
+COPY_NULL = '\\N'
+BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+BINARY_TRAILER = struct.pack('>h', -1)
+BINARY_NULL = struct.pack('>i', -1)
+
+# PostgreSQL timestamps are microseconds since 2000-01-01
+PG_EPOCH = pd.Timestamp('2000-01-01')
+
+# NumPy big-endian formats matching the column types pandas.to_sql creates
+_BINARY_FORMATS = {
+    'bool': '>?',
+    'int8': '>i2',
+    'uint8': '>i2',
+    'int16': '>i2',
+    'uint16': '>i4',
+    'int32': '>i4',
+    'uint32': '>i8',
+    'int64': '>i8',
+    'float32': '>f4',
+    'float64': '>f8',
+}
+
+
+def quote_identifier(name):
+    """Quote a table or column name for use in a COPY statement"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def copy_sql(table_name, columns, copy_format='text'):
+    """Build the COPY statement for the given table and columns"""
+    column_list = ', '.join(quote_identifier(col) for col in columns)
+    return (f"COPY {quote_identifier(table_name)} ({column_list}) "
+            f"FROM STDIN WITH (FORMAT {copy_format})")
+
+
+def copy_supported(dataframe):
+    """Return True if every column can be loaded with COPY in text format"""
+    for col in dataframe.columns:
+        series = dataframe[col]
+        if pd.api.types.is_timedelta64_dtype(series) or pd.api.types.is_complex_dtype(series):
+            return False
+        if series.dtype.name == 'uint64':
+            return False
+    return True
+
+
+def binary_supported(dataframe):
+    """Return True if every column has a binary COPY encoding"""
+    if not copy_supported(dataframe):
+        return False
+    for col in dataframe.columns:
+        if _binary_kind(dataframe[col]) is None:
+            return False
+    return True
+
+
+def _binary_kind(series):
+    """Return the binary encoding for a column, or None if unsupported"""
+    if pd.api.types.is_bool_dtype(series):
+        return _BINARY_FORMATS['bool']
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'timestamp'
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        return 'text' if pd.api.types.infer_dtype(categories) in ('string', 'empty') else None
+    name = series.dtype.name.lower()
+    if name in _BINARY_FORMATS:
+        return _BINARY_FORMATS[name]
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            return 'text'
+        if _is_binary(series):
+            return 'bytea'
+    return None
+
+
+def _is_binary(series):
+    """True for object columns holding only bytes-like values (and NULLs)"""
+    values = series.dropna()
+    return len(values) > 0 and all(isinstance(value, (bytes, bytearray, memoryview))
+                                   for value in values)
+
+
+def _text_column(series):
+    """Encode one column as COPY text-format fields"""
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(series):
+        values = series.map({True: 't', False: 'f'})
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            values = series.dt.tz_convert('UTC').dt.tz_localize(None).astype(str) + '+00'
+        else:
+            values = series.astype(str)
+    elif pd.api.types.is_numeric_dtype(series):
+        values = series.astype(str)
+    elif pd.api.types.is_object_dtype(series) and _is_binary(series):
+        # bytea hex format; the backslash is escaped as in every COPY text field
+        values = series.map(lambda value: '\\\\x' + bytes(value).hex(), na_action='ignore')
+    else:
+        values = (series.astype(str)
+                  .str.replace('\\', '\\\\', regex=False)
+                  .str.replace('\t', '\\t', regex=False)
+                  .str.replace('\n', '\\n', regex=False)
+                  .str.replace('\r', '\\r', regex=False))
+    values = values.to_numpy(dtype=object, copy=True)
+    values[mask] = COPY_NULL
+    return pd.Series(values, dtype=object)
+
+
+def encode_text(dataframe):
+    """Encode a DataFrame as COPY text-format rows"""
+    if len(dataframe) == 0:
+        return ''
+    columns = [_text_column(dataframe[col]) for col in dataframe.columns]
+    lines = columns[0] if len(columns) == 1 else columns[0].str.cat(columns[1:], sep='\t')
+    return '\n'.join(lines) + '\n'
+
+
+def _binary_values(series, kind):
+    """Return the NumPy values and null mask for a fixed-width column"""
+    mask = series.isna().to_numpy()
+    if kind == 'timestamp':
+        if getattr(series.dt, 'tz', None) is not None:
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        micros = (series - PG_EPOCH) // pd.Timedelta(microseconds=1)
+        return micros.to_numpy(dtype='int64', na_value=0).astype('>i8'), mask
+    return series.to_numpy(dtype=np.dtype(kind).newbyteorder('='), na_value=0).astype(kind), mask
+
+
+def _binary_fields(series, kind):
+    """Encode one column as a list of length-prefixed binary fields"""
+    if kind in ('text', 'bytea'):
+        fields = []
+        for value in series.to_numpy(dtype=object):
+            if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+                fields.append(BINARY_NULL)
+            else:
+                data = bytes(value) if kind == 'bytea' else str(value).encode('utf-8')
+                fields.append(struct.pack('>i', len(data)) + data)
+        return fields
+
+    values, mask = _binary_values(series, kind)
+    width = values.dtype.itemsize
+    packed = np.empty(len(values), dtype=[('length', '>i4'), ('value', values.dtype)])
+    packed['length'] = width
+    packed['value'] = values
+    buffer = packed.tobytes()
+    step = width + 4
+    fields = [buffer[i:i + step] for i in range(0, len(buffer), step)]
+    for i in np.flatnonzero(mask):
+        fields[i] = BINARY_NULL
+    return fields
+
+
+def encode_binary(dataframe):
+    """Encode a DataFrame as COPY binary-format tuples (without header/trailer)"""
+    rows = len(dataframe)
+    if rows == 0:
+        return b''
+    kinds = [_binary_kind(dataframe[col]) for col in dataframe.columns]
+    for col, kind in zip(dataframe.columns, kinds):
+        if kind is None:
+            raise ValueError(f"Column '{col}' ({dataframe[col].dtype}) has no binary COPY encoding")
+    field_count = struct.pack('>h', len(kinds))
+
+    # Fast path: fixed-width columns without NULLs pack into one record array
+    if 'text' not in kinds and 'bytea' not in kinds and not dataframe.isna().to_numpy().any():
+        columns = [_binary_values(dataframe[col], kind)[0]
+                   for col, kind in zip(dataframe.columns, kinds)]
+        layout = [('fields', '>i2')]
+        for i, values in enumerate(columns):
+            layout.extend([(f'length{i}', '>i4'), (f'value{i}', values.dtype)])
+        records = np.empty(rows, dtype=layout)
+        records['fields'] = len(kinds)
+        for i, values in enumerate(columns):
+            records[f'length{i}'] = values.dtype.itemsize
+            records[f'value{i}'] = values
+        return records.tobytes()
+
+    columns = [_binary_fields(dataframe[col], kind) for col, kind in zip(dataframe.columns, kinds)]
+    parts = []
+    for row in zip(*columns):
+        parts.append(field_count)
+        parts.extend(row)
+    return b''.join(parts)
+
+
+class CopyStream:
+    """File-like object that feeds encoded chunks to cursor.copy_expert"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._current = None
+        self._offset = 0
+        self._empty = b''
+
+    def _next_chunk(self):
+        try:
+            self._current = next(self._chunks)
+        except StopIteration:
+            self._current = None
+            return False
+        self._empty = self._current[:0]
+        self._offset = 0
+        return True
+
+    def read(self, size=-1):
+        parts = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            if self._current is None or self._offset >= len(self._current):
+                if not self._next_chunk():
+                    break
+                continue
+            end = len(self._current) if size < 0 else self._offset + remaining
+            piece = self._current[self._offset:end]
+            self._offset += len(piece)
+            remaining -= len(piece)
+            parts.append(piece)
+        return self._empty.join(parts)
+
+    def readline(self, size=-1):
+        return self.read(size)
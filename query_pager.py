@@ -0,0 +1,74 @@
+"""
+Page-by-page access to query results.
+
+DatabaseManager.open_query executes a statement with a streaming
+(server-side where the driver supports it) cursor and returns a QueryPager.
+Rows are pulled from the cursor only when a page is requested, so the time
+to the first rows and the memory used do not depend on the size of the
+result.
+"""
+import threading
+import time
+
+
+class QueryPager:
+    """Fetch rows from an open result in pages of page_size rows"""
+
+    def __init__(self, connection, result, page_size=1000, started=None, rowcount=-1, decode=None):
+        self.connection = connection
+        self.result = result
+        self.page_size = page_size
+        self.columns = list(result.keys()) if result is not None else []
+        self.rowcount = rowcount
+        # Optional function applied to every fetched value (e.g. binary geometry to WKT)
+        self.decode = decode
+        self.rows_fetched = 0
+        self.exhausted = result is None
+        self.started = started if started is not None else time.perf_counter()
+        self.first_page_seconds = None
+        self._lock = threading.Lock()
+
+    @property
+    def returns_rows(self):
+        """False for statements such as INSERT/UPDATE/DDL"""
+        return bool(self.columns)
+
+    def fetch_page(self, size=None):
+        """Return the next page as a list of tuples ([] once the result is exhausted)"""
+        size = size or self.page_size
+        with self._lock:
+            if self.exhausted:
+                return []
+            try:
+                rows = [tuple(row) for row in self.result.fetchmany(size)]
+                if self.decode is not None:
+                    rows = [tuple(self.decode(value) for value in row) for row in rows]
+            except Exception:
+                self._close()
+                raise
+            if self.first_page_seconds is None:
+                self.first_page_seconds = time.perf_counter() - self.started
+            self.rows_fetched += len(rows)
+            if len(rows) < size:
+                self._close()
+            return rows
+
+    def close(self):
+        """Release the cursor and return the connection to the pool"""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        self.exhausted = True
+        if self.result is not None:
+            self.result.close()
+            self.result = None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
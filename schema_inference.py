@@ -0,0 +1,310 @@
+"""
+Sample-based schema inference for CSV imports.
+
+A TableSchema maps each column to a compact logical type such as 'int16',
+'float32', 'bool', 'datetime', 'category(32)' or 'string(64)'. It is inferred
+from a sample of the file and can be edited before importing. From it we
+derive the pandas dtypes used in memory (apply) and the SQL column types
+passed to to_sql for each database backend (sql_types).
+"""
+import io
+import os
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import types as sqltypes
+
+TYPE_NAMES = ('bool', 'int8', 'int16', 'int32', 'int64', 'float32', 'float64',
+              'datetime', 'category', 'string', 'text')
+
+# Nullable pandas dtypes so missing values outside the sample do not break the cast
+PANDAS_DTYPES = {
+    'bool': 'boolean',
+    'int8': 'Int8',
+    'int16': 'Int16',
+    'int32': 'Int32',
+    'int64': 'Int64',
+    'float32': 'float32',
+    'float64': 'float64',
+    'category': 'category',
+}
+
+BOOL_VALUES = {
+    'true': True, 'false': False,
+    't': True, 'f': False,
+    'yes': True, 'no': False,
+    'y': True, 'n': False,
+}
+
+INTEGER_TYPES = ('int8', 'int16', 'int32', 'int64')
+
+# Longest VARCHAR/NVARCHAR we create on each backend before switching to a text type
+MAX_VARCHAR = {
+    'PostgreSQL': 10485760,
+    'MySQL': 1024,
+    'SQL Server': 4000,
+    'SQLite': 0,
+}
+
+# A MySQL row holds at most 65,535 bytes, counting VARCHARs at 4 bytes per
+# (utf8mb4) character; string columns beyond this budget become TEXT, which
+# is stored off-row
+MYSQL_VARCHAR_BYTES = 60000
+
+_TYPE_PATTERN = re.compile(r'^\s*([a-z0-9]+)\s*(?:\(\s*(\d+)\s*\))?\s*$')
+
+
+def parse_type(type_string):
+    """Split 'string(64)' into ('string', 64); raise ValueError for unknown types"""
+    match = _TYPE_PATTERN.match(str(type_string).lower())
+    if not match or match.group(1) not in TYPE_NAMES:
+        raise ValueError(f"Unknown column type: {type_string} (expected one of {', '.join(TYPE_NAMES)})")
+    name, length = match.group(1), match.group(2)
+    if length is not None and name not in ('string', 'category'):
+        raise ValueError(f"Only string and category types take a length: {type_string}")
+    return name, int(length) if length is not None else None
+
+
+def string_length(max_length):
+    """Column length with headroom for values longer than any seen in the sample"""
+    length = 16
+    while length < max_length * 2:
+        length *= 2
+    return length
+
+
+def _integer_type(values):
+    """Smallest integer type that holds twice the sampled range"""
+    low, high = int(values.min()) * 2, int(values.max()) * 2
+    for name in ('int8', 'int16', 'int32'):
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return name
+    return 'int64'
+
+
+def _parse_datetimes(series):
+    """Parse strings as datetimes, or return None if any value is not a date"""
+    for options in ({'format': 'ISO8601'}, {}):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            try:
+                return pd.to_datetime(series, **options)
+            except (TypeError, ValueError, OverflowError):
+                continue
+    return None
+
+
+def sample_csv(path, sample_rows=10000, usecols=None, blocks=10):
+    """Read about sample_rows rows of a CSV file, spread over the whole file.
+
+    Half of the sample is the start of the file; the rest comes from blocks
+    of lines at evenly spaced byte offsets, so values that only appear
+    further down (growing ids, later dates, longer strings) are seen too.
+    """
+    head = pd.read_csv(path, nrows=max(sample_rows // 2, 1), usecols=usecols)
+    if len(head) < sample_rows // 2:
+        # The whole file fits in the sample
+        return head
+
+    size = os.path.getsize(path)
+    rows_per_block = max((sample_rows - len(head)) // blocks, 1)
+    frames = [head]
+    with open(path, 'rb') as f:
+        header = f.readline()
+        for i in range(1, blocks + 1):
+            f.seek(size * i // (blocks + 1))
+            f.readline()  # skip the partial line at the offset
+            lines = [line for line in (f.readline() for _ in range(rows_per_block)) if line]
+            if not lines:
+                continue
+            try:
+                block = pd.read_csv(io.BytesIO(header + b''.join(lines)), usecols=usecols)
+            except (ValueError, pd.errors.ParserError):
+                # e.g. the offset landed inside a quoted multi-line value
+                continue
+            if list(block.columns) == list(head.columns):
+                frames.append(block)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def infer_column_type(series, categorical_ratio=0.5, max_categories=1000):
+    """Infer the logical type of one sampled column"""
+    values = series.dropna()
+    if len(values) == 0:
+        return 'text'
+
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    if pd.api.types.is_integer_dtype(series):
+        return _integer_type(values)
+    if pd.api.types.is_float_dtype(series):
+        if (values == np.floor(values)).all() and values.abs().max() < 2 ** 63:
+            # Integers read back as float because of missing values
+            return _integer_type(values.astype('int64'))
+        if (values.astype('float32').astype('float64') == values).all():
+            return 'float32'
+        return 'float64'
+
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == 'boolean':
+        return 'bool'
+    if inferred != 'string':
+        return 'text'
+
+    lowered = values.str.lower()
+    if lowered.isin(list(BOOL_VALUES)).all() and lowered.nunique() <= 2:
+        return 'bool'
+    if _parse_datetimes(values) is not None:
+        return 'datetime'
+
+    length = string_length(int(values.str.len().max()))
+    distinct = values.nunique()
+    if distinct <= max_categories and distinct <= len(values) * categorical_ratio:
+        return f'category({length})'
+    return f'string({length})'
+
+
+class TableSchema:
+    """Editable column -> logical type map with pandas and SQL type mappings"""
+
+    def __init__(self, types):
+        self.types = {}
+        for column, type_string in types.items():
+            self.set_type(column, type_string)
+
+    @classmethod
+    def from_sample(cls, sample, **options):
+        """Infer a schema from a DataFrame sample"""
+        return cls({col: infer_column_type(sample[col], **options) for col in sample.columns})
+
+    @classmethod
+    def from_csv(cls, path, sample_rows=10000, usecols=None, **options):
+        """Infer a schema from about sample_rows rows spread over a CSV file"""
+        return cls.from_sample(sample_csv(path, sample_rows, usecols), **options)
+
+    def set_type(self, column, type_string):
+        """Change a column's type after validating it"""
+        name, length = parse_type(type_string)
+        self.types[column] = f'{name}({length})' if length else name
+
+    def subset(self, columns):
+        """Schema restricted to the given columns"""
+        return TableSchema({col: self.types[col] for col in columns if col in self.types})
+
+    def with_wide_integers(self):
+        """Copy with every integer column as int64 (BIGINT).
+
+        Used by streaming imports, where the table is created from the first
+        chunk and later chunks may hold integers outside the sampled range.
+        """
+        return TableSchema({col: 'int64' if type_string in INTEGER_TYPES else type_string
+                            for col, type_string in self.types.items()})
+
+    def dtype_map(self):
+        """Compact in-memory pandas dtype per column"""
+        dtypes = {}
+        for column, type_string in self.types.items():
+            name, _ = parse_type(type_string)
+            if name == 'datetime':
+                dtypes[column] = 'datetime64[ns]'
+            elif name in ('string', 'text'):
+                dtypes[column] = 'string'
+            else:
+                dtypes[column] = PANDAS_DTYPES[name]
+        return dtypes
+
+    def sql_types(self, db_type):
+        """SQLAlchemy column types for to_sql(dtype=...) on the given backend"""
+        max_varchar = MAX_VARCHAR.get(db_type, 0)
+        unicode = db_type == 'SQL Server'
+        varchar_bytes = MYSQL_VARCHAR_BYTES if db_type == 'MySQL' else None
+        result = {}
+        for column, type_string in self.types.items():
+            name, length = parse_type(type_string)
+            if name == 'bool':
+                result[column] = sqltypes.Boolean()
+            elif name in ('int8', 'int16'):
+                result[column] = sqltypes.SmallInteger()
+            elif name == 'int32':
+                result[column] = sqltypes.Integer()
+            elif name == 'int64':
+                result[column] = sqltypes.BigInteger()
+            elif name == 'float32':
+                result[column] = sqltypes.REAL()
+            elif name == 'float64':
+                result[column] = sqltypes.Float(precision=53)
+            elif name == 'datetime':
+                result[column] = sqltypes.DateTime()
+            elif length and length <= max_varchar and (varchar_bytes is None or varchar_bytes >= length * 4):
+                result[column] = sqltypes.Unicode(length) if unicode else sqltypes.String(length)
+                if varchar_bytes is not None:
+                    varchar_bytes -= length * 4
+            else:
+                result[column] = sqltypes.UnicodeText() if unicode else sqltypes.Text()
+        return result
+
+    def sql_type_names(self, db_type, engine=None):
+        """SQL type names per column as the backend's DDL would spell them"""
+        dialect = engine.dialect if engine is not None else None
+        return {column: sql_type.compile(dialect=dialect)
+                for column, sql_type in self.sql_types(db_type).items()}
+
+    def apply(self, dataframe):
+        """Return the DataFrame cast to the schema's compact dtypes.
+
+        An integer column holding values outside its type's range is widened
+        to int64 (and its type in the schema with it), so sql_types taken
+        after apply fit the data. Raises ValueError naming the column when a
+        value does not fit its type otherwise (e.g. a string longer than its
+        declared length, or text in a numeric column), so the type can be
+        changed before importing.
+        """
+        data = {}
+        for column in dataframe.columns:
+            series = dataframe[column]
+            if column in self.types:
+                try:
+                    series = self._cast(series, *parse_type(self.types[column]))
+                except (TypeError, ValueError, OverflowError) as e:
+                    raise ValueError(f"Column '{column}' does not fit type "
+                                     f"{self.types[column]}: {str(e)}") from e
+            data[column] = series
+        return pd.DataFrame(data, index=dataframe.index, copy=False)
+
+    def _cast(self, series, name, length):
+        if name == 'bool':
+            if not pd.api.types.is_bool_dtype(series):
+                missing = series.isna()
+                mapped = series.astype(str).str.lower().map(BOOL_VALUES)
+                if (mapped.isna() & ~missing).any():
+                    raise ValueError("values other than true/false")
+                series = mapped.where(~missing)
+            return series.astype('boolean')
+        if name == 'datetime':
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return series
+            parsed = _parse_datetimes(series)
+            if parsed is None:
+                raise ValueError("values that are not dates")
+            return parsed
+        if name in INTEGER_TYPES and name != 'int64' and pd.api.types.is_numeric_dtype(series):
+            info = np.iinfo(name)
+            low, high = series.min(), series.max()
+            if pd.notna(low) and (low < info.min or high > info.max):
+                self.types[series.name] = name = 'int64'
+        if name not in ('string', 'text', 'category'):
+            return series.astype(PANDAS_DTYPES[name])
+
+        if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty', 'categorical'):
+            series = series.astype('string')
+        if length:
+            longest = series.dropna().astype(str).str.len().max()
+            if pd.notna(longest) and longest > length:
+                raise ValueError(f"values longer than {length} characters")
+        return series.astype('category') if name == 'category' else series
@@ -0,0 +1,19 @@
+"""Shared fixtures; the modules under test live in the project root."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_manager import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    """DatabaseManager connected to a new SQLite database file"""
+    db_manager = DatabaseManager()
+    assert db_manager.connect({'db_type': 'SQLite', 'database': str(tmp_path / 'test.db'),
+                               'host': '', 'port': '', 'username': '', 'password': ''})
+    yield db_manager
+    db_manager.disconnect()
@@ -0,0 +1,108 @@
+"""Tests for the parallel multi-file importer."""
+import os
+
+import pandas as pd
+import pytest
+
+import import_jobs
+from batch_importer import BatchImporter, expand_paths, table_name_for
+from database_manager import DatabaseManager
+
+
+def write_csv(path, rows):
+    pd.DataFrame({'id': range(rows), 'name': [f'n{i}' for i in range(rows)]}).to_csv(
+        path, index=False)
+    return str(path)
+
+
+def table_rows(db_manager, table_name):
+    return db_manager.execute_query(f'SELECT COUNT(*) AS n FROM "{table_name}"')[0]['n']
+
+
+def test_table_name_for():
+    """Test table names derived from file names."""
+    assert table_name_for('/data/my file-2024.csv') == 'my_file_2024'
+    assert table_name_for('roads.shp') == 'roads'
+
+
+def test_expand_paths(tmp_path):
+    """Test expanding directories and globs into importable files only."""
+    for name in ('a.csv', 'b.CSV', 'c.geojson', 'notes.txt'):
+        (tmp_path / name).write_text('x')
+    expected = sorted(str(tmp_path / name) for name in ('a.csv', 'b.CSV', 'c.geojson'))
+    assert expand_paths(str(tmp_path)) == expected
+    assert expand_paths([str(tmp_path / '*.csv'), str(tmp_path / 'a.csv')]) == [str(tmp_path / 'a.csv')]
+
+
+def test_add_files_table_names(sqlite_manager, tmp_path):
+    """Test table names from a mapping or callable and rejecting duplicate targets."""
+    first = write_csv(tmp_path / 'first.csv', 1)
+    second = write_csv(tmp_path / 'second.csv', 1)
+    importer = BatchImporter(sqlite_manager)
+    tasks = importer.add_files([first, second], table_names={first: 'custom'})
+    assert [task.table_name for task in tasks] == ['custom', 'second']
+
+    with pytest.raises(ValueError, match='second'):
+        importer.add_files(second)
+    assert len(importer.tasks) == 2
+
+    other = BatchImporter(sqlite_manager)
+    other.add_files(first, table_names=lambda path: 'from_callable')
+    assert other.tasks[0].table_name == 'from_callable'
+
+
+def test_run_imports_all_files(sqlite_manager, tmp_path):
+    """Test importing several CSV files in parallel and the summary."""
+    paths = [write_csv(tmp_path / f'file{i}.csv', 10 * (i + 1)) for i in range(3)]
+    importer = BatchImporter(sqlite_manager, max_workers=3, chunk_rows=7, columns=['id'])
+    importer.add_files(paths)
+    events = []
+    summary = importer.run(progress_callback=lambda task, current, total, status: events.append(task))
+
+    assert (summary['files'], summary['succeeded'], summary['failed']) == (3, 3, 0)
+    assert summary['rows'] == 60
+    assert [table_rows(sqlite_manager, f'file{i}') for i in range(3)] == [10, 20, 30]
+    assert [col['name'] for col in sqlite_manager.get_table_info('file0')] == ['id']
+    assert all(task['status'] == 'Completed' for task in summary['tasks'])
+    assert summary['stages']['execute'] > 0
+    assert {task.table_name for task in events} == {'file0', 'file1', 'file2'}
+
+
+def test_failed_file_is_reported(sqlite_manager, tmp_path):
+    """Test that one failing file is listed in the summary without stopping the others."""
+    good = write_csv(tmp_path / 'good.csv', 5)
+    bad = write_csv(tmp_path / 'bad.csv', 5)
+    importer = BatchImporter(sqlite_manager, max_workers=2)
+    importer.add_files([good, bad])
+    os.remove(bad)
+    summary = importer.run()
+
+    assert (summary['succeeded'], summary['failed']) == (1, 1)
+    failure = summary['failures'][0]
+    assert failure['table'] == 'bad' and failure['status'] == 'Failed'
+    assert failure['error']
+    assert table_rows(sqlite_manager, 'good') == 5
+
+
+def test_run_requires_connection():
+    """Test that running without a connection raises."""
+    with pytest.raises(RuntimeError):
+        BatchImporter(DatabaseManager()).run()
+
+
+def test_resumable_run_skips_completed_files(sqlite_manager, tmp_path):
+    """Test job files of a resumable run and skipping completed files on resume."""
+    store = import_jobs.JobStore(str(tmp_path / 'jobs'))
+    path = write_csv(tmp_path / 'data.csv', 12)
+    importer = BatchImporter(sqlite_manager, chunk_rows=5, resumable=True, job_store=store)
+    importer.add_files(path)
+    assert importer.run()['succeeded'] == 1
+    task = importer.tasks[0]
+    assert store.load(task.job_id)['status'] == 'completed'
+
+    again = BatchImporter(sqlite_manager, chunk_rows=5, job_store=store)
+    again.add_files(path)
+    summary = again.run(resume=True)
+    assert summary['tasks'][0]['status'] == 'Completed'
+    assert summary['rows'] == 0
+    assert table_rows(sqlite_manager, 'data') == 12
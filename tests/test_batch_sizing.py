@@ -0,0 +1,79 @@
+"""Tests for adaptive batch sizing."""
+import pandas as pd
+
+from batch_sizing import AdaptiveBatchSizer, rows_for_budget, split_adaptive
+
+
+def test_grows_while_throughput_holds():
+    """Test growth by half after batches at the best rate so far."""
+    sizer = AdaptiveBatchSizer(max_rows=100000, initial_rows=1000, max_latency=10.0)
+    assert sizer.record(1000, 1.0) == 1500
+    assert sizer.record(1500, 1.5) == 2250
+    # Within 10% of the best rate still counts as holding up
+    assert sizer.record(2250, 2.25 / 0.95) == 3375
+    assert sizer.best_rate == 1000.0
+    assert sizer.batches == 3
+
+
+def test_shrinks_when_throughput_drops():
+    """Test backing off by a quarter when rows/s falls below 90% of the best."""
+    sizer = AdaptiveBatchSizer(max_rows=100000, initial_rows=1000)
+    sizer.record(1000, 0.1)
+    assert sizer.record(1500, 0.5) == 1125
+    assert sizer.best_rate == 10000.0
+
+
+def test_halves_on_slow_batch():
+    """Test halving when a batch takes longer than max_latency, even at a good rate."""
+    sizer = AdaptiveBatchSizer(max_rows=100000, initial_rows=8000, max_latency=2.0)
+    assert sizer.record(8000, 2.5) == 4000
+    assert sizer.best_rate == 0.0
+    assert sizer.record(4000, 3.0) == 2000
+
+
+def test_clamped_to_bounds():
+    """Test that the size never leaves min_rows..max_rows."""
+    sizer = AdaptiveBatchSizer(max_rows=1200, initial_rows=1000, min_rows=300)
+    assert sizer.record(1000, 0.1) == 1200
+    assert sizer.record(1200, 0.1) == 1200
+    for _ in range(5):
+        sizer.record(sizer.size, 10.0)
+    assert sizer.size == 300
+
+
+def test_initial_size_clamped():
+    """Test that initial_rows and min_rows are fitted into the bounds."""
+    assert AdaptiveBatchSizer(max_rows=500, initial_rows=1000).size == 500
+    assert AdaptiveBatchSizer(max_rows=500, initial_rows=10, min_rows=50).size == 50
+    sizer = AdaptiveBatchSizer(max_rows=10, min_rows=0)
+    assert (sizer.min_rows, sizer.max_rows) == (1, 10)
+    assert AdaptiveBatchSizer(max_rows=5, min_rows=20).max_rows == 20
+
+
+def test_empty_and_instant_batches():
+    """Test that empty batches are ignored and zero-time batches grow the size."""
+    sizer = AdaptiveBatchSizer(max_rows=100000, initial_rows=1000)
+    assert sizer.record(0, 1.0) == 1000
+    assert sizer.batches == 0
+    assert sizer.record(1000, 0.0) == 1500
+    assert sizer.best_rate == 0.0
+    assert sizer.describe() == "batch 1,500 rows"
+
+
+def test_split_adaptive_follows_size():
+    """Test that slices follow the size the sizer has when each one is taken."""
+    sizer = AdaptiveBatchSizer(max_rows=100, initial_rows=10)
+    frame = pd.DataFrame({'id': range(50)})
+    sizes = []
+    for batch in split_adaptive(frame, sizer):
+        sizes.append(len(batch))
+        sizer.record(len(batch), 0.001)
+    assert sizes == [10, 15, 22, 3]
+
+
+def test_rows_for_budget_limits():
+    """Test the byte budget, bind parameter and row caps."""
+    assert rows_for_budget(100, byte_budget=10000) == 100
+    assert rows_for_budget(100, byte_budget=10000, columns=10, max_parameters=500) == 50
+    assert rows_for_budget(10 ** 9, byte_budget=10) == 1
+    assert rows_for_budget(1, byte_budget=10 ** 9, max_rows=1000) == 1000
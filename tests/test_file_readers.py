@@ -0,0 +1,102 @@
+"""Tests for the import source readers."""
+import geopandas as gpd
+import pandas as pd
+import pytest
+import shapely
+
+import file_readers
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'id': range(10), 'name': [f'n{i}' for i in range(10)],
+                  'amount': [i * 10 for i in range(10)],
+                  'day': ['2024-01-01'] * 5 + [None] * 5}).to_csv(path, index=False)
+    return path
+
+
+def test_read_csv_columns_in_selected_order(csv_path):
+    """Test that only the selected columns are returned, in the order asked for."""
+    data = file_readers.read_csv(csv_path, ['name', 'id'])
+    assert list(data.columns) == ['name', 'id']
+    assert len(data) == 10
+
+
+def test_read_csv_where_on_unselected_column(csv_path):
+    """Test a row filter that refers to a column which is not imported."""
+    data = file_readers.read_csv(csv_path, ['name'], 'amount >= 70')
+    assert list(data.columns) == ['name']
+    assert list(data['name']) == ['n7', 'n8', 'n9']
+
+
+def test_read_csv_nrows(csv_path):
+    """Test reading only the first rows."""
+    assert len(file_readers.read_csv(csv_path, nrows=3)) == 3
+
+
+def test_whole_file_and_chunks_get_the_same_dtypes(csv_path):
+    """Test that read_csv, iter_csv and peek_csv infer the same dtypes by default."""
+    whole = file_readers.read_csv(csv_path)
+    chunk = next(file_readers.iter_csv(csv_path, chunksize=10))
+    preview = file_readers.peek_csv(csv_path)['data']
+    assert whole.dtypes.to_dict() == chunk.dtypes.to_dict() == preview.dtypes.to_dict()
+
+
+def test_iter_csv_chunks_with_columns_and_where(csv_path):
+    """Test chunked reads with a projection and a row filter."""
+    chunks = list(file_readers.iter_csv(csv_path, ['amount', 'id'], 'id % 2 == 0', chunksize=4))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ['amount', 'id']
+    assert pd.concat(chunks)['id'].tolist() == [0, 2, 4, 6, 8]
+
+
+def test_filter_rows_without_expression():
+    """Test that an empty row filter keeps every row."""
+    frame = pd.DataFrame({'a': [1, 2]})
+    assert file_readers.filter_rows(frame, '') is frame
+
+
+def test_peek_and_estimate_csv(csv_path):
+    """Test the preview of a file that fits in it, and of one that does not."""
+    preview = file_readers.peek_csv(csv_path)
+    assert preview['complete'] and preview['rows'] == 10
+    preview = file_readers.peek_csv(csv_path, rows=4)
+    assert not preview['complete'] and len(preview['data']) == 4
+    assert preview['rows'] == file_readers.estimate_csv_rows(csv_path) == 10
+    assert file_readers.estimate_csv_rows(csv_path.parent / 'missing.csv') is None
+
+
+def test_parse_bbox():
+    """Test bounding box parsing and validation."""
+    assert file_readers.parse_bbox(' 1, 2,3 ,4') == (1.0, 2.0, 3.0, 4.0)
+    assert file_readers.parse_bbox('  ') is None
+    for text in ('1,2,3', '3,2,1,4', 'a,b,c,d'):
+        with pytest.raises(ValueError):
+            file_readers.parse_bbox(text)
+
+
+@pytest.fixture
+def gpkg_path(tmp_path):
+    path = tmp_path / 'points.gpkg'
+    gpd.GeoDataFrame({'id': range(5), 'kind': ['a', 'b', 'a', 'b', 'a'], 'size': range(5)},
+                     geometry=shapely.points(range(5), range(5)), crs=4326).to_file(path)
+    return path
+
+
+def test_read_spatial_columns_bbox_and_where(gpkg_path):
+    """Test projection, bounding box and attribute filters on a spatial file."""
+    data = file_readers.read_spatial(gpkg_path, ['size', 'id', 'missing'], bbox=(0.5, 0.5, 3.5, 3.5),
+                                     where="kind = 'a'")
+    assert list(data.columns) == ['size', 'id', 'geometry']
+    assert data['id'].tolist() == [2]
+    assert len(file_readers.read_spatial(gpkg_path, rows=2)) == 2
+
+
+def test_peek_spatial(gpkg_path):
+    """Test layer metadata and the first features."""
+    info = file_readers.peek_spatial(gpkg_path, rows=3)
+    assert info['features'] == 5 and not info['complete']
+    assert len(info['data']) == 3
+    assert info['fields'] == ['id', 'kind', 'size']
+    assert info['bounds'] == (0.0, 0.0, 4.0, 4.0)
@@ -0,0 +1,101 @@
+"""Tests for GeoPackage blobs and SQL Server geometry decoding."""
+import struct
+
+import numpy as np
+import shapely
+
+import geometry_encoding as ge
+
+
+def _sqlserver(srid, points, figures, shapes, version=1, props=0x04):
+    """Build a SQL Server geometry value from points, (attribute, offset) figures
+    and (parent, figure, type) shapes"""
+    blob = struct.pack('<iBB', srid, version, props)
+    blob += struct.pack('<i', len(points)) + b''.join(struct.pack('<dd', *p) for p in points)
+    blob += struct.pack('<i', len(figures)) + b''.join(struct.pack('<Bi', *f) for f in figures)
+    blob += struct.pack('<i', len(shapes)) + b''.join(struct.pack('<iiB', *s) for s in shapes)
+    return blob
+
+
+def test_gpkg_blob_round_trip():
+    """Test GeoPackage blob header, envelope and WKB round-trip."""
+    polygon = shapely.Polygon([(0, 0), (4, 0), (4, 3), (0, 0)])
+    blobs = ge.gpkg_blobs([shapely.Point(1, 2), None, polygon], 4326)
+    assert blobs[1] is None
+    assert blobs[0][:4] == b'GP\x00\x03'
+    assert struct.unpack_from('<i', blobs[0], 4)[0] == 4326
+    assert shapely.from_wkb(ge.gpkg_wkb(blobs[2])).equals(polygon)
+    assert ge.decode_geometries(blobs)[2].equals(polygon)
+    np.testing.assert_array_equal(ge.geometry_bounds(list(blobs))[[0, 2]],
+                                  [[1, 2, 1, 2], [0, 0, 4, 3]])
+    assert ge.geometry_text(blobs[0]) == 'POINT (1 2)'
+
+
+def test_gpkg_blob_without_envelope():
+    """Test big-endian blobs without an envelope and the empty geometry flag."""
+    blob = b'GP\x00\x00' + struct.pack('>i', 4326) + shapely.to_wkb(shapely.Point(5, 6))
+    assert ge.gpkg_wkb(blob) == shapely.to_wkb(shapely.Point(5, 6))
+    assert ge.geometry_text(blob) == 'POINT (5 6)'
+    assert ge.value_bounds(blob) == (5.0, 6.0, 5.0, 6.0)
+    assert ge.gpkg_wkb(b'GP\x00\x11' + bytes(4)) is None
+
+
+def test_geometry_bounds_mixed_values():
+    """Test bounds of WKT, blobs and missing values."""
+    bounds = ge.geometry_bounds(['LINESTRING (0 0, 3 4)', None])
+    assert bounds[0].tolist() == [0, 0, 3, 4]
+    assert np.isnan(bounds[1]).all()
+    assert ge.value_bounds(None) is None
+    assert ge.value_bounds('not wkt') is None
+
+
+def test_decode_sqlserver_point_and_line():
+    """Test the single point and single line segment serializations."""
+    point = bytes.fromhex('00000000010C000000000000F03F0000000000000040')
+    line = bytes.fromhex('000000000114000000000000F03F000000000000F03F'
+                         '00000000000000400000000000000040')
+    assert ge.decode_sqlserver_geometry(point).equals(shapely.Point(1, 2))
+    assert ge.decode_sqlserver_geometry(line).equals(shapely.LineString([(1, 1), (2, 2)]))
+
+
+def test_decode_sqlserver_polygon_with_hole():
+    """Test a polygon whose second figure is an interior ring."""
+    blob = _sqlserver(4326, [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0),
+                             (2, 2), (2, 8), (8, 8), (8, 2), (2, 2)],
+                      [(2, 0), (0, 5)], [(-1, 0, 3)])
+    polygon = ge.decode_sqlserver_geometry(blob)
+    assert polygon.geom_type == 'Polygon'
+    assert len(polygon.interiors) == 1
+    assert polygon.area == 100 - 36
+
+
+def test_decode_sqlserver_collections():
+    """Test multi-polygons and collections with an empty member."""
+    multi = _sqlserver(0, [(0, 0), (1, 0), (1, 1), (0, 0), (5, 5), (6, 5), (6, 6), (5, 5)],
+                       [(2, 0), (2, 4)], [(-1, 0, 6), (0, 0, 3), (0, 1, 3)])
+    assert ge.decode_sqlserver_geometry(multi).geom_type == 'MultiPolygon'
+    assert len(ge.decode_sqlserver_geometry(multi).geoms) == 2
+
+    collection = _sqlserver(0, [(1, 1), (2, 2), (3, 3)], [(1, 0), (1, 1)],
+                            [(-1, 0, 7), (0, 0, 1), (0, 1, 2), (0, -1, 3)])
+    geometry = ge.decode_sqlserver_geometry(collection)
+    assert [g.geom_type for g in geometry.geoms] == ['Point', 'LineString', 'Polygon']
+    assert geometry.geoms[2].is_empty
+
+
+def test_decode_sqlserver_rejects_other_values():
+    """Test None for values that are not SQL Server geometries or are curves."""
+    assert ge.decode_sqlserver_geometry(b'garbage') is None
+    assert ge.decode_sqlserver_geometry(b'\x01\x02') is None
+    arc = _sqlserver(0, [(0, 0), (1, 1), (2, 0)], [(2, 0)], [(-1, 0, 8)], version=2)
+    assert ge.decode_sqlserver_geometry(arc) is None
+
+
+def test_geometry_text_decodes_only_marked_sqlserver_values():
+    """Test that plain varbinary values are left alone."""
+    point = bytes.fromhex('00000000010C000000000000F03F0000000000000040')
+    assert ge.geometry_text(ge.SqlServerGeometry(point)) == 'POINT (1 2)'
+    assert ge.geometry_text(point) == point
+    assert ge.geometry_text(ge.SqlServerGeometry(b'\x01\x02')) == b'\x01\x02'
+    assert ge.geometry_text('POINT (1 2)') == 'POINT (1 2)'
+    assert ge.geometry_text(None) is None
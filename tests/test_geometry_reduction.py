@@ -0,0 +1,86 @@
+"""Tests for the optional geometry reduction before spatial imports."""
+import geopandas as gpd
+import numpy as np
+import shapely
+
+import geometry_reduction
+
+
+def _wiggly_lines(count):
+    """Lines of 101 vertices that wiggle by 0.001 around a straight line"""
+    xs = np.linspace(0, 10, 101)
+    ys = np.where(np.arange(101) % 2, 0.001, 0.0)
+    return [shapely.LineString(np.column_stack([xs, ys + i])) for i in range(count)]
+
+
+def test_tolerance_simplifies_and_counts():
+    """Test simplification and the vertex and byte counts."""
+    reduced, stats = geometry_reduction.reduce_geometries(_wiggly_lines(3) + [None], tolerance=0.01)
+    assert [shapely.get_num_coordinates(g) for g in reduced[:3]] == [2, 2, 2]
+    assert reduced[3] is None
+    assert stats['features'] == 4
+    assert (stats['vertices_before'], stats['vertices_after']) == (303, 6)
+    assert stats['bytes_after'] < stats['bytes_before']
+    assert stats['emptied'] == 0
+
+
+def test_simplify_preserves_topology():
+    """Test that simplified polygons stay valid and keep their holes."""
+    polygon = shapely.Point(0, 0).buffer(10, quad_segs=64).difference(shapely.Point(0, 0).buffer(5))
+    reduced, _ = geometry_reduction.reduce_geometries([polygon], tolerance=1)
+    assert reduced[0].is_valid
+    assert len(reduced[0].interiors) == 1
+
+
+def test_grid_size_snaps_coordinates_and_collapses_small_geometries():
+    """Test the precision grid and counting geometries that collapse to empty."""
+    small = shapely.box(0.101, 0.101, 0.102, 0.102)
+    reduced, stats = geometry_reduction.reduce_geometries(
+        [shapely.Point(1.23456, 2.34567), small], grid_size=0.01)
+    assert reduced[0].equals(shapely.Point(1.23, 2.35))
+    assert reduced[1].is_empty
+    assert stats['emptied'] == 1
+    assert 'collapsed to empty' in geometry_reduction.reduction_summary(stats)
+
+
+def test_workers_match_single_thread():
+    """Test that the threaded path returns the same geometries in order."""
+    lines = _wiggly_lines(25)
+    serial, serial_stats = geometry_reduction.reduce_geometries(lines, tolerance=0.01, grid_size=0.1,
+                                                                chunk_rows=4)
+    threaded, threaded_stats = geometry_reduction.reduce_geometries(
+        lines, tolerance=0.01, grid_size=0.1, chunk_rows=4, workers=3)
+    assert all(a.equals(b) for a, b in zip(serial, threaded))
+    assert len(threaded) == 25
+    serial_stats.pop('seconds'), threaded_stats.pop('seconds')
+    assert serial_stats == threaded_stats
+
+
+def test_no_geometries():
+    """Test an empty input."""
+    reduced, stats = geometry_reduction.reduce_geometries([], tolerance=1)
+    assert len(reduced) == 0
+    assert stats['vertices_before'] == stats['vertices_after'] == 0
+    assert geometry_reduction.reduction_summary(stats).startswith('vertices 0 -> 0 (+0%)')
+
+
+def test_reduce_frame_keeps_index_and_crs():
+    """Test that reduce_frame replaces only the active geometry."""
+    gdf = gpd.GeoDataFrame({'id': [1, 2]}, geometry=_wiggly_lines(2), crs=3857, index=[10, 20])
+    reduced, stats = geometry_reduction.reduce_frame(gdf, tolerance=0.01)
+    assert list(reduced.index) == [10, 20] and reduced.crs == gdf.crs
+    assert list(reduced['id']) == [1, 2]
+    assert shapely.get_num_coordinates(reduced.geometry.values).tolist() == [2, 2]
+    assert shapely.get_num_coordinates(gdf.geometry.values).tolist() == [101, 101]
+
+
+def test_failed_reduction_is_reported(sqlite_manager, capsys):
+    """Test that an error while reducing fails the import with the real error."""
+    gdf = gpd.GeoDataFrame({'id': [1]}, geometry=[shapely.Point(1, 1)], crs=4326)
+    messages = []
+    progress = lambda current, total, message: messages.append((total, message))
+    assert not sqlite_manager.import_spatial_data(gdf, 'p', progress_callback=progress,
+                                                  grid_size='fine')
+    assert messages[-1][0] == 1 and messages[-1][1].startswith('Error: ')
+    assert 'Spatial import error: ' in capsys.readouterr().out
+    assert 'p' not in sqlite_manager.get_tables()
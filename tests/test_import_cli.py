@@ -0,0 +1,150 @@
+"""Tests for the headless command-line import runner."""
+import io
+import json
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import import_cli
+import import_jobs
+from import_cli import JsonReporter, build_parser, run_import
+
+
+@pytest.fixture
+def jobs_directory(tmp_path, monkeypatch):
+    directory = tmp_path / 'jobs'
+    monkeypatch.setattr(import_jobs, 'JOBS_DIRECTORY', str(directory))
+    return directory
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'sales data.csv'
+    pd.DataFrame({'id': range(25), 'amount': [i * 1.5 for i in range(25)],
+                  'region': ['north', 'south'] * 12 + ['east']}).to_csv(path, index=False)
+    return str(path)
+
+
+def parse(*argv):
+    return build_parser().parse_args(list(argv))
+
+
+def events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def stored_jobs(directory):
+    return [json.loads(path.read_text()) for path in sorted(directory.glob('*.json'))]
+
+
+def sqlite_rows(database, query):
+    engine = create_engine(f'sqlite:///{database}')
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text(query)).fetchall()
+    finally:
+        engine.dispose()
+
+
+def test_parser_defaults():
+    """Test the default load options and the required connection arguments."""
+    args = parse('--db-type', 'SQLite', '--database', 'x.db', 'in.csv')
+    assert (args.mode, args.load_method, args.chunk_rows, args.csv_engine) == ('replace', 'auto', 100000, 'c')
+    assert not (args.no_stream or args.resumable or args.no_spatial_index)
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['--db-type', 'Oracle', '--database', 'x', 'in.csv'])
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['--db-type', 'SQLite', 'in.csv'])
+
+
+def test_connection_config(monkeypatch):
+    """Test the DB_PASSWORD fallback, the default port and the pool size."""
+    seen = {}
+
+    class Manager:
+        def connect(self, config):
+            seen.update(config)
+            return False
+
+    monkeypatch.setattr(import_cli, 'DatabaseManager', Manager)
+    monkeypatch.setenv('DB_PASSWORD', 'secret')
+    args = parse('--db-type', 'PostgreSQL', '--database', 'db', '--pool-size', '3', 'in.csv')
+    assert run_import(args, JsonReporter(io.StringIO())) is False
+    assert (seen['password'], seen['port'], seen['pool_size']) == ('secret', '5432', 3)
+
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_run_import_sqlite(tmp_path, csv_path, stream):
+    """Test streamed and whole-file CSV imports into SQLite with the chosen columns."""
+    database = tmp_path / 'out.db'
+    argv = ['--db-type', 'SQLite', '--database', str(database), '--columns', 'id, region',
+            '--where', 'id >= 5', '--chunk-rows', '7', csv_path]
+    if not stream:
+        argv.insert(0, '--no-stream')
+    output = io.StringIO()
+    reporter = JsonReporter(output)
+    assert run_import(parse(*argv), reporter) is True
+
+    assert sqlite_rows(database, 'SELECT COUNT(*), MIN(id) FROM sales_data') == [(20, 5)]
+    assert [row[1] for row in sqlite_rows(database, 'PRAGMA table_info(sales_data)')] == ['id', 'region']
+    kinds = [event['event'] for event in events(output)]
+    assert kinds[:2] == ['connect', 'start'] and 'progress' in kinds
+    assert reporter.rows == 20
+
+
+def test_run_import_upsert(tmp_path, csv_path):
+    """Test --mode upsert with --key-columns against an existing table."""
+    database = tmp_path / 'out.db'
+    common = ['--db-type', 'SQLite', '--database', str(database), '--table', 'sales']
+    assert run_import(parse(*common, '--where', 'id < 10', csv_path), JsonReporter(io.StringIO()))
+    assert run_import(parse(*common, '--mode', 'upsert', '--key-columns', 'id', csv_path),
+                      JsonReporter(io.StringIO()))
+    assert sqlite_rows(database, 'SELECT COUNT(*), COUNT(DISTINCT id) FROM sales') == [(25, 25)]
+
+
+def test_spatial_options_rejected_for_csv(tmp_path, csv_path):
+    """Test that spatial-only options fail a CSV import."""
+    args = parse('--db-type', 'SQLite', '--database', str(tmp_path / 'out.db'), '--bbox', '0,0,1,1',
+                 csv_path)
+    with pytest.raises(ValueError, match='--bbox'):
+        run_import(args, JsonReporter(io.StringIO()))
+
+
+def test_resumable_job_completed(tmp_path, csv_path, jobs_directory):
+    """Test that a resumable import records its job as completed."""
+    args = parse('--db-type', 'SQLite', '--database', str(tmp_path / 'out.db'), '--resumable',
+                 '--chunk-rows', '10', csv_path)
+    assert run_import(args, JsonReporter(io.StringIO())) is True
+    jobs = stored_jobs(jobs_directory)
+    assert [(job['status'], job['options']['stream']) for job in jobs] == [('completed', True)]
+
+
+def test_connect_failure_marks_job_failed(tmp_path, csv_path, jobs_directory):
+    """Test that a failed connection reports an error and does not leave the job running."""
+    output = io.StringIO()
+    args = parse('--db-type', 'SQLite', '--database', str(tmp_path / 'missing' / 'out.db'),
+                 '--resumable', csv_path)
+    assert run_import(args, JsonReporter(output)) is False
+    error = events(output)[-1]
+    assert (error['event'], error['message']) == ('error', "Failed to connect to database")
+    assert [job['status'] for job in stored_jobs(jobs_directory)] == ['failed']
+
+
+def test_main_summary(tmp_path, csv_path, capsys):
+    """Test the exit code, the JSON summary on stdout and the metrics file."""
+    metrics_path = tmp_path / 'metrics.json'
+    code = import_cli.main(['--db-type', 'SQLite', '--database', str(tmp_path / 'out.db'),
+                            '--metrics', str(metrics_path), csv_path])
+    assert code == 0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    summary = lines[-1]
+    assert summary['event'] == 'summary' and summary['success'] is True
+    assert summary['rows'] == 25 and summary['input_bytes'] > 0
+    assert 'execute' in summary['stages']
+    assert json.loads(metrics_path.read_text())['metrics']['rows'] == 25
+
+    code = import_cli.main(['--db-type', 'SQLite', '--database', str(tmp_path / 'missing' / 'x.db'),
+                            csv_path])
+    assert code == 1
+    assert json.loads(capsys.readouterr().out.splitlines()[-1])['success'] is False
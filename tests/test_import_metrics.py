@@ -0,0 +1,96 @@
+"""Tests for per-stage import metrics."""
+import json
+import threading
+import time
+
+import pandas as pd
+
+from import_metrics import NULL_SPAN, STAGES, ImportMetrics
+
+
+def test_nested_spans_exclude_inner_time():
+    """Test that a span's own time leaves out the spans opened inside it."""
+    metrics = ImportMetrics('job')
+    with metrics.span('execute', rows=10):
+        with metrics.span('encode', nbytes=100) as span:
+            span.add(rows=5)
+            time.sleep(0.05)
+    stages = metrics.snapshot()['stages']
+    assert stages['encode']['seconds'] >= 0.05
+    assert stages['execute']['seconds'] < 0.05
+    assert (stages['encode']['calls'], stages['encode']['rows'], stages['encode']['bytes']) == (1, 5, 100)
+    assert stages['execute']['rows'] == 10
+
+
+def test_snapshot_throughput_and_counters():
+    """Test rows/s, bytes/s and counters in the snapshot and summary."""
+    metrics = ImportMetrics('job')
+    metrics.start()
+    metrics.add_rows(1000, 2000)
+    metrics.count('retries')
+    metrics.count('retries', 2)
+    time.sleep(0.01)
+    metrics.stop()
+    snapshot = metrics.snapshot()
+    assert set(STAGES) <= set(snapshot['stages'])
+    assert (snapshot['rows'], snapshot['bytes']) == (1000, 2000)
+    assert snapshot['rows_per_sec'] == round(1000 / metrics.elapsed(), 1)
+    assert snapshot['counters'] == {'retries': 3}
+    assert metrics.summary().endswith(', 3 retries')
+    assert metrics.elapsed() == metrics.elapsed()
+
+
+def test_elapsed_before_start():
+    """Test an import that has not started."""
+    metrics = ImportMetrics()
+    assert metrics.elapsed() == 0.0
+    assert metrics.snapshot()['rows_per_sec'] == 0.0
+
+
+def test_spans_per_thread():
+    """Test that spans on different threads do not nest into each other."""
+    metrics = ImportMetrics()
+
+    def work():
+        with metrics.span('execute'):
+            time.sleep(0.02)
+
+    with metrics.span('read'):
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    stages = metrics.snapshot()['stages']
+    assert stages['execute']['calls'] == 3
+    assert stages['read']['seconds'] >= 0.02
+
+
+def test_export_trace(tmp_path):
+    """Test the exported totals and Chrome trace events, with the event cap."""
+    metrics = ImportMetrics('job', max_events=2)
+    for _ in range(3):
+        with metrics.span('commit', rows=1):
+            pass
+    data = json.loads(open(metrics.export(tmp_path / 'trace.json'), encoding='utf-8').read())
+    assert data['dropped_events'] == 1
+    assert [event['name'] for event in data['traceEvents']] == ['commit', 'commit']
+    assert data['traceEvents'][0]['ph'] == 'X'
+    assert data['metrics']['stages']['commit']['calls'] == 3
+
+
+def test_null_span():
+    """Test the stand-in span used without metrics."""
+    with NULL_SPAN as span:
+        span.add(rows=1)
+
+
+def test_import_records_stages(sqlite_manager):
+    """Test that an import records its stages and rows into the metrics passed to it."""
+    metrics = ImportMetrics('t')
+    frame = pd.DataFrame({'id': range(100), 'name': ['x'] * 100})
+    assert sqlite_manager.import_data(frame, 't', metrics=metrics)
+    snapshot = metrics.snapshot()
+    assert snapshot['rows'] == 100
+    assert snapshot['stages']['execute']['calls'] >= 1
+    assert metrics.finished is not None
@@ -0,0 +1,80 @@
+"""Tests for the append/upsert SQL built for each backend."""
+import pytest
+
+import merge_sql
+
+
+def test_quote_per_backend():
+    """Test identifier quoting with embedded quote characters."""
+    assert merge_sql.quote('a`b', 'MySQL') == '`a``b`'
+    assert merge_sql.quote('a"b', 'PostgreSQL') == '"a""b"'
+
+
+def test_append_sql():
+    """Test that append copies the listed columns from staging."""
+    assert merge_sql.append_sql('SQLite', 't', 's', ['id', 'v']) == \
+        'INSERT INTO "t" ("id", "v") SELECT "id", "v" FROM "s"'
+
+
+def test_upsert_postgresql_keeps_last_row_per_key():
+    """Test ON CONFLICT with DISTINCT ON picking the last staging row."""
+    sql = merge_sql.upsert_sql('PostgreSQL', 't', 's', ['id', 'v'], ['id'], '_staging_row')
+    assert sql == ('INSERT INTO "t" ("id", "v") SELECT DISTINCT ON ("id") "id", "v" FROM "s" '
+                   'ORDER BY "id", "_staging_row" DESC '
+                   'ON CONFLICT ("id") DO UPDATE SET "v" = EXCLUDED."v"')
+
+
+def test_upsert_postgresql_keys_only():
+    """Test DO NOTHING when every column is a key."""
+    sql = merge_sql.upsert_sql('PostgreSQL', 't', 's', ['id'], ['id'])
+    assert sql.endswith('ORDER BY "id" ON CONFLICT ("id") DO NOTHING')
+
+
+def test_upsert_mysql():
+    """Test ON DUPLICATE KEY UPDATE applying staging rows in source order."""
+    sql = merge_sql.upsert_sql('MySQL', 't', 's', ['id', 'v'], ['id'], '_staging_row')
+    assert sql == ('INSERT INTO `t` (`id`, `v`) SELECT s.`id`, s.`v` FROM `s` AS s '
+                   'ORDER BY s.`_staging_row` ON DUPLICATE KEY UPDATE `v` = s.`v`')
+    assert merge_sql.upsert_sql('MySQL', 't', 's', ['id'], ['id']) == \
+        'INSERT IGNORE INTO `t` (`id`) SELECT `id` FROM `s`'
+
+
+def test_upsert_sql_server_merges_ranked_source():
+    """Test MERGE from the last staging row of each key."""
+    sql = merge_sql.upsert_sql('SQL Server', 't', 's', ['id', 'v'], ['id'], '_staging_row')
+    assert sql == ('MERGE INTO "t" AS target USING (SELECT "id", "v" FROM (SELECT "id", "v", '
+                   'ROW_NUMBER() OVER (PARTITION BY "id" ORDER BY "_staging_row" DESC) AS _rank '
+                   'FROM "s") AS ranked WHERE _rank = 1) AS source ON (target."id" = source."id") '
+                   'WHEN MATCHED THEN UPDATE SET target."v" = source."v" '
+                   'WHEN NOT MATCHED BY TARGET THEN INSERT ("id", "v") '
+                   'VALUES (source."id", source."v");')
+
+
+def test_upsert_sql_server_without_order_column():
+    """Test MERGE ranking without a staging order."""
+    sql = merge_sql.upsert_sql('SQL Server', 't', 's', ['a', 'b'], ['a', 'b'])
+    assert 'ORDER BY (SELECT NULL)' in sql
+    assert 'target."a" = source."a" AND target."b" = source."b"' in sql
+    assert 'WHEN MATCHED' not in sql
+
+
+def test_upsert_sqlite():
+    """Test INSERT OR REPLACE in source order."""
+    assert merge_sql.upsert_sql('SQLite', 't', 's', ['id', 'v'], ['id'], '_staging_row') == \
+        'INSERT OR REPLACE INTO "t" ("id", "v") SELECT "id", "v" FROM "s" ORDER BY "_staging_row"'
+
+
+def test_upsert_unknown_backend():
+    """Test that an unsupported backend raises ValueError."""
+    with pytest.raises(ValueError):
+        merge_sql.upsert_sql('Oracle', 't', 's', ['id'], ['id'])
+
+
+def test_unique_index_and_column_sql():
+    """Test the DDL for the key index, MySQL VARCHAR keys and the hash column."""
+    assert merge_sql.unique_index_sql('PostgreSQL', 't', ['a', 'b']) == \
+        'CREATE UNIQUE INDEX "ux_t_a_b" ON "t" ("a", "b")'
+    assert merge_sql.mysql_key_column_sql('t', 'code', 255) == \
+        'ALTER TABLE `t` MODIFY `code` VARCHAR(255)'
+    assert merge_sql.add_hash_column_sql('SQL Server', 't') == 'ALTER TABLE "t" ADD "_row_hash" BIGINT'
+    assert merge_sql.add_hash_column_sql('MySQL', 't') == 'ALTER TABLE `t` ADD COLUMN `_row_hash` BIGINT'
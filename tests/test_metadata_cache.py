@@ -0,0 +1,115 @@
+"""Tests for the catalog metadata cache."""
+import metadata_cache
+from metadata_cache import MetadataCache
+
+
+class Loader:
+    """Load function that counts its calls"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.value
+
+
+def test_hits_are_served_from_memory():
+    """Test that a load runs once and later lookups reuse it."""
+    cache = MetadataCache()
+    load = Loader(['a', 'b'])
+    assert cache.table_names(load) == ['a', 'b']
+    assert cache.table_names(load) == ['a', 'b']
+    assert load.calls == 1
+
+
+def test_columns_load_all_then_one():
+    """Test the bulk column load and the per-table load for tables missing from it."""
+    cache = MetadataCache()
+    load_all = Loader({'a': [{'name': 'id'}]})
+    load_one = Loader([{'name': 'x'}])
+    assert cache.table_columns('a', load_all, load_one) == [{'name': 'id'}]
+    assert cache.table_columns('new', load_all, load_one) == [{'name': 'x'}]
+    cache.table_columns('a', load_all, load_one)
+    assert (load_all.calls, load_one.calls) == (1, 1)
+
+
+def test_entries_expire_after_max_age(monkeypatch):
+    """Test that everything is reloaded once the entries are max_age seconds old."""
+    now = [1000.0]
+    monkeypatch.setattr(metadata_cache.time, 'time', lambda: now[0])
+    cache = MetadataCache(max_age=60)
+    tables = Loader(['a'])
+    spatial = Loader([('a', 'geom')])
+    cache.table_names(tables)
+    cache.spatial_columns(spatial)
+
+    now[0] += 59
+    cache.table_names(tables)
+    cache.spatial_columns(spatial)
+    assert (tables.calls, spatial.calls) == (1, 1)
+
+    now[0] += 1
+    cache.table_names(tables)
+    cache.spatial_columns(spatial)
+    assert (tables.calls, spatial.calls) == (2, 2)
+    assert cache.loaded_at == now[0]
+
+
+def test_no_max_age_keeps_entries(monkeypatch):
+    """Test that max_age=None never expires entries."""
+    now = [1000.0]
+    monkeypatch.setattr(metadata_cache.time, 'time', lambda: now[0])
+    cache = MetadataCache(max_age=None)
+    load = Loader(['a'])
+    cache.table_names(load)
+    now[0] += 10 ** 6
+    cache.table_names(load)
+    assert load.calls == 1
+
+
+def test_invalidate_table():
+    """Test that invalidating one table keeps the columns of the others."""
+    cache = MetadataCache()
+    load_all = Loader({'a': ['a1'], 'b': ['b1']})
+    load_one = Loader(['a2'])
+    tables = Loader(['a', 'b'])
+    cache.table_names(tables)
+    cache.table_columns('a', load_all, load_one)
+
+    cache.invalidate('a')
+    assert cache.table_columns('b', load_all, load_one) == ['b1']
+    assert cache.table_columns('a', load_all, load_one) == ['a2']
+    cache.table_names(tables)
+    assert (load_all.calls, load_one.calls, tables.calls) == (1, 1, 2)
+
+
+def test_invalidate_all():
+    """Test that invalidating without a name clears every entry."""
+    cache = MetadataCache()
+    load_all = Loader({'a': ['a1']})
+    cache.table_columns('a', load_all, Loader([]))
+    cache.invalidate()
+    cache.table_columns('a', load_all, Loader([]))
+    assert load_all.calls == 2
+    assert cache.loaded_at is not None
+
+
+def test_only_ddl_invalidates(sqlite_manager):
+    """Test that queries and DML keep the cache and DDL statements clear it."""
+    sqlite_manager.execute_query('CREATE TABLE a (id INTEGER)')
+    assert sqlite_manager.get_tables() == ['a']
+    loaded = sqlite_manager.metadata.tables
+
+    sqlite_manager.execute_query('INSERT INTO a VALUES (1)')
+    sqlite_manager.open_query('SELECT * FROM a').close()
+    sqlite_manager.open_query('UPDATE a SET id = 2')
+    assert sqlite_manager.metadata.tables is loaded
+
+    sqlite_manager.open_query('/* new */ CREATE TABLE b (id INTEGER)')
+    assert sqlite_manager.metadata.tables is None
+    assert sqlite_manager.get_tables() == ['a', 'b']
+
+    sqlite_manager.execute_query('ALTER TABLE b RENAME TO c')
+    assert sorted(sqlite_manager.get_tables()) == ['a', 'c']
@@ -0,0 +1,99 @@
+"""Tests for the COPY text and binary encoders."""
+import struct
+
+import numpy as np
+import pandas as pd
+
+import pg_copy
+
+
+def test_copy_sql_quotes_identifiers():
+    """Test that COPY quotes the table and column names."""
+    assert pg_copy.copy_sql('my "table"', ['a', 'b c'], 'binary') == \
+        'COPY "my ""table""" ("a", "b c") FROM STDIN WITH (FORMAT binary)'
+
+
+def test_encode_text_escapes_and_nulls():
+    """Test text COPY escaping of tabs and backslashes and \\N for NULLs."""
+    df = pd.DataFrame({'n': pd.array([1, None], dtype='Int64'),
+                       's': ['tab\there\\', None],
+                       'b': [True, None]})
+    assert pg_copy.encode_text(df) == '1\ttab\\there\\\\\tTrue\n\\N\t\\N\t\\N\n'
+
+
+def test_encode_text_bytes_as_bytea_hex():
+    """Test bytes columns in text COPY as bytea hex."""
+    df = pd.DataFrame({'data': [b'\x00\\x', None, bytearray(b'AB')]})
+    assert pg_copy.encode_text(df) == '\\\\x005c78\n\\N\n\\\\x4142\n'
+
+
+def test_encode_text_datetimes():
+    """Test datetime formatting in text COPY."""
+    df = pd.DataFrame({'ts': pd.to_datetime(['2024-01-02 03:04:05', None])})
+    assert pg_copy.encode_text(df) == '2024-01-02 03:04:05\n\\N\n'
+
+
+def test_encode_text_empty_frame():
+    """Test that an empty DataFrame encodes to nothing."""
+    assert pg_copy.encode_text(pd.DataFrame({'a': []})) == ''
+
+
+def _fields(data, columns):
+    """Split binary COPY tuples back into lists of raw field values (None for NULL)"""
+    rows, offset = [], 0
+    while offset < len(data):
+        (count,) = struct.unpack_from('>h', data, offset)
+        assert count == columns
+        offset += 2
+        row = []
+        for _ in range(count):
+            (length,) = struct.unpack_from('>i', data, offset)
+            offset += 4
+            if length == -1:
+                row.append(None)
+            else:
+                row.append(data[offset:offset + length])
+                offset += length
+        rows.append(row)
+    return rows
+
+
+def test_encode_binary_fixed_width_fast_path():
+    """Test binary COPY of fixed-width numeric columns."""
+    df = pd.DataFrame({'i': np.array([1, -2], dtype='int16'), 'f': [0.5, 2.0]})
+    rows = _fields(pg_copy.encode_binary(df), 2)
+    assert [struct.unpack('>h', row[0])[0] for row in rows] == [1, -2]
+    assert [struct.unpack('>d', row[1])[0] for row in rows] == [0.5, 2.0]
+
+
+def test_encode_binary_nulls_text_and_bytes():
+    """Test binary COPY of NULLs, UTF-8 text and bytes."""
+    df = pd.DataFrame({'i': pd.array([7, None], dtype='Int32'),
+                       's': ['héllo', None],
+                       'b': [b'\x00\x01', None]})
+    rows = _fields(pg_copy.encode_binary(df), 3)
+    assert rows[0] == [struct.pack('>i', 7), 'héllo'.encode('utf-8'), b'\x00\x01']
+    assert rows[1] == [None, None, None]
+
+
+def test_encode_binary_timestamps_count_from_2000():
+    """Test binary COPY timestamps in microseconds since 2000-01-01."""
+    df = pd.DataFrame({'ts': pd.to_datetime(['2000-01-01 00:00:01'])})
+    (row,) = _fields(pg_copy.encode_binary(df), 1)
+    assert struct.unpack('>q', row[0])[0] == 1000000
+
+
+def test_binary_supported():
+    """Test which column types the binary format accepts."""
+    assert pg_copy.binary_supported(pd.DataFrame({'a': [1], 'b': ['x'], 'c': [b'y']}))
+    assert not pg_copy.binary_supported(pd.DataFrame({'a': [1.5, 'x']}))
+    assert not pg_copy.binary_supported(pd.DataFrame({'a': pd.to_timedelta([1], unit='s')}))
+
+
+def test_copy_stream_reads_across_chunks():
+    """Test that CopyStream reads across chunk boundaries."""
+    stream = pg_copy.CopyStream([b'abc', b'', b'defg'])
+    assert stream.read(2) == b'ab'
+    assert stream.read(4) == b'cdef'
+    assert stream.read() == b'g'
+    assert stream.read(10) == b''
@@ -0,0 +1,67 @@
+"""Tests for paging through query results."""
+import pytest
+from sqlalchemy import create_engine, text
+
+from query_pager import QueryPager
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE t (id INTEGER, name TEXT)'))
+        connection.execute(text('INSERT INTO t VALUES (:id, :name)'),
+                           [{'id': i, 'name': f'row {i}'} for i in range(25)])
+    yield engine
+    engine.dispose()
+
+
+def test_fetch_pages_until_exhausted(engine):
+    """Test pages of page_size rows and closing after the last one."""
+    connection = engine.connect()
+    pager = QueryPager(connection, connection.execute(text('SELECT id, name FROM t ORDER BY id')),
+                       page_size=10)
+    assert pager.returns_rows and pager.columns == ['id', 'name']
+    assert [len(pager.fetch_page()) for _ in range(4)] == [10, 10, 5, 0]
+    assert pager.rows_fetched == 25
+    assert pager.exhausted and pager.connection is None
+    assert pager.first_page_seconds is not None
+
+
+def test_fetch_page_size_and_decode(engine):
+    """Test an explicit page size and the decode function."""
+    connection = engine.connect()
+    with QueryPager(connection, connection.execute(text('SELECT id FROM t ORDER BY id')),
+                    decode=lambda value: value * 2) as pager:
+        assert pager.fetch_page(3) == [(0,), (2,), (4,)]
+    assert pager.exhausted and pager.result is None
+
+
+def test_close_releases_connection(engine):
+    """Test that close ends an unfinished result."""
+    connection = engine.connect()
+    pager = QueryPager(connection, connection.execute(text('SELECT id FROM t')), page_size=5)
+    pager.fetch_page()
+    pager.close()
+    assert connection.closed
+    assert pager.fetch_page() == []
+
+
+def test_statement_without_rows():
+    """Test a pager for a statement that returns no rows."""
+    pager = QueryPager(None, None, rowcount=3)
+    assert not pager.returns_rows
+    assert pager.rowcount == 3
+    assert pager.fetch_page() == []
+
+
+def test_open_query(sqlite_manager):
+    """Test that open_query pages SELECTs and commits other statements."""
+    pager = sqlite_manager.open_query('CREATE TABLE t (id INTEGER)')
+    assert not pager.returns_rows
+    pager = sqlite_manager.open_query('INSERT INTO t VALUES (1), (2), (3)')
+    assert pager.rowcount == 3
+    pager = sqlite_manager.open_query('-- comment\nSELECT id FROM t ORDER BY id', page_size=2)
+    assert pager.fetch_page() == [(1,), (2,)]
+    assert pager.fetch_page() == [(3,)]
+    assert 't' in sqlite_manager.get_tables()
@@ -0,0 +1,112 @@
+"""Tests for sample-based schema inference."""
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import types as sqltypes
+
+from schema_inference import TableSchema, infer_column_type, parse_type, sample_csv
+
+
+def test_parse_type():
+    """Test parsing type strings and rejecting invalid ones."""
+    assert parse_type('String(64)') == ('string', 64)
+    assert parse_type('int32') == ('int32', None)
+    with pytest.raises(ValueError):
+        parse_type('varchar')
+    with pytest.raises(ValueError):
+        parse_type('int32(4)')
+
+
+@pytest.mark.parametrize('values, expected', [
+    ([1, 2, 60], 'int8'),
+    ([1, 2, 100], 'int16'),
+    ([0, 40000], 'int32'),
+    ([0, 2 ** 40], 'int64'),
+    ([1.0, None, 3.0], 'int8'),
+    ([0.5, 1.25], 'float32'),
+    ([0.1, 0.2], 'float64'),
+    (['yes', 'no', None], 'bool'),
+    (['2024-01-01', '2024-02-03'], 'datetime'),
+    ([None, None], 'text'),
+])
+def test_infer_column_type(values, expected):
+    """Test the type chosen for sampled values."""
+    assert infer_column_type(pd.Series(values)) == expected
+
+
+def test_infer_strings_and_categories():
+    """Test string lengths with headroom and low-cardinality categories."""
+    assert infer_column_type(pd.Series(['a', 'b'] * 10)) == 'category(16)'
+    assert infer_column_type(pd.Series([f'value {i}' for i in range(20)])) == 'string(16)'
+    assert infer_column_type(pd.Series(['x' * 20, 'y'])) == 'string(64)'
+
+
+def test_sample_csv_reads_beyond_head(tmp_path):
+    """Test that the sample includes rows from later in the file."""
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'id': range(20000)}).to_csv(path, index=False)
+    sample = sample_csv(path, sample_rows=200)
+    assert sample['id'].max() > 17000
+    assert TableSchema.from_csv(path, sample_rows=200).types['id'] == 'int32'
+
+
+def test_dtype_map_and_sql_types():
+    """Test pandas dtypes and SQL types derived from a schema."""
+    schema = TableSchema({'b': 'bool', 'i': 'int16', 'f': 'float32', 'd': 'datetime',
+                          'c': 'category(16)', 's': 'string(64)', 't': 'text'})
+    assert schema.dtype_map() == {'b': 'boolean', 'i': 'Int16', 'f': 'float32',
+                                  'd': 'datetime64[ns]', 'c': 'category',
+                                  's': 'string', 't': 'string'}
+    types = schema.sql_types('SQL Server')
+    assert isinstance(types['i'], sqltypes.SmallInteger)
+    assert isinstance(types['s'], sqltypes.Unicode) and types['s'].length == 64
+    assert isinstance(types['t'], sqltypes.UnicodeText)
+    assert isinstance(schema.sql_types('SQLite')['s'], sqltypes.Text)
+
+
+def test_mysql_varchar_limits():
+    """Test the MySQL VARCHAR cap and row byte budget."""
+    types = TableSchema({'long': 'string(2048)', 'short': 'string(512)'}).sql_types('MySQL')
+    assert isinstance(types['long'], sqltypes.Text)
+    assert types['short'].length == 512
+
+    wide = TableSchema({f'c{i}': 'string(1024)' for i in range(20)}).sql_types('MySQL')
+    varchars = [t for t in wide.values() if not isinstance(t, sqltypes.Text)]
+    assert sum(t.length * 4 for t in varchars) <= 60000
+    assert len(varchars) < 20
+
+
+def test_apply_widens_integer_overflow():
+    """Test that out-of-range integers widen the column to int64."""
+    schema = TableSchema({'id': 'int8', 'name': 'string(16)'})
+    result = schema.apply(pd.DataFrame({'id': [1, 100000], 'name': ['a', None]}))
+    assert str(result['id'].dtype) == 'Int64'
+    assert schema.types['id'] == 'int64'
+    assert isinstance(schema.sql_types('PostgreSQL')['id'], sqltypes.BigInteger)
+
+
+def test_apply_keeps_fitting_integers():
+    """Test that in-range integers keep their compact type."""
+    schema = TableSchema({'id': 'int16'})
+    result = schema.apply(pd.DataFrame({'id': np.array([1, None], dtype='float64')}))
+    assert str(result['id'].dtype) == 'Int16'
+    assert schema.types['id'] == 'int16'
+
+
+@pytest.mark.parametrize('type_string, values', [
+    ('string(16)', ['x' * 17]),
+    ('bool', ['maybe']),
+    ('datetime', ['not a date']),
+    ('int32', ['abc']),
+])
+def test_apply_reports_values_that_do_not_fit(type_string, values):
+    """Test ValueError naming the column when a value does not fit."""
+    with pytest.raises(ValueError, match="Column 'col'"):
+        TableSchema({'col': type_string}).apply(pd.DataFrame({'col': values}))
+
+
+def test_with_wide_integers():
+    """Test that streaming schemas use int64 for every integer column."""
+    schema = TableSchema({'a': 'int8', 'b': 'int32', 'c': 'string(16)'})
+    assert schema.with_wide_integers().types == {'a': 'int64', 'b': 'int64', 'c': 'string(16)'}
+    assert schema.types['a'] == 'int8'
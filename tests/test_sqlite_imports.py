@@ -0,0 +1,251 @@
+"""Tests for the SQLite import paths of DatabaseManager."""
+import datetime
+import sqlite3
+
+import geopandas as gpd
+import pandas as pd
+import pytest
+import shapely
+from sqlalchemy import inspect, text
+
+import import_jobs
+from database_manager import STAGING_SUFFIX, register_sqlite_functions
+
+
+def _rows(db_manager, query):
+    with db_manager.engine.connect() as connection:
+        return [tuple(row) for row in connection.execute(text(query))]
+
+
+def _frame(ids, values):
+    return pd.DataFrame({'id': ids, 'value': values})
+
+
+def test_replace_recreates_table(sqlite_manager):
+    """Test that replace mode drops the previous rows."""
+    assert sqlite_manager.import_data(_frame([1, 2], ['a', 'b']), 't')
+    assert sqlite_manager.import_data(_frame([3], ['c']), 't')
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t') == [(3, 'c')]
+
+
+def test_bulk_and_insert_create_the_same_columns(sqlite_manager):
+    """Test that the bulk path types object columns as the INSERT path does."""
+    df = pd.DataFrame({'flag': [True, None, False],
+                       'day': [datetime.date(2024, 1, 1), None, datetime.date(2024, 1, 3)],
+                       'at': [datetime.time(1, 2, 3), None, datetime.time(4, 5, 6)],
+                       'count': pd.Series([1, None, 3], dtype=object),
+                       'name': ['a', None, 'c'],
+                       'data': [b'1', None, b'2']})
+    columns = {}
+    for load_method in ('bulk', 'insert'):
+        assert sqlite_manager.import_data(df, f'{load_method}_load', load_method=load_method)
+        columns[load_method] = [(col['name'], str(col['type'])) for col in
+                                inspect(sqlite_manager.engine).get_columns(f'{load_method}_load')]
+    assert columns['bulk'] == columns['insert']
+    assert dict(columns['bulk'])['flag'] == 'BOOLEAN' and dict(columns['bulk'])['day'] == 'DATE'
+    assert _rows(sqlite_manager, 'SELECT * FROM bulk_load') == \
+        _rows(sqlite_manager, 'SELECT * FROM insert_load')
+
+
+@pytest.mark.parametrize('load_method', ['bulk', 'insert'])
+def test_append_adds_rows(sqlite_manager, load_method):
+    """Test that append mode keeps the existing rows."""
+    assert sqlite_manager.import_data(_frame([1], ['a']), 't', load_method=load_method)
+    assert sqlite_manager.import_data(_frame([2], ['b']), 't', mode='append', load_method=load_method)
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == [(1, 'a'), (2, 'b')]
+
+
+def test_upsert_updates_inserts_and_keeps_last_duplicate(sqlite_manager):
+    """Test upsert matching on the key, with the last of repeated keys winning."""
+    assert sqlite_manager.import_data(_frame([1, 2], ['a', 'b']), 't')
+    assert sqlite_manager.import_data(_frame([2, 3, 2], ['first', 'c', 'last']), 't',
+                                      mode='upsert', key_columns=['id'])
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == \
+        [(1, 'a'), (2, 'last'), (3, 'c')]
+    assert 't' + STAGING_SUFFIX not in sqlite_manager.get_tables()
+
+
+@pytest.mark.parametrize('load_method', ['bulk', 'insert'])
+def test_upsert_into_new_table_keeps_last_duplicate(sqlite_manager, load_method):
+    """Test that repeated keys resolve the same way when the upsert creates the table."""
+    assert sqlite_manager.import_data(_frame([1, 2, 1], ['a', 'b', 'c']), 't', mode='upsert',
+                                      key_columns=['id'], load_method=load_method)
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == [(1, 'c'), (2, 'b')]
+    assert 't' + STAGING_SUFFIX not in sqlite_manager.get_tables()
+
+
+def test_upsert_chunks_into_new_table(sqlite_manager):
+    """Test keys repeated across chunks of an upsert that creates the table."""
+    chunks = [_frame([1, 2], ['a', 'b']), _frame([1], ['c'])]
+    assert sqlite_manager.import_data_chunks(iter(chunks), 't', mode='upsert', key_columns=['id'])
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == [(1, 'c'), (2, 'b')]
+
+
+def test_failed_upsert_drops_new_table(sqlite_manager, monkeypatch):
+    """Test that a failed upsert removes the table it created."""
+    def fail(*args, **kwargs):
+        raise RuntimeError('merge failed')
+    monkeypatch.setattr(sqlite_manager, '_finish_load', fail)
+    assert not sqlite_manager.import_data(_frame([1], ['a']), 't', mode='upsert', key_columns=['id'])
+    assert 't' not in sqlite_manager.get_tables()
+
+
+def test_upsert_chunks(sqlite_manager):
+    """Test upserts through import_data_chunks across chunk boundaries."""
+    assert sqlite_manager.import_data(_frame([1], ['a']), 't')
+    chunks = [_frame([1, 2], ['x', 'b']), _frame([1], ['y'])]
+    assert sqlite_manager.import_data_chunks(iter(chunks), 't', mode='upsert', key_columns=['id'])
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == [(1, 'y'), (2, 'b')]
+
+
+def test_upsert_into_duplicate_keys_fails_cleanly(sqlite_manager, capsys):
+    """Test the error when the target already holds duplicate keys."""
+    assert sqlite_manager.import_data(_frame([1, 1], ['a', 'b']), 't')
+    assert not sqlite_manager.import_data(_frame([1], ['c']), 't', mode='upsert', key_columns=['id'])
+    assert 'duplicate keys' in capsys.readouterr().out
+    assert 't' + STAGING_SUFFIX not in sqlite_manager.get_tables()
+    assert _rows(sqlite_manager, 'SELECT count(*) FROM t') == [(2,)]
+
+
+def test_invalid_mode_options(sqlite_manager):
+    """Test that inconsistent mode options are rejected."""
+    assert not sqlite_manager.import_data(_frame([1], ['a']), 't', mode='upsert')
+    assert not sqlite_manager.import_data(_frame([1], ['a']), 't', mode='append',
+                                          detect_changes=True)
+
+
+def test_detect_changes_sends_only_changed_rows(sqlite_manager):
+    """Test that unchanged rows are skipped and changed ones updated."""
+    options = {'mode': 'upsert', 'key_columns': ['id'], 'detect_changes': True}
+    assert sqlite_manager.import_data(_frame([1, 2], ['a', 'b']), 't', **options)
+
+    messages = []
+    progress = lambda current, total, message: messages.append((total, message))
+    assert sqlite_manager.import_data(_frame([1, 2], ['a', 'b']), 't', progress, **options)
+    assert messages[-1] == (2, 'No new or changed rows')
+
+    messages.clear()
+    assert sqlite_manager.import_data(_frame([1, 2, 3], ['a', 'B', 'c']), 't', progress, **options)
+    assert messages[-1] == (2, 'Import completed successfully')
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == \
+        [(1, 'a'), (2, 'B'), (3, 'c')]
+
+
+def _interrupted(chunks, after):
+    for i, chunk in enumerate(chunks):
+        if i == after:
+            raise RuntimeError('interrupted')
+        yield chunk
+
+
+@pytest.mark.parametrize('mode', ['replace', 'append'])
+def test_resumable_import_continues_after_checkpoint(sqlite_manager, mode):
+    """Test that a resumed job skips the committed chunks without duplicating rows."""
+    if mode == 'append':
+        assert sqlite_manager.import_data(_frame([0], ['existing']), 't')
+    chunks = [_frame([i * 2 + 1, i * 2 + 2], ['v', 'v']) for i in range(3)]
+
+    assert not sqlite_manager.import_data_chunks(_interrupted(chunks, 2), 't', mode=mode,
+                                                 job_id='job')
+    state = sqlite_manager.checkpoint_status('job')
+    assert (state['rows_committed'], state['status']) == (4, 'failed')
+
+    assert sqlite_manager.import_data_chunks(iter(chunks), 't', mode=mode, job_id='job',
+                                             resume=True)
+    assert sqlite_manager.checkpoint_status('job')['status'] == 'completed'
+    ids = [row[0] for row in _rows(sqlite_manager, 'SELECT id FROM t ORDER BY id')]
+    assert ids == ([0] if mode == 'append' else []) + [1, 2, 3, 4, 5, 6]
+    assert import_jobs.CHECKPOINT_TABLE not in sqlite_manager.get_tables()
+
+
+def test_resumable_upsert_into_new_table(sqlite_manager):
+    """Test that the first chunk of a resumable upsert creating the table keeps the last duplicate."""
+    chunks = [_frame([1, 2, 1], ['a', 'b', 'c']), _frame([2], ['d'])]
+    assert sqlite_manager.import_data_chunks(iter(chunks), 't', mode='upsert', key_columns=['id'],
+                                             job_id='job')
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == [(1, 'c'), (2, 'd')]
+    assert sqlite_manager.checkpoint_status('job')['rows_committed'] == 4
+
+
+def test_resumable_upsert(sqlite_manager):
+    """Test a resumable upsert committed chunk by chunk."""
+    assert sqlite_manager.import_data(_frame([1], ['a']), 't')
+    chunks = [_frame([1, 2], ['x', 'b']), _frame([2], ['y'])]
+    assert sqlite_manager.import_data_chunks(iter(chunks), 't', mode='upsert', key_columns=['id'],
+                                             job_id='job')
+    assert _rows(sqlite_manager, 'SELECT id, value FROM t ORDER BY id') == [(1, 'x'), (2, 'y')]
+
+
+def _points(ids, xs):
+    return gpd.GeoDataFrame({'id': ids}, geometry=shapely.points(xs, xs), crs=4326)
+
+
+def test_binary_geometry_and_rtree(sqlite_manager):
+    """Test GeoPackage blob storage, decoding and the R*Tree kept in step by triggers."""
+    assert sqlite_manager.import_spatial_data(_points([1, 2], [1.0, 2.0]), 'p',
+                                              geometry_storage='binary')
+    assert sqlite_manager.last_spatial_index_error is None
+    blob = _rows(sqlite_manager, 'SELECT geometry FROM p WHERE id = 1')[0][0]
+    assert blob[:2] == b'GP'
+    assert sqlite_manager.execute_query('SELECT id, geometry FROM p ORDER BY id')[0]['geometry'] == \
+        'POINT (1 1)'
+    assert _rows(sqlite_manager, 'SELECT minx, maxy FROM rtree_p_geometry ORDER BY minx') == \
+        [(1.0, 1.0), (2.0, 2.0)]
+    assert [t for t in sqlite_manager.get_tables() if t.startswith('rtree_')] == []
+
+    assert sqlite_manager.import_spatial_data(_points([2, 3], [5.0, 7.0]), 'p', mode='upsert',
+                                              key_columns=['id'], geometry_storage='binary')
+    assert _rows(sqlite_manager, 'SELECT minx FROM rtree_p_geometry ORDER BY minx') == \
+        [(1.0,), (5.0,), (7.0,)]
+
+    with sqlite_manager.engine.begin() as connection:
+        connection.execute(text('DELETE FROM p WHERE id = 1'))
+    assert _rows(sqlite_manager, 'SELECT count(*) FROM rtree_p_geometry') == [(2,)]
+
+
+def test_spatial_upsert_into_new_table(sqlite_manager):
+    """Test that a spatial upsert creating the table keeps the last row of each key."""
+    assert sqlite_manager.import_spatial_data(_points([1, 2, 1], [1.0, 2.0, 3.0]), 'p',
+                                              mode='upsert', key_columns=['id'])
+    assert _rows(sqlite_manager, 'SELECT id, geometry FROM p ORDER BY id') == \
+        [(1, 'POINT (3 3)'), (2, 'POINT (2 2)')]
+    assert _rows(sqlite_manager, 'SELECT count(*) FROM rtree_p_geometry') == [(2,)]
+
+
+def test_rtree_triggers_on_other_connections(sqlite_manager, tmp_path):
+    """Test writes from a plain sqlite3 connection with and without the GeoPackage functions."""
+    assert sqlite_manager.import_spatial_data(_points([1], [1.0]), 'p', geometry_storage='binary')
+    blob = _rows(sqlite_manager, 'SELECT geometry FROM p')[0][0]
+
+    connection = sqlite3.connect(tmp_path / 'test.db')
+    with pytest.raises(sqlite3.OperationalError, match='no such function'):
+        connection.execute('INSERT INTO p (id, geometry) VALUES (2, ?)', (blob,))
+
+    register_sqlite_functions(connection)
+    connection.execute("INSERT INTO p (id, geometry) VALUES (2, 'POINT (4 5)')")
+    connection.execute("INSERT INTO p (id, geometry) VALUES (3, 'POINT EMPTY')")
+    connection.execute('UPDATE p SET geometry = NULL WHERE id = 1')
+    connection.commit()
+    connection.close()
+    assert _rows(sqlite_manager, 'SELECT id, minx, maxy FROM rtree_p_geometry') == [(2, 4.0, 5.0)]
+
+
+def test_get_tables_hides_only_built_rtrees(sqlite_manager):
+    """Test that user tables named rtree_* stay listed."""
+    assert sqlite_manager.import_spatial_data(_points([1], [1.0]), 'p')
+    assert sqlite_manager.import_data(_frame([1], ['a']), 'rtree_notes')
+    with sqlite_manager.engine.begin() as connection:
+        connection.execute(text('CREATE VIRTUAL TABLE rtree_own USING rtree(id, x0, x1)'))
+    sqlite_manager.refresh_metadata()
+    assert sorted(sqlite_manager.get_tables()) == ['p', 'rtree_notes', 'rtree_own', 'rtree_own_node',
+                                                   'rtree_own_parent', 'rtree_own_rowid']
+
+
+def test_text_geometry(sqlite_manager):
+    """Test WKT storage with missing geometries."""
+    gdf = _points([1, 2], [1.0, 2.0])
+    gdf.loc[1, 'geometry'] = None
+    assert sqlite_manager.import_spatial_data(gdf, 'p')
+    assert _rows(sqlite_manager, 'SELECT id, geometry FROM p ORDER BY id') == \
+        [(1, 'POINT (1 1)'), (2, None)]
+    assert _rows(sqlite_manager, 'SELECT count(*) FROM rtree_p_geometry') == [(1,)]